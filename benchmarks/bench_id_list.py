@@ -0,0 +1,79 @@
+"""
+名单表示形式基准测试
+
+对比超大名单的三种表示形式：原有的字符串列表（线性查找）、IdSet（哈希集合）
+和 CompactIdSet（排序的 u64 数组 + 二分查找），测量持久化大小、解码耗时、
+内存占用和成员检查耗时。
+
+用法: python benchmarks/bench_id_list.py
+"""
+
+import json
+import os
+import random
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gm_core.core.id_set import CompactIdSet, IdSet, load_id_set  # noqa: E402
+
+SIZES = [1000, 10000, 100000]
+LOOKUPS = 1000
+
+
+def build_ids(size: int) -> list:
+    """生成随机的 QQ 号（5 到 11 位）"""
+    rng = random.Random(size)
+    return [str(rng.randrange(10000, 10 ** 11)) for _ in range(size)]
+
+
+def measure_memory(factory) -> float:
+    """返回 factory() 的结果占用的内存（KB）"""
+    tracemalloc.start()
+    result = factory()  # noqa: F841
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / 1024
+
+
+def measure_lookup(container, probes: list, number: int) -> float:
+    """返回每次成员检查的平均耗时（微秒）"""
+    elapsed = timeit.timeit(lambda: [probe in container for probe in probes], number=number)
+    return elapsed / (number * len(probes)) * 1e6
+
+
+def main() -> None:
+    print(
+        f"{'人数':>7} {'形式':<13} {'持久化(KB)':>10} {'解码(ms)':>9} "
+        f"{'内存(KB)':>9} {'查找(us)':>9}"
+    )
+    for size in SIZES:
+        ids = build_ids(size)
+        rng = random.Random(0)
+        probes = rng.sample(ids, LOOKUPS // 2) + [str(n) for n in range(LOOKUPS // 2)]
+
+        list_json = json.dumps(ids)
+        compact_json = json.dumps(CompactIdSet(ids).dump())
+        id_set = IdSet(ids)
+        compact = CompactIdSet(ids)
+
+        cases = [
+            ("字符串列表", list_json, lambda data=list_json: json.loads(data), ids, 1 if size > 10000 else 5),
+            ("IdSet", list_json, lambda data=list_json: IdSet(json.loads(data)), id_set, 200),
+            ("CompactIdSet", compact_json,
+             lambda data=compact_json: load_id_set(json.loads(data), compact_threshold=1), compact, 200),
+        ]
+        for label, payload, decode, container, number in cases:
+            decode_ms = timeit.timeit(decode, number=5) / 5 * 1000
+            memory_kb = measure_memory(decode)
+            lookup_us = measure_lookup(container, probes, number)
+            print(
+                f"{size:>7} {label:<13} {len(payload) / 1024:>10.1f} {decode_ms:>9.2f} "
+                f"{memory_kb:>9.1f} {lookup_us:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+加群申请处理延迟基准测试
+
+使用每次读写都有固定延迟的内存 KV 模拟较慢的存储后端，对比原有的顺序读取流程
+（依次读取规则、白名单、黑名单后再验证）与当前 GroupJoinRequestHandler 的延迟：
+黑名单/白名单用户在读取规则之前即可得出结果，独立的读取并发发出。
+
+用法: python benchmarks/bench_join_latency.py [每次 KV 访问延迟(毫秒)]
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gm_core.core import Config, Storage, Validator  # noqa: E402
+from gm_core.handlers import GroupJoinRequestHandler  # noqa: E402
+from gm_core.utils import NotificationManager  # noqa: E402
+
+GROUP_ID = "10001"
+REQUESTS = 50
+REASON = "你好，我是计算机学院的学生，学号 20231234"
+USERS = {
+    "黑名单用户": "20000",
+    "白名单用户": "30000",
+    "规则验证用户": "40000",
+}
+
+
+class SlowKVPlugin:
+    """每次读写都等待固定延迟的内存 KV 存储"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.data = {
+            f"rules_{GROUP_ID}": [
+                {"type": "keyword", "content": "学生"},
+                {"type": "regex", "content": r"学号\s*\d{8}"},
+            ],
+            f"whitelist_{GROUP_ID}": [str(uid) for uid in range(30000, 31000)],
+            f"blacklist_{GROUP_ID}": [str(uid) for uid in range(20000, 21000)],
+        }
+
+    async def get_kv_data(self, key, default):
+        await asyncio.sleep(self.latency)
+        return self.data.get(key, default)
+
+    async def put_kv_data(self, key, value):
+        await asyncio.sleep(self.latency)
+        self.data[key] = value
+
+
+async def legacy_join(plugin: SlowKVPlugin, validator: Validator, user_id: str) -> None:
+    """原有流程：顺序读取规则、白名单和黑名单后再验证"""
+    rules = await plugin.get_kv_data(f"rules_{GROUP_ID}", [])
+    whitelist = await plugin.get_kv_data(f"whitelist_{GROUP_ID}", [])
+    blacklist = await plugin.get_kv_data(f"blacklist_{GROUP_ID}", [])
+    await validator.validate_request(GROUP_ID, user_id, REASON, rules, whitelist, blacklist)
+
+
+async def measure(join, user_id: str) -> float:
+    """返回平均延迟（毫秒）"""
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        await join(user_id)
+    return (time.perf_counter() - started) / REQUESTS * 1000
+
+
+def build_handler(plugin: SlowKVPlugin, cache_size: int) -> GroupJoinRequestHandler:
+    config = Config(None, {"enable_admin_notification": False, "config_reload_interval": 0})
+    storage = Storage(plugin, cache_size=cache_size)
+    validator = Validator(config)
+    storage.add_rules_listener(validator.invalidate_engine)
+    return GroupJoinRequestHandler(
+        plugin, config, storage, validator, NotificationManager(plugin, config, storage)
+    )
+
+
+async def main(latency_ms: float) -> None:
+    plugin = SlowKVPlugin(latency_ms / 1000)
+    legacy_validator = Validator()
+    cold = build_handler(plugin, cache_size=0)
+    warm = build_handler(plugin, cache_size=1024)
+
+    def run_handler(handler):
+        return lambda user_id: handler.handle_join_request(GROUP_ID, "测试群", user_id, "申请人", REASON)
+
+    print(f"KV 访问延迟: {latency_ms:.1f}ms, 每种情况 {REQUESTS} 次请求")
+    print(f"{'用户':<8} {'原流程(ms)':>10} {'并发/短路(ms)':>14} {'启用缓存(ms)':>13}")
+    for label, user_id in USERS.items():
+        legacy_time = await measure(lambda uid: legacy_join(plugin, legacy_validator, uid), user_id)
+        cold_time = await measure(run_handler(cold), user_id)
+        warm_time = await measure(run_handler(warm), user_id)
+        print(f"{label:<8} {legacy_time:>10.2f} {cold_time:>14.2f} {warm_time:>13.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0))
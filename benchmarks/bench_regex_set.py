@@ -0,0 +1,85 @@
+"""
+正则规则合并基准测试
+
+对比 validate_request 原有的逐条 re.search 循环、规则引擎逐条匹配，
+以及 combined 模式下单次扫描判断是否匹配的耗时，找出合并正则的收益拐点。
+
+用法: python benchmarks/bench_regex_set.py
+"""
+
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gm_core.core.rule_engine import RuleEngine  # noqa: E402
+
+RULE_COUNTS = [1, 2, 4, 8, 16, 32, 64, 128]
+REQUEST_TEXT = "你好，我是来自计算机学院的同学，想加入本群一起交流学习，谢谢管理员" * 2
+
+
+PREFIXES = ["学号", "工号", "班级", "QQ", "微信", "手机"]
+
+
+def build_rules(count: int) -> list:
+    """生成不会匹配申请文本的正则规则（最坏情况：每条规则都要完整扫描）"""
+    rng = random.Random(count)
+    rules = []
+    for index in range(count):
+        prefix = rng.choice(PREFIXES)
+        rules.append({"type": "regex", "content": f"{prefix}[:：]?\\d{{{4 + index % 6},}}"})
+    return rules
+
+
+def legacy_loop(rules: list, text: str) -> list:
+    """validate_request 原有的规则循环"""
+    matched_rules = []
+    for rule in rules:
+        try:
+            if re.search(rule["content"], text):
+                matched_rules.append(rule)
+        except re.error:
+            continue
+    return matched_rules
+
+
+def main() -> None:
+    number = 2000
+    print(f"{'规则数':>6} {'原循环(us)':>12} {'逐条(us)':>10} {'合并(us)':>10} {'加速比':>8}")
+    speedups = []
+
+    for count in RULE_COUNTS:
+        rules = build_rules(count)
+        per_rule = RuleEngine(rules, regex_mode="per_rule")
+        combined = RuleEngine(rules, regex_mode="combined")
+
+        legacy_time = timeit.timeit(lambda rules=rules: legacy_loop(rules, REQUEST_TEXT), number=number)
+        per_rule_time = timeit.timeit(lambda engine=per_rule: engine.first_match(REQUEST_TEXT), number=number)
+        combined_time = timeit.timeit(lambda engine=combined: engine.first_match(REQUEST_TEXT), number=number)
+
+        speedup = per_rule_time / combined_time
+        speedups.append((count, speedup))
+        print(
+            f"{count:>6} {legacy_time / number * 1e6:>12.2f} "
+            f"{per_rule_time / number * 1e6:>10.2f} {combined_time / number * 1e6:>10.2f} "
+            f"{speedup:>7.2f}x"
+        )
+
+    # 拐点：从该规则数开始，合并模式始终快于逐条匹配
+    crossover = None
+    for count, speedup in reversed(speedups):
+        if speedup <= 1:
+            break
+        crossover = count
+
+    if crossover is None:
+        print("\n合并模式在测试范围内没有优势")
+    else:
+        print(f"\n拐点: 正则规则数 >= {crossover} 时合并模式更快")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,10 +12,12 @@ License: AGPL-v3
 __version__ = "1.0.0"
 __author__ = "Kush-ShuL"
 
-from .core.config import Config
-from .core.storage import Storage
+from .core.config import Config, ConfigSnapshot
+from .core.storage import Storage, GroupSnapshot
+from .core.id_set import IdSet, CompactIdSet, normalize_id
+from .core.global_blocklist import GlobalBlocklist
 from .core.validator import Validator
-from .core.validator import RuleType, ValidationResult
+from .core.validator import RuleType, ValidationResult, EvaluationMode, RegexBackend
 
 from .handlers.rule_handler import RuleHandler
 from .handlers.whitelist_blacklist_handler import WhitelistBlacklistHandler
@@ -24,17 +26,36 @@ from .handlers.group_join_request_handler import GroupJoinRequestHandler
 from .utils.message_builder import MessageBuilder
 from .utils.permission import is_admin
 from .utils.notification_manager import NotificationManager
+from .utils.notification_queue import NotificationQueue
+from .utils.notification_digest import NotificationDigest
+from .utils.rate_limiter import RateLimiter
+from .utils.retry_queue import RetryQueue, SendSkipped
+from .utils.circuit_breaker import CircuitBreakers
 
 __all__ = [
     "Config",
+    "ConfigSnapshot",
     "Storage",
+    "GroupSnapshot",
+    "IdSet",
+    "CompactIdSet",
+    "normalize_id",
+    "GlobalBlocklist",
     "Validator",
     "RuleType",
     "ValidationResult",
+    "EvaluationMode",
+    "RegexBackend",
     "RuleHandler",
     "WhitelistBlacklistHandler",
     "GroupJoinRequestHandler",
     "MessageBuilder",
     "is_admin",
     "NotificationManager",
+    "NotificationQueue",
+    "NotificationDigest",
+    "RateLimiter",
+    "RetryQueue",
+    "SendSkipped",
+    "CircuitBreakers",
 ]
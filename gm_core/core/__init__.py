@@ -4,8 +4,11 @@
 包含配置管理、数据存储和验证器等核心功能。
 """
 
-from .config import Config
-from .storage import Storage
-from .validator import Validator, RuleType, ValidationResult
+from .config import Config, ConfigSnapshot
+from .storage import Storage, GroupSnapshot
+from .id_set import IdSet, CompactIdSet, normalize_id
+from .global_blocklist import GlobalBlocklist
+from .validator import Validator, RuleType, ValidationResult, EvaluationMode, RegexBackend
 
-__all__ = ["Config", "Storage", "Validator", "RuleType", "ValidationResult"]
+__all__ = ["Config", "ConfigSnapshot", "Storage", "GroupSnapshot", "Validator", "RuleType", "ValidationResult", "EvaluationMode",
+           "RegexBackend", "IdSet", "CompactIdSet", "normalize_id", "GlobalBlocklist"]
@@ -2,24 +2,353 @@
 配置管理模块
 
 负责管理插件的配置项，包括管理员列表、默认模式等。
+原始配置在加载时编译为不可变的配置快照，配置变化时整体替换快照，
+正在处理的请求继续使用开始时取得的快照。
 """
 
-from typing import List, Optional
+import asyncio
+import json
+import string
+from enum import Enum, StrEnum
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 from astrbot.api.star import Context
+from astrbot.api import logger
+
+from .id_set import normalize_id
+
+
+class DefaultMode(StrEnum):
+    """未配置规则时的默认处理方式"""
+    ALLOW = "allow"
+    REJECT = "reject"
+
+
+class EvaluationMode(StrEnum):
+    """规则评估模式枚举"""
+    FIRST_MATCH = "first_match"
+    ALL_MATCHES = "all_matches"
+
+
+class KeywordMatchMode(StrEnum):
+    """关键词匹配模式枚举"""
+    AUTO = "auto"
+    SCAN = "scan"
+    AUTOMATON = "automaton"
+
+
+class RegexMatchMode(StrEnum):
+    """正则匹配模式枚举"""
+    PER_RULE = "per_rule"
+    COMBINED = "combined"
+
+
+class RegexExecutionMode(StrEnum):
+    """正则执行模式枚举"""
+    INLINE = "inline"
+    ISOLATED = "isolated"
+
+
+class StorageLayout(StrEnum):
+    """群数据存储布局枚举"""
+    KEYS = "keys"
+    SNAPSHOT = "snapshot"
+
+
+class StorageWriteMode(StrEnum):
+    """存储写入模式枚举"""
+    WRITE_THROUGH = "write_through"
+    WRITE_BEHIND = "write_behind"
+
+
+class NotificationDropPolicy(StrEnum):
+    """通知队列已满时的处理方式枚举"""
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    BLOCK = "block"
+
+
+DEFAULT_NOTIFICATION_MESSAGES = {
+    "request_received": "📢 收到新的加群申请\n\n群组: {group_name}\n申请人: {user_name}({user_id})\n申请理由: {reason}\n\n验证结果: {result}",
+    "request_approved": "✅ 加群申请已通过\n\n群组: {group_name}\n申请人: {user_name}({user_id})",
+    "request_rejected": "❌ 加群申请已拒绝\n\n群组: {group_name}\n申请人: {user_name}({user_id})\n原因: {reason}"
+}
+
+_CONVERSIONS = {"r": repr, "s": str, "a": ascii}
+
+
+class NotificationTemplate:
+    """预解析的通知消息模板，渲染时不再重复解析格式字符串"""
+
+    __slots__ = ("source", "_parts")
+
+    def __init__(self, source: str):
+        """
+        解析模板
+
+        Args:
+            source: str.format 风格的模板字符串
+        """
+        self.source = source
+        try:
+            self._parts: Tuple = tuple(string.Formatter().parse(source))
+        except ValueError:
+            # 花括号不成对时按纯文本处理
+            self._parts = ((source, None, None, None),)
+
+    def render(self, **values: Any) -> str:
+        """
+        渲染模板，模板中未知的占位符原样保留
+
+        Args:
+            **values: 占位符的值
+
+        Returns:
+            渲染后的消息
+        """
+        output = []
+        for literal, field, spec, conversion in self._parts:
+            output.append(literal)
+            if field is None:
+                continue
+            if field not in values:
+                output.append(f"{{{field}}}")
+                continue
+            value = values[field]
+            if conversion:
+                value = _CONVERSIONS.get(conversion, str)(value)
+            output.append(format(value, spec or ""))
+        return "".join(output)
+
+
+def _parse_enum(enum_type, value: Any, default: Enum) -> Enum:
+    """
+    把配置值解析为枚举，无效时使用默认值并记录警告
+
+    Args:
+        enum_type: 枚举类型
+        value: 配置值
+        default: 默认值
+
+    Returns:
+        枚举成员
+    """
+    try:
+        return enum_type(value)
+    except ValueError:
+        logger.warning(f"[GroupManager] 配置值 {value!r} 无效，使用默认值 {default.value}")
+        return default
+
+
+def _parse_number(number_type, name: str, value: Any, default):
+    """
+    把配置值解析为 int 或 float，无效时使用默认值并记录警告
+
+    Args:
+        number_type: int 或 float
+        name: 配置项名称
+        value: 配置值
+        default: 默认值
+
+    Returns:
+        解析后的数值
+    """
+    try:
+        return number_type(value)
+    except (TypeError, ValueError):
+        logger.warning(f"[GroupManager] 配置项 {name} 的值 {value!r} 无效，使用默认值 {default}")
+        return number_type(default)
+
+
+class ConfigSnapshot:
+    """不可变的配置快照"""
+
+    __slots__ = (
+        "enabled_groups", "admin_list", "admin_ids", "default_mode", "enable_logging",
+        "whitelist_priority", "blacklist_priority", "keyword_match_mode", "regex_match_mode",
+        "enable_admin_notification", "regex_execution_mode", "regex_timeout_ms",
+        "regex_workers", "storage_layout", "storage_cache_size", "storage_write_mode",
+        "write_behind_delay_ms", "write_behind_batch_size", "sync_admin_writes", "compact_id_threshold",
+        "linear_regex_groups", "global_blocklist_path",
+        "evaluation_mode", "adaptive_rule_order", "admin_notification_platform",
+        "admin_notification_messages", "notification_templates", "config_reload_interval",
+        "notification_concurrency", "notification_send_timeout_ms", "notification_workers",
+        "notification_queue_size", "notification_drop_policy", "notification_digest_window_s",
+        "notification_digest_immediate", "rate_limit_platform_per_s", "rate_limit_platform_burst",
+        "rate_limit_recipient_per_s", "rate_limit_recipient_burst", "notification_retry_max_attempts",
+        "notification_retry_base_delay_s", "notification_retry_max_delay_s", "notification_dead_letter_size",
+        "circuit_failure_threshold", "circuit_reset_timeout_s"
+    )
+
+    def __init__(self, raw: Mapping[str, Any]):
+        """
+        编译原始配置
+
+        Args:
+            raw: 原始配置字典
+        """
+        set_field = object.__setattr__
+        get = raw.get
+
+        def number(number_type, name: str, default):
+            return _parse_number(number_type, name, get(name, default), default)
+
+        set_field(self, "enabled_groups", frozenset(normalize_id(g) for g in get("enabled_groups", [])))
+        set_field(self, "admin_list", tuple(dict.fromkeys(normalize_id(a) for a in get("admin_list", []))))
+        set_field(self, "admin_ids", frozenset(self.admin_list))
+        set_field(self, "default_mode", _parse_enum(DefaultMode, get("default_mode", "allow"), DefaultMode.ALLOW))
+        set_field(self, "enable_logging", bool(get("enable_logging", True)))
+        set_field(self, "whitelist_priority", bool(get("whitelist_priority", True)))
+        set_field(self, "blacklist_priority", bool(get("blacklist_priority", True)))
+        set_field(self, "keyword_match_mode", _parse_enum(
+            KeywordMatchMode, get("keyword_match_mode", "auto"), KeywordMatchMode.AUTO
+        ))
+        set_field(self, "regex_match_mode", _parse_enum(
+            RegexMatchMode, get("regex_match_mode", "per_rule"), RegexMatchMode.PER_RULE
+        ))
+        set_field(self, "enable_admin_notification", bool(get("enable_admin_notification", True)))
+        set_field(self, "regex_execution_mode", _parse_enum(
+            RegexExecutionMode, get("regex_execution_mode", "inline"), RegexExecutionMode.INLINE
+        ))
+        set_field(self, "regex_timeout_ms", number(int, "regex_timeout_ms", 200))
+        set_field(self, "regex_workers", number(int, "regex_workers", 2))
+        set_field(self, "storage_layout", _parse_enum(
+            StorageLayout, get("storage_layout", "keys"), StorageLayout.KEYS
+        ))
+        set_field(self, "storage_cache_size", number(int, "storage_cache_size", 1024))
+        set_field(self, "storage_write_mode", _parse_enum(
+            StorageWriteMode, get("storage_write_mode", "write_through"), StorageWriteMode.WRITE_THROUGH
+        ))
+        set_field(self, "write_behind_delay_ms", number(int, "write_behind_delay_ms", 500))
+        set_field(self, "write_behind_batch_size", number(int, "write_behind_batch_size", 100))
+        set_field(self, "sync_admin_writes", bool(get("sync_admin_writes", True)))
+        set_field(self, "compact_id_threshold", number(int, "compact_id_threshold", 0))
+        set_field(self, "linear_regex_groups", frozenset(
+            normalize_id(g) for g in get("linear_regex_groups", [])
+        ))
+        set_field(self, "global_blocklist_path", str(get("global_blocklist_path", "") or "").strip())
+
+        # auto：未启用管理员通知时只需判断是否通过，使用 first_match
+        evaluation_mode = get("evaluation_mode", "auto")
+        if evaluation_mode == "auto":
+            evaluation_mode = "all_matches" if self.enable_admin_notification else "first_match"
+        set_field(self, "evaluation_mode", _parse_enum(
+            EvaluationMode, evaluation_mode, EvaluationMode.ALL_MATCHES
+        ))
+
+        set_field(self, "adaptive_rule_order", bool(get("adaptive_rule_order", True)))
+        set_field(self, "admin_notification_platform", get("admin_notification_platform", "qq"))
+
+        messages = dict(DEFAULT_NOTIFICATION_MESSAGES)
+        messages.update(get("admin_notification_messages", None) or {})
+        set_field(self, "admin_notification_messages", MappingProxyType(messages))
+        set_field(self, "notification_templates", MappingProxyType({
+            name: NotificationTemplate(source) for name, source in messages.items()
+        }))
+        set_field(self, "config_reload_interval", number(float, "config_reload_interval", 5))
+        set_field(self, "notification_concurrency", number(int, "notification_concurrency", 5))
+        set_field(self, "notification_send_timeout_ms", number(int, "notification_send_timeout_ms", 5000))
+        set_field(self, "notification_workers", number(int, "notification_workers", 2))
+        set_field(self, "notification_queue_size", number(int, "notification_queue_size", 1000))
+        set_field(self, "notification_drop_policy", _parse_enum(
+            NotificationDropPolicy, get("notification_drop_policy", "drop_newest"),
+            NotificationDropPolicy.DROP_NEWEST
+        ))
+        set_field(self, "notification_digest_window_s", number(float, "notification_digest_window_s", 0))
+        set_field(self, "notification_digest_immediate", frozenset(
+            str(result).strip().lower() for result in get("notification_digest_immediate", [])
+        ))
+        set_field(self, "rate_limit_platform_per_s", number(float, "rate_limit_platform_per_s", 5))
+        set_field(self, "rate_limit_platform_burst", number(int, "rate_limit_platform_burst", 10))
+        set_field(self, "rate_limit_recipient_per_s", number(float, "rate_limit_recipient_per_s", 1))
+        set_field(self, "rate_limit_recipient_burst", number(int, "rate_limit_recipient_burst", 3))
+        set_field(self, "notification_retry_max_attempts", number(int, "notification_retry_max_attempts", 5))
+        set_field(self, "notification_retry_base_delay_s", number(float, "notification_retry_base_delay_s", 30))
+        set_field(self, "notification_retry_max_delay_s", number(float, "notification_retry_max_delay_s", 3600))
+        set_field(self, "notification_dead_letter_size", number(int, "notification_dead_letter_size", 100))
+        set_field(self, "circuit_failure_threshold", number(int, "circuit_failure_threshold", 5))
+        set_field(self, "circuit_reset_timeout_s", number(float, "circuit_reset_timeout_s", 60))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("ConfigSnapshot 是不可变对象")
+
+    def is_group_enabled(self, group_id: str) -> bool:
+        """
+        检查群是否启用群管理功能
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            如果群启用返回 True，否则返回 False
+            如果未配置启用群列表，则所有群都启用
+        """
+        return not self.enabled_groups or normalize_id(group_id) in self.enabled_groups
+
+    def is_admin(self, user_id: str) -> bool:
+        """
+        检查用户是否为管理员
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            如果是管理员返回 True，否则返回 False
+            如果未配置管理员列表，则所有用户都是管理员
+        """
+        return not self.admin_ids or normalize_id(user_id) in self.admin_ids
 
 
 class Config:
     """插件配置管理类"""
 
-    def __init__(self, context: Context):
+    def __init__(self, context: Context, config: Optional[Mapping[str, Any]] = None):
         """
         初始化配置
 
         Args:
             context: AstrBot 上下文对象
+            config: 插件配置（AstrBot 传给插件的配置对象）；为空时使用 context.config，
+                context 本身是字典时直接作为配置使用
         """
         self.context = context
-        self.config_dict = context.config if hasattr(context, 'config') else {}
+        if config is None:
+            config = getattr(context, "config", None)
+        if config is None:
+            config = context if isinstance(context, Mapping) else {}
+        self.config_dict = config
+        self._fingerprint = self._compute_fingerprint()
+        self.snapshot = ConfigSnapshot(self.config_dict)
+
+    def _compute_fingerprint(self) -> str:
+        """计算原始配置的指纹，用于判断配置是否发生变化"""
+        return json.dumps(self.config_dict, sort_keys=True, ensure_ascii=False, default=str)
+
+    def reload(self) -> bool:
+        """
+        原始配置发生变化时重新编译并替换配置快照
+
+        Returns:
+            配置发生变化返回 True，否则返回 False
+        """
+        fingerprint = self._compute_fingerprint()
+        if fingerprint == self._fingerprint:
+            return False
+        snapshot = ConfigSnapshot(self.config_dict)
+        # 整体替换引用，已取得旧快照的请求不受影响
+        self._fingerprint = fingerprint
+        self.snapshot = snapshot
+        return True
+
+    async def watch(self) -> None:
+        """按 config_reload_interval 定期检查配置变化，间隔为 0 时退出"""
+        while self.snapshot.config_reload_interval > 0:
+            await asyncio.sleep(self.snapshot.config_reload_interval)
+            try:
+                if self.reload():
+                    logger.info("[GroupManager] 检测到配置变化，已重新加载配置")
+            except Exception as e:
+                logger.error(f"[GroupManager] 重新加载配置失败: {str(e)}")
 
     @property
     def enabled_groups(self) -> List[str]:
@@ -29,7 +358,7 @@ class Config:
         Returns:
             启用的群ID列表，如果未配置则返回空列表（表示所有群都启用）
         """
-        return self.config_dict.get("enabled_groups", [])
+        return list(self.snapshot.enabled_groups)
 
     def is_group_enabled(self, group_id: str) -> bool:
         """
@@ -42,9 +371,7 @@ class Config:
             如果群启用返回 True，否则返回 False
             如果未配置启用群列表，则所有群都启用
         """
-        if not self.enabled_groups:
-            return True
-        return str(group_id) in [str(g) for g in self.enabled_groups]
+        return self.snapshot.is_group_enabled(group_id)
 
     @property
     def admin_list(self) -> List[str]:
@@ -54,17 +381,17 @@ class Config:
         Returns:
             管理员ID列表，如果未配置则返回空列表
         """
-        return self.config_dict.get("admin_list", [])
+        return list(self.snapshot.admin_list)
 
     @property
-    def default_mode(self) -> str:
+    def default_mode(self) -> DefaultMode:
         """
         获取默认模式
 
         Returns:
             默认模式，可选值为 "allow" 或 "reject"
         """
-        return self.config_dict.get("default_mode", "allow")
+        return self.snapshot.default_mode
 
     @property
     def enable_logging(self) -> bool:
@@ -74,7 +401,7 @@ class Config:
         Returns:
             是否启用日志记录
         """
-        return self.config_dict.get("enable_logging", True)
+        return self.snapshot.enable_logging
 
     @property
     def whitelist_priority(self) -> bool:
@@ -84,7 +411,7 @@ class Config:
         Returns:
             白名单用户是否绕过规则验证直接通过
         """
-        return self.config_dict.get("whitelist_priority", True)
+        return self.snapshot.whitelist_priority
 
     @property
     def blacklist_priority(self) -> bool:
@@ -94,7 +421,27 @@ class Config:
         Returns:
             黑名单用户是否直接拒绝，即使匹配规则
         """
-        return self.config_dict.get("blacklist_priority", True)
+        return self.snapshot.blacklist_priority
+
+    @property
+    def keyword_match_mode(self) -> KeywordMatchMode:
+        """
+        获取关键词匹配模式
+
+        Returns:
+            "auto"（关键词较多时自动使用自动机）、"scan"（逐条扫描）或 "automaton"（总是使用自动机）
+        """
+        return self.snapshot.keyword_match_mode
+
+    @property
+    def regex_match_mode(self) -> RegexMatchMode:
+        """
+        获取正则匹配模式
+
+        Returns:
+            "per_rule"（逐条匹配）或 "combined"（合并为一个正则，单次扫描判断是否匹配）
+        """
+        return self.snapshot.regex_match_mode
 
     @property
     def enable_admin_notification(self) -> bool:
@@ -104,7 +451,148 @@ class Config:
         Returns:
             是否在收到加群申请时通知管理员
         """
-        return self.config_dict.get("enable_admin_notification", True)
+        return self.snapshot.enable_admin_notification
+
+    @property
+    def regex_execution_mode(self) -> RegexExecutionMode:
+        """
+        获取正则执行模式
+
+        Returns:
+            "inline"（在事件循环中执行）或 "isolated"（在工作进程中执行，带截止时间）
+        """
+        return self.snapshot.regex_execution_mode
+
+    @property
+    def regex_timeout_ms(self) -> int:
+        """
+        获取 isolated 模式下单次正则匹配请求的截止时间
+
+        Returns:
+            截止时间（毫秒）
+        """
+        return self.snapshot.regex_timeout_ms
+
+    @property
+    def regex_workers(self) -> int:
+        """
+        获取 isolated 模式下的工作进程数
+
+        Returns:
+            工作进程数
+        """
+        return self.snapshot.regex_workers
+
+    @property
+    def storage_layout(self) -> StorageLayout:
+        """
+        获取群数据的存储布局
+
+        Returns:
+            "keys"（每类数据一个键）或 "snapshot"（每个群一个带版本号的快照文档）
+        """
+        return self.snapshot.storage_layout
+
+    @property
+    def storage_cache_size(self) -> int:
+        """
+        获取存储缓存的最大键数
+
+        Returns:
+            最大键数，为 0 时不使用缓存
+        """
+        return self.snapshot.storage_cache_size
+
+    @property
+    def storage_write_mode(self) -> StorageWriteMode:
+        """
+        获取存储写入模式
+
+        Returns:
+            "write_through"（每次修改立即写入）或 "write_behind"（合并后批量写入）
+        """
+        return self.snapshot.storage_write_mode
+
+    @property
+    def write_behind_delay_ms(self) -> int:
+        """
+        获取 write_behind 模式下的合并窗口
+
+        Returns:
+            首次修改后等待多久落盘（毫秒）
+        """
+        return self.snapshot.write_behind_delay_ms
+
+    @property
+    def write_behind_batch_size(self) -> int:
+        """
+        获取 write_behind 模式下的批量上限
+
+        Returns:
+            待写键数达到该值时立即落盘
+        """
+        return self.snapshot.write_behind_batch_size
+
+    @property
+    def sync_admin_writes(self) -> bool:
+        """
+        获取 write_behind 模式下管理员变更是否立即落盘
+
+        Returns:
+            是否对群管理员变更强制同步写入
+        """
+        return self.snapshot.sync_admin_writes
+
+    @property
+    def compact_id_threshold(self) -> int:
+        """
+        获取使用紧凑集合保存名单的阈值
+
+        Returns:
+            名单达到该ID数时以排序的 u64 数组保存，为 0 时不使用
+        """
+        return self.snapshot.compact_id_threshold
+
+    @property
+    def linear_regex_groups(self) -> List[str]:
+        """
+        获取强制使用线性正则引擎的群ID列表
+
+        Returns:
+            群ID列表，这些群的管理员无法切换回标准库正则后端
+        """
+        return list(self.snapshot.linear_regex_groups)
+
+    @property
+    def global_blocklist_path(self) -> str:
+        """
+        获取全局黑名单文件路径
+
+        Returns:
+            排序的小端 u64 数组文件路径，为空时不使用全局黑名单
+        """
+        return self.snapshot.global_blocklist_path
+
+    @property
+    def evaluation_mode(self) -> EvaluationMode:
+        """
+        获取规则评估模式
+
+        Returns:
+            "first_match"（找到一条匹配即停止）或 "all_matches"（收集所有匹配的规则）
+            配置为 "auto" 时，未启用管理员通知则使用 "first_match"，否则使用 "all_matches"
+        """
+        return self.snapshot.evaluation_mode
+
+    @property
+    def adaptive_rule_order(self) -> bool:
+        """
+        获取是否启用自适应规则排序
+
+        Returns:
+            是否根据规则命中率和耗时调整首个匹配模式下的评估顺序
+        """
+        return self.snapshot.adaptive_rule_order
 
     @property
     def admin_notification_platform(self) -> str:
@@ -114,21 +602,187 @@ class Config:
         Returns:
             通知管理员的平台类型（qq、telegram、discord等）
         """
-        return self.config_dict.get("admin_notification_platform", "qq")
+        return self.snapshot.admin_notification_platform
 
     @property
-    def admin_notification_messages(self) -> dict:
+    def admin_notification_messages(self) -> Dict[str, str]:
         """
         获取通知消息模板
 
         Returns:
-            通知消息模板字典
+            通知消息模板字典（未配置的模板使用默认模板）
+        """
+        return dict(self.snapshot.admin_notification_messages)
+
+    @property
+    def notification_concurrency(self) -> int:
+        """
+        获取同一条通知同时发送给管理员的最大数量
+
+        Returns:
+            最大并发发送数
+        """
+        return self.snapshot.notification_concurrency
+
+    @property
+    def notification_send_timeout_ms(self) -> int:
+        """
+        获取单次私聊发送的超时时间
+
+        Returns:
+            超时时间（毫秒），为 0 时不限制
+        """
+        return self.snapshot.notification_send_timeout_ms
+
+    @property
+    def notification_workers(self) -> int:
+        """
+        获取通知队列的工作协程数
+
+        Returns:
+            工作协程数，为 0 时在处理加群申请时直接发送通知
+        """
+        return self.snapshot.notification_workers
+
+    @property
+    def notification_queue_size(self) -> int:
+        """
+        获取通知队列容量
+
+        Returns:
+            最多排队的通知数
         """
-        return self.config_dict.get("admin_notification_messages", {
-            "request_received": "📢 收到新的加群申请\n\n群组: {group_name}\n申请人: {user_name}({user_id})\n申请理由: {reason}\n\n验证结果: {result}",
-            "request_approved": "✅ 加群申请已通过\n\n群组: {group_name}\n申请人: {user_name}({user_id})",
-            "request_rejected": "❌ 加群申请已拒绝\n\n群组: {group_name}\n申请人: {user_name}({user_id})\n原因: {reason}"
-        })
+        return self.snapshot.notification_queue_size
+
+    @property
+    def notification_drop_policy(self) -> NotificationDropPolicy:
+        """
+        获取通知队列已满时的处理方式
+
+        Returns:
+            "drop_newest"、"drop_oldest" 或 "block"
+        """
+        return self.snapshot.notification_drop_policy
+
+    @property
+    def notification_digest_window_s(self) -> float:
+        """
+        获取通知汇总窗口
+
+        Returns:
+            汇总窗口（秒），为 0 时每次申请单独通知
+        """
+        return self.snapshot.notification_digest_window_s
+
+    @property
+    def notification_digest_immediate(self) -> List[str]:
+        """
+        获取汇总模式下仍立即通知的验证结果
+
+        Returns:
+            验证结果列表（allow、reject、whitelisted、blacklisted）
+        """
+        return sorted(self.snapshot.notification_digest_immediate)
+
+    @property
+    def rate_limit_platform_per_s(self) -> float:
+        """
+        获取每个平台的发送速率上限
+
+        Returns:
+            每秒发送的消息数，为 0 时不限制
+        """
+        return self.snapshot.rate_limit_platform_per_s
+
+    @property
+    def rate_limit_platform_burst(self) -> int:
+        """
+        获取每个平台允许的突发发送数
+
+        Returns:
+            令牌桶容量
+        """
+        return self.snapshot.rate_limit_platform_burst
+
+    @property
+    def rate_limit_recipient_per_s(self) -> float:
+        """
+        获取每个接收者的发送速率上限
+
+        Returns:
+            每秒发送的消息数，为 0 时不限制
+        """
+        return self.snapshot.rate_limit_recipient_per_s
+
+    @property
+    def rate_limit_recipient_burst(self) -> int:
+        """
+        获取每个接收者允许的突发发送数
+
+        Returns:
+            令牌桶容量
+        """
+        return self.snapshot.rate_limit_recipient_burst
+
+    @property
+    def notification_retry_max_attempts(self) -> int:
+        """
+        获取发送失败的通知最多重试的次数
+
+        Returns:
+            重试次数，为 0 时失败的通知直接进入死信列表
+        """
+        return self.snapshot.notification_retry_max_attempts
+
+    @property
+    def notification_retry_base_delay_s(self) -> float:
+        """
+        获取第一次重试前的基础等待时间，之后每次重试翻倍
+
+        Returns:
+            基础等待时间（秒）
+        """
+        return self.snapshot.notification_retry_base_delay_s
+
+    @property
+    def notification_retry_max_delay_s(self) -> float:
+        """
+        获取两次重试之间的最长等待时间
+
+        Returns:
+            最长等待时间（秒）
+        """
+        return self.snapshot.notification_retry_max_delay_s
+
+    @property
+    def notification_dead_letter_size(self) -> int:
+        """
+        获取死信列表保留的最大通知数
+
+        Returns:
+            死信列表容量
+        """
+        return self.snapshot.notification_dead_letter_size
+
+    @property
+    def circuit_failure_threshold(self) -> int:
+        """
+        获取打开通知熔断器的连续失败次数
+
+        Returns:
+            连续失败次数，为 0 时不熔断
+        """
+        return self.snapshot.circuit_failure_threshold
+
+    @property
+    def circuit_reset_timeout_s(self) -> float:
+        """
+        获取熔断器打开后进入半开状态、放行探测发送的时间
+
+        Returns:
+            等待时间（秒）
+        """
+        return self.snapshot.circuit_reset_timeout_s
 
     def is_admin(self, user_id: str) -> bool:
         """
@@ -141,7 +795,4 @@ class Config:
             如果是管理员返回 True，否则返回 False
             如果未配置管理员列表，则所有用户都是管理员
         """
-        if not self.admin_list:
-            return True
-
-        return str(user_id) in [str(a) for a in self.admin_list]
+        return self.snapshot.is_admin(user_id)
@@ -0,0 +1,170 @@
+"""
+全局黑名单模块
+
+全局黑名单文件是排序、去重的小端 u64 数组（每个ID 8 字节，无文件头）。
+文件以只读方式内存映射，成员检查在映射上二分查找，不把文件读入进程内存；
+同一台机器上的多个工作进程共享操作系统的页缓存。
+
+文件被替换（写入临时文件后 rename）时，下一次检查会映射新文件并整体切换，
+之前的映射在切换后关闭。文件只能整体替换，不能原地改写：截断正在映射的文件
+会使读取映射的进程收到 SIGBUS。
+"""
+
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterable, Optional, Sequence, Tuple
+
+from astrbot.api import logger
+
+from .id_set import normalize_id, parse_u64
+
+# 每个ID的字节数
+RECORD_SIZE = 8
+
+_RECORD = struct.Struct("<Q")
+
+
+class _BigEndianView(Sequence):
+    """在大端机器上按小端读取映射中的记录"""
+
+    def __init__(self, buffer: mmap.mmap):
+        self._buffer = buffer
+        self._length = len(buffer) // RECORD_SIZE
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: int) -> int:
+        return _RECORD.unpack_from(self._buffer, index * RECORD_SIZE)[0]
+
+
+def write_blocklist(path: str, user_ids: Iterable[Any]) -> int:
+    """
+    生成全局黑名单文件：数字ID排序去重后写入临时文件，再原子替换目标文件
+
+    Args:
+        path: 文件路径
+        user_ids: 用户ID，非数字ID会被跳过
+
+    Returns:
+        写入的ID数量
+    """
+    numbers = array("Q", sorted({
+        number for number in (parse_u64(normalize_id(user_id)) for user_id in user_ids)
+        if number is not None
+    }))
+    if sys.byteorder == "big":
+        numbers.byteswap()
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        numbers.tofile(f)
+    os.replace(temp_path, path)
+    return len(numbers)
+
+
+class GlobalBlocklist:
+    """内存映射的全局黑名单"""
+
+    def __init__(self, path: str, check_interval: float = 5.0):
+        """
+        初始化全局黑名单并映射文件
+
+        Args:
+            path: 全局黑名单文件路径
+            check_interval: 检查文件是否被替换的最小间隔（秒）
+        """
+        self.path = path
+        self.check_interval = check_interval
+        self.reload_count = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._records: Sequence[int] = ()
+        # 已映射文件的 (设备, inode, 大小, 修改时间)，用于发现文件被替换
+        self._signature: Optional[Tuple[int, int, int, int]] = None
+        self._next_check = 0.0
+        self._missing = False
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, user_id: Any) -> bool:
+        self._maybe_reload()
+        number = parse_u64(normalize_id(user_id))
+        if number is None:
+            return False
+        records = self._records
+        index = bisect_left(records, number)
+        return index < len(records) and records[index] == number
+
+    def _maybe_reload(self) -> None:
+        """距上次检查超过间隔时检查文件是否被替换"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        self.reload()
+
+    def reload(self) -> bool:
+        """
+        文件发生变化时重新映射，新文件无效时保留当前映射
+
+        Returns:
+            重新映射返回 True，文件未变化或无效时返回 False
+        """
+        try:
+            f = open(self.path, "rb")
+        except OSError as e:
+            # 文件暂时不可用时保留当前映射，避免误放行
+            if not self._missing:
+                logger.warning(f"[GroupManager] 无法读取全局黑名单文件 {self.path}: {str(e)}")
+                self._missing = True
+            return False
+        self._missing = False
+
+        with f:
+            # 使用已打开文件的状态，避免检查与映射之间文件再次被替换
+            stat = os.fstat(f.fileno())
+            signature = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if signature == self._signature:
+                return False
+
+            if stat.st_size % RECORD_SIZE:
+                logger.error(
+                    f"[GroupManager] 全局黑名单文件大小 {stat.st_size} 不是 {RECORD_SIZE} 的整数倍，忽略该文件"
+                )
+                self._signature = signature
+                return False
+
+            new_mmap = None
+            records: Sequence[int] = ()
+            if stat.st_size:
+                new_mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if sys.byteorder == "little":
+                    records = memoryview(new_mmap).cast("Q")
+                else:
+                    records = _BigEndianView(new_mmap)
+
+        old_mmap, old_records = self._mmap, self._records
+        self._mmap, self._records, self._signature = new_mmap, records, signature
+        self.reload_count += 1
+        self._release(old_mmap, old_records)
+        logger.info(f"[GroupManager] 已加载全局黑名单: {self.path}, 共 {len(records)} 个ID")
+        return True
+
+    @staticmethod
+    def _release(buffer: Optional[mmap.mmap], records: Sequence[int]) -> None:
+        """释放旧映射"""
+        if isinstance(records, memoryview):
+            records.release()
+        if buffer is not None:
+            buffer.close()
+
+    def close(self) -> None:
+        """关闭映射"""
+        self._release(self._mmap, self._records)
+        self._mmap, self._records, self._signature = None, (), None
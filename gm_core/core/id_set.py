@@ -0,0 +1,371 @@
+"""
+用户ID集合模块
+
+统一用户ID的规范化方式，并提供基于哈希的有序ID集合，
+用于白名单、黑名单和管理员列表的成员检查。
+
+超大名单可以使用紧凑集合：数字ID保存在排序的 array('Q') 中，二分查找成员，
+持久化为 base64 编码的小端 u64 数组；非数字ID退回为字符串保存。
+"""
+
+import base64
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+# 紧凑集合持久化格式标记
+COMPACT_FORMAT = "u64"
+
+_U64_MAX = 2 ** 64 - 1
+
+
+def normalize_id(user_id: Any) -> str:
+    """
+    把用户ID规范化为字符串，整数和字符串形式的同一ID得到相同结果
+
+    Args:
+        user_id: 用户ID（字符串或整数）
+
+    Returns:
+        规范化后的用户ID
+    """
+    return str(user_id).strip()
+
+
+class IdSet:
+    """保持插入顺序的用户ID集合，成员检查为 O(1)"""
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, ids: Optional[Iterable[Any]] = None):
+        """
+        初始化集合
+
+        Args:
+            ids: 初始用户ID（重复的ID会被合并）
+        """
+        # dict 的键同时提供哈希查找和插入顺序
+        self._ids = dict.fromkeys(normalize_id(user_id) for user_id in ids or ())
+
+    def __contains__(self, user_id: Any) -> bool:
+        return normalize_id(user_id) in self._ids
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __bool__(self) -> bool:
+        return bool(self._ids)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, IdSet):
+            return list(self._ids) == list(other._ids)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"IdSet({list(self._ids)!r})"
+
+    def copy(self) -> "IdSet":
+        """返回集合的副本"""
+        duplicate = IdSet()
+        duplicate._ids = self._ids.copy()
+        return duplicate
+
+    __copy__ = copy
+
+    def add(self, user_id: Any) -> bool:
+        """
+        添加用户ID
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            如果添加成功返回 True，如果已存在返回 False
+        """
+        key = normalize_id(user_id)
+        if key in self._ids:
+            return False
+        self._ids[key] = None
+        return True
+
+    def update(self, user_ids: Iterable[Any]) -> int:
+        """
+        批量添加用户ID，一次遍历完成去重
+
+        Args:
+            user_ids: 用户ID（可为生成器）
+
+        Returns:
+            新添加的ID数量
+        """
+        before = len(self._ids)
+        for user_id in user_ids:
+            self._ids.setdefault(normalize_id(user_id))
+        return len(self._ids) - before
+
+    def discard(self, user_id: Any) -> bool:
+        """
+        移除用户ID
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            如果移除成功返回 True，如果不存在返回 False
+        """
+        key = normalize_id(user_id)
+        if key not in self._ids:
+            return False
+        del self._ids[key]
+        return True
+
+    def to_list(self) -> List[str]:
+        """
+        转换为持久化用的列表（规范化、去重、保持插入顺序）
+
+        Returns:
+            用户ID列表
+        """
+        return list(self._ids)
+
+    def dump(self) -> List[str]:
+        """
+        转换为持久化形式
+
+        Returns:
+            用户ID列表
+        """
+        return self.to_list()
+
+
+def parse_u64(user_id: str) -> Optional[int]:
+    """
+    把规范化后的用户ID转换为 u64，无法无损往返的ID（非数字、前导零、超出范围）返回 None
+
+    Args:
+        user_id: 规范化后的用户ID
+
+    Returns:
+        整数ID或 None
+    """
+    if not (user_id.isascii() and user_id.isdigit()) or (len(user_id) > 1 and user_id[0] == "0"):
+        return None
+    value = int(user_id)
+    return value if value <= _U64_MAX else None
+
+
+class CompactIdSet:
+    """
+    紧凑的用户ID集合
+
+    数字ID保存在排序的 array('Q') 中（每个ID 8 字节），成员检查为 O(log n)；
+    非数字ID保存在字典中。迭代顺序为数字ID升序，之后是非数字ID的插入顺序。
+    """
+
+    __slots__ = ("_numbers", "_others")
+
+    def __init__(self, ids: Optional[Iterable[Any]] = None):
+        """
+        初始化集合
+
+        Args:
+            ids: 初始用户ID（重复的ID会被合并）
+        """
+        self._numbers = array("Q")
+        self._others: Dict[str, None] = {}
+        if ids:
+            self.update(ids)
+
+    @classmethod
+    def from_dump(cls, data: Dict[str, Any]) -> "CompactIdSet":
+        """
+        从持久化形式恢复集合
+
+        Args:
+            data: dump() 的返回值
+
+        Returns:
+            ID集合
+        """
+        id_set = cls()
+        id_set._numbers.frombytes(base64.b64decode(data.get("ids", "")))
+        if sys.byteorder == "big":
+            id_set._numbers.byteswap()
+        id_set._others = dict.fromkeys(data.get("others", []))
+        return id_set
+
+    def __contains__(self, user_id: Any) -> bool:
+        key = normalize_id(user_id)
+        number = parse_u64(key)
+        if number is None:
+            return key in self._others
+        index = bisect_left(self._numbers, number)
+        return index < len(self._numbers) and self._numbers[index] == number
+
+    def __iter__(self) -> Iterator[str]:
+        for number in self._numbers:
+            yield str(number)
+        yield from self._others
+
+    def __len__(self) -> int:
+        return len(self._numbers) + len(self._others)
+
+    def __bool__(self) -> bool:
+        return bool(self._numbers) or bool(self._others)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CompactIdSet):
+            return self._numbers == other._numbers and list(self._others) == list(other._others)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"CompactIdSet(numbers={len(self._numbers)}, others={len(self._others)})"
+
+    def copy(self) -> "CompactIdSet":
+        """返回集合的副本"""
+        duplicate = CompactIdSet()
+        duplicate._numbers = array("Q", self._numbers)
+        duplicate._others = self._others.copy()
+        return duplicate
+
+    __copy__ = copy
+
+    def add(self, user_id: Any) -> bool:
+        """
+        添加用户ID
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            如果添加成功返回 True，如果已存在返回 False
+        """
+        key = normalize_id(user_id)
+        number = parse_u64(key)
+        if number is None:
+            if key in self._others:
+                return False
+            self._others[key] = None
+            return True
+        index = bisect_left(self._numbers, number)
+        if index < len(self._numbers) and self._numbers[index] == number:
+            return False
+        self._numbers.insert(index, number)
+        return True
+
+    def update(self, user_ids: Iterable[Any]) -> int:
+        """
+        批量添加用户ID，新的数字ID排序后与现有数组合并一次
+
+        Args:
+            user_ids: 用户ID（可为生成器）
+
+        Returns:
+            新添加的ID数量
+        """
+        before = len(self)
+        numbers = set()
+        for user_id in user_ids:
+            key = normalize_id(user_id)
+            number = parse_u64(key)
+            if number is None:
+                self._others.setdefault(key)
+            else:
+                numbers.add(number)
+        if numbers:
+            numbers.update(self._numbers)
+            self._numbers = array("Q", sorted(numbers))
+        return len(self) - before
+
+    def discard(self, user_id: Any) -> bool:
+        """
+        移除用户ID
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            如果移除成功返回 True，如果不存在返回 False
+        """
+        key = normalize_id(user_id)
+        number = parse_u64(key)
+        if number is None:
+            if key not in self._others:
+                return False
+            del self._others[key]
+            return True
+        index = bisect_left(self._numbers, number)
+        if index == len(self._numbers) or self._numbers[index] != number:
+            return False
+        del self._numbers[index]
+        return True
+
+    def to_list(self) -> List[str]:
+        """
+        转换为用户ID列表
+
+        Returns:
+            用户ID列表
+        """
+        return list(self)
+
+    def dump(self) -> Dict[str, Any]:
+        """
+        转换为持久化形式：base64 编码的小端 u64 数组和非数字ID列表
+
+        Returns:
+            可 JSON 序列化的字典
+        """
+        numbers = self._numbers
+        if sys.byteorder == "big":
+            numbers = array("Q", numbers)
+            numbers.byteswap()
+        return {
+            "format": COMPACT_FORMAT,
+            "ids": base64.b64encode(numbers.tobytes()).decode("ascii"),
+            "others": list(self._others)
+        }
+
+
+AnyIdSet = Union[IdSet, CompactIdSet]
+
+
+def fit_id_set(id_set: AnyIdSet, compact_threshold: int) -> AnyIdSet:
+    """
+    按集合大小选择表示形式：达到阈值时使用紧凑集合，否则使用普通集合
+
+    Args:
+        id_set: ID集合
+        compact_threshold: 使用紧凑集合的最小ID数，为 0 时不使用紧凑集合
+
+    Returns:
+        合适表示形式的集合（无需转换时返回原集合）
+    """
+    compact = 0 < compact_threshold <= len(id_set)
+    if compact and not isinstance(id_set, CompactIdSet):
+        return CompactIdSet(id_set)
+    if not compact and isinstance(id_set, CompactIdSet):
+        return IdSet(id_set)
+    return id_set
+
+
+def load_id_set(data: Any, compact_threshold: int = 0) -> AnyIdSet:
+    """
+    从持久化形式（ID列表或紧凑集合字典）恢复ID集合
+
+    Args:
+        data: 持久化的值
+        compact_threshold: 使用紧凑集合的最小ID数，为 0 时不使用紧凑集合
+
+    Returns:
+        ID集合
+    """
+    if isinstance(data, dict) and data.get("format") == COMPACT_FORMAT:
+        id_set = CompactIdSet.from_dump(data)
+    else:
+        id_set = IdSet(data or ())
+    return fit_id_set(id_set, compact_threshold)
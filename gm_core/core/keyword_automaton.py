@@ -0,0 +1,86 @@
+"""
+关键词自动机模块
+
+基于 Aho-Corasick 算法，一次扫描文本即可找出所有出现的关键词。
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, Set
+
+
+class KeywordAutomaton:
+    """Aho-Corasick 多关键词匹配自动机"""
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        构建自动机
+
+        Args:
+            keywords: 关键词集合（重复的关键词会被合并）
+        """
+        self.keywords: List[str] = list(dict.fromkeys(keywords))
+        # 空关键词与 `"" in text` 的语义一致：总是匹配
+        self._always: List[int] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for keyword_id, keyword in enumerate(self.keywords):
+            if not keyword:
+                self._always.append(keyword_id)
+                continue
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(keyword_id)
+
+        self._build_fail_links()
+
+    def _build_fail_links(self) -> None:
+        """广度优先计算失败指针，并把后缀状态的输出合并到当前状态"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find_all(self, text: str) -> Set[str]:
+        """
+        一次扫描返回文本中出现的所有关键词
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            出现的关键词集合
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        found: Set[int] = set(self._always)
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+
+        return {self.keywords[keyword_id] for keyword_id in found}
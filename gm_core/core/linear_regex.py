@@ -0,0 +1,370 @@
+"""
+线性时间正则引擎模块
+
+将标准库正则解析器产生的语法树编译为 Thompson NFA，并在匹配时按需构建 DFA 状态，
+保证匹配耗时与文本长度成线性关系，不会出现灾难性回溯。
+
+仅支持不需要回溯的正则子集：反向引用、前后查找断言、条件分组、原子分组和占有量词会被拒绝。
+"""
+
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+try:
+    from re import _compiler as sre_compile
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_compile
+    import sre_constants
+    import sre_parse
+
+
+# NFA 状态数量上限，防止 {m,n} 展开后过大
+MAX_STATES = 20000
+
+# 惰性 DFA 缓存的状态数量上限，超过后在下一次匹配前清空
+MAX_CACHED_STATES = 4096
+
+# NFA 状态类型
+_CHAR = 0
+_SPLIT = 1
+_ASSERT = 2
+_MATCH = 3
+
+# 位置上下文：前一个字符的类别
+_PREV_START = 0
+_PREV_NEWLINE = 1
+_PREV_WORD = 2
+_PREV_OTHER = 3
+
+# 位置上下文：当前字符的类别
+_CUR_END = 0
+_CUR_NEWLINE = 1
+_CUR_LAST_NEWLINE = 2
+_CUR_WORD = 3
+_CUR_OTHER = 4
+
+# 需要回溯才能实现、线性引擎不支持的语法
+_UNSUPPORTED = {
+    sre_constants.GROUPREF: "反向引用",
+    sre_constants.GROUPREF_EXISTS: "条件分组",
+    sre_constants.ASSERT: "前后查找断言",
+    sre_constants.ASSERT_NOT: "前后查找断言",
+}
+for _name, _description in (("ATOMIC_GROUP", "原子分组"), ("POSSESSIVE_REPEAT", "占有量词")):
+    if hasattr(sre_constants, _name):
+        _UNSUPPORTED[getattr(sre_constants, _name)] = _description
+
+# 只消耗一个字符的语法，交给标准库编译为单字符判断函数，保证大小写折叠和字符类别语义与 re 一致
+_SINGLE_CHAR_OPS = (
+    sre_constants.LITERAL,
+    sre_constants.NOT_LITERAL,
+    sre_constants.ANY,
+    sre_constants.IN,
+)
+
+# Python 3.14 之前 \B 不匹配空字符串，与当前解释器的 re 行为保持一致
+_NON_BOUNDARY_MATCHES_EMPTY = re.search(r"\B", "") is not None
+
+
+class LinearRegexError(ValueError):
+    """正则表达式不受线性引擎支持"""
+
+
+class _Compiler:
+    """把正则语法树编译为 NFA"""
+
+    def __init__(self, state):
+        self.state = state
+        self.global_flags = state.flags
+        self.kinds: List[int] = []
+        self.preds: List[Optional[Callable[[str], object]]] = []
+        self.outs: List[List[int]] = []
+        self.asserts: List[Optional[str]] = []
+        self.has_assertions = False
+
+    def new_state(self, kind: int, pred=None, outs=None, assertion=None) -> int:
+        if len(self.kinds) >= MAX_STATES:
+            raise LinearRegexError("正则表达式展开后过于复杂")
+        self.kinds.append(kind)
+        self.preds.append(pred)
+        self.outs.append(outs if outs is not None else [])
+        self.asserts.append(assertion)
+        return len(self.kinds) - 1
+
+    def _char_predicate(self, op, value, flags: int) -> Callable[[str], object]:
+        """把单字符语法编译为判断函数，局部标志通过 SUBPATTERN 节点保留"""
+        item = sre_parse.SubPattern(self.state, [(op, value)])
+        add_flags = flags & ~self.global_flags
+        del_flags = self.global_flags & ~flags
+        if add_flags or del_flags:
+            item = sre_parse.SubPattern(
+                self.state, [(sre_constants.SUBPATTERN, (None, add_flags, del_flags, item))]
+            )
+        return sre_compile.compile(item, self.global_flags).fullmatch
+
+    def compile_sequence(self, items, flags: int, next_state: int) -> int:
+        """从右向左编译一个序列，返回序列的起始状态"""
+        for op, value in reversed(list(items)):
+            next_state = self.compile_item(op, value, flags, next_state)
+        return next_state
+
+    def compile_item(self, op, value, flags: int, next_state: int) -> int:
+        if op in _UNSUPPORTED:
+            raise LinearRegexError(f"线性引擎不支持{_UNSUPPORTED[op]}")
+
+        if op in _SINGLE_CHAR_OPS:
+            return self.new_state(
+                _CHAR, pred=self._char_predicate(op, value, flags), outs=[next_state]
+            )
+
+        if op is sre_constants.BRANCH:
+            starts = [self.compile_sequence(branch, flags, next_state) for branch in value[1]]
+            return self.new_state(_SPLIT, outs=starts)
+
+        if op is sre_constants.SUBPATTERN:
+            _, add_flags, del_flags, pattern = value
+            return self.compile_sequence(pattern, (flags | add_flags) & ~del_flags, next_state)
+
+        if op is sre_constants.MAX_REPEAT or op is sre_constants.MIN_REPEAT:
+            # 只判断是否匹配时，贪婪与非贪婪量词等价
+            minimum, maximum, pattern = value
+            if maximum == sre_constants.MAXREPEAT:
+                loop = self.new_state(_SPLIT)
+                self.outs[loop] = [self.compile_sequence(pattern, flags, loop), next_state]
+                next_state = loop
+            else:
+                for _ in range(maximum - minimum):
+                    body = self.compile_sequence(pattern, flags, next_state)
+                    next_state = self.new_state(_SPLIT, outs=[body, next_state])
+            for _ in range(minimum):
+                next_state = self.compile_sequence(pattern, flags, next_state)
+            return next_state
+
+        if op is sre_constants.AT:
+            self.has_assertions = True
+            return self.new_state(
+                _ASSERT, outs=[next_state], assertion=self._assertion_name(value, flags)
+            )
+
+        raise LinearRegexError(f"线性引擎不支持该语法: {op}")
+
+    @staticmethod
+    def _assertion_name(at_code, flags: int) -> str:
+        name = str(at_code)
+        multiline = bool(flags & sre_constants.SRE_FLAG_MULTILINE)
+        if name == "AT_BEGINNING":
+            return "bol" if multiline else "bos"
+        if name == "AT_BEGINNING_STRING":
+            return "bos"
+        if name == "AT_END":
+            return "eol" if multiline else "eos_or_final_newline"
+        if name == "AT_END_STRING":
+            return "eos"
+        if name in ("AT_BOUNDARY", "AT_UNI_BOUNDARY"):
+            return "boundary"
+        if name in ("AT_NON_BOUNDARY", "AT_UNI_NON_BOUNDARY"):
+            return "non_boundary"
+        raise LinearRegexError(f"线性引擎不支持该断言: {name}")
+
+
+def _assertion_holds(assertion: str, prev_class: int, cur_class: int) -> bool:
+    """判断位置断言在给定上下文中是否成立"""
+    if assertion == "bos":
+        return prev_class == _PREV_START
+    if assertion == "bol":
+        return prev_class in (_PREV_START, _PREV_NEWLINE)
+    if assertion == "eos":
+        return cur_class == _CUR_END
+    if assertion == "eos_or_final_newline":
+        return cur_class in (_CUR_END, _CUR_LAST_NEWLINE)
+    if assertion == "eol":
+        return cur_class in (_CUR_END, _CUR_NEWLINE, _CUR_LAST_NEWLINE)
+    at_boundary = (prev_class == _PREV_WORD) != (cur_class == _CUR_WORD)
+    if assertion == "boundary":
+        return at_boundary
+    if prev_class == _PREV_START and cur_class == _CUR_END:
+        return _NON_BOUNDARY_MATCHES_EMPTY
+    return not at_boundary
+
+
+class LinearPattern:
+    """线性时间正则表达式"""
+
+    def __init__(self, pattern: str, flags: int = 0):
+        """
+        编译正则表达式
+
+        Args:
+            pattern: 正则表达式
+            flags: 正则标志
+
+        Raises:
+            re.error: 正则表达式语法错误
+            LinearRegexError: 正则表达式使用了线性引擎不支持的语法
+        """
+        self.pattern = pattern
+        parsed = sre_parse.parse(pattern, flags)
+        self.flags = parsed.state.flags
+        if self.flags & sre_constants.SRE_FLAG_LOCALE:
+            raise LinearRegexError("线性引擎不支持 LOCALE 标志")
+
+        compiler = _Compiler(parsed.state)
+        match_state = compiler.new_state(_MATCH)
+        self._start = compiler.compile_sequence(parsed, self.flags, match_state)
+        self._kinds = compiler.kinds
+        self._preds = compiler.preds
+        self._outs = compiler.outs
+        self._asserts = compiler.asserts
+        self._has_assertions = compiler.has_assertions
+        self._is_word = re.compile(r"\w", self.flags & re.ASCII).fullmatch
+        self._char_classes: Dict[str, Tuple[int, int]] = {}
+        self._reset_cache()
+
+    def _reset_cache(self) -> None:
+        """清空惰性 DFA 缓存"""
+        self._set_ids: Dict[FrozenSet[int], int] = {}
+        self._sets: List[FrozenSet[int]] = []
+        # 状态集ID -> 上下文 -> (闭包状态集ID, 是否匹配)
+        self._closures: List[Dict[Tuple[int, int], Tuple[int, bool]]] = []
+        # 闭包状态集ID -> 字符 -> 下一个状态集ID
+        self._steps: List[Dict[str, int]] = []
+
+    def _intern(self, states: FrozenSet[int]) -> int:
+        set_id = self._set_ids.get(states)
+        if set_id is None:
+            set_id = len(self._sets)
+            self._set_ids[states] = set_id
+            self._sets.append(states)
+            self._closures.append({})
+            self._steps.append({})
+        return set_id
+
+    def _closure(self, set_id: int, context: Tuple[int, int]) -> Tuple[int, bool]:
+        """计算状态集（加上起始状态）在给定上下文中的 epsilon 闭包"""
+        kinds = self._kinds
+        outs = self._outs
+        stack = [self._start, *self._sets[set_id]]
+        seen = set()
+        closed = set()
+        matched = False
+
+        while stack:
+            state = stack.pop()
+            if state in seen:
+                continue
+            seen.add(state)
+            kind = kinds[state]
+            if kind == _CHAR:
+                closed.add(state)
+            elif kind == _SPLIT:
+                stack.extend(outs[state])
+            elif kind == _ASSERT:
+                if _assertion_holds(self._asserts[state], *context):
+                    stack.extend(outs[state])
+            else:
+                matched = True
+
+        result = (self._intern(frozenset(closed)), matched)
+        self._closures[set_id][context] = result
+        return result
+
+    def _step(self, closed_id: int, char: str) -> int:
+        """计算闭包状态集读入一个字符后的状态集"""
+        preds = self._preds
+        outs = self._outs
+        next_states = frozenset(
+            outs[state][0] for state in self._sets[closed_id] if preds[state](char)
+        )
+        next_id = self._intern(next_states)
+        self._steps[closed_id][char] = next_id
+        return next_id
+
+    def _char_context(self, char: str) -> Tuple[int, int]:
+        """
+        获取字符分别作为前一个字符和当前字符（非末尾）时的类别
+
+        Args:
+            char: 字符
+
+        Returns:
+            (作为前一个字符的类别, 作为当前字符的类别)
+        """
+        classes = self._char_classes.get(char)
+        if classes is None:
+            if char == "\n":
+                classes = (_PREV_NEWLINE, _CUR_NEWLINE)
+            elif self._is_word(char):
+                classes = (_PREV_WORD, _CUR_WORD)
+            else:
+                classes = (_PREV_OTHER, _CUR_OTHER)
+            self._char_classes[char] = classes
+        return classes
+
+    def search(self, text: str) -> bool:
+        """
+        判断文本中是否存在匹配，耗时与文本长度成线性关系
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            是否匹配
+        """
+        if len(self._sets) > MAX_CACHED_STATES:
+            self._reset_cache()
+
+        closures = self._closures
+        steps = self._steps
+        length = len(text)
+        has_assertions = self._has_assertions
+        current = self._intern(frozenset())
+        context = (_PREV_START, _CUR_END)
+        prev_class = _PREV_START
+
+        for position in range(length + 1):
+            if has_assertions:
+                if position == length:
+                    cur_class = _CUR_END
+                else:
+                    next_prev_class, cur_class = self._char_context(text[position])
+                    if cur_class == _CUR_NEWLINE and position == length - 1:
+                        cur_class = _CUR_LAST_NEWLINE
+                context = (prev_class, cur_class)
+
+            closure = closures[current].get(context)
+            if closure is None:
+                closure = self._closure(current, context)
+            closed_id, matched = closure
+            if matched:
+                return True
+            if position == length:
+                break
+
+            char = text[position]
+            next_id = steps[closed_id].get(char)
+            if next_id is None:
+                next_id = self._step(closed_id, char)
+            current = next_id
+            if has_assertions:
+                prev_class = next_prev_class
+
+        return False
+
+
+def check_linear_compatible(pattern: str) -> Tuple[bool, Optional[str]]:
+    """
+    检查正则表达式能否使用线性引擎
+
+    Args:
+        pattern: 正则表达式（不包含 // 包裹）
+
+    Returns:
+        (是否支持, 错误信息)
+    """
+    try:
+        LinearPattern(pattern)
+        return True, None
+    except (re.error, LinearRegexError) as e:
+        return False, str(e)
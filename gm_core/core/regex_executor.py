@@ -0,0 +1,247 @@
+"""
+隔离正则执行器模块
+
+在独立的工作进程中执行正则匹配，并为每次请求设置截止时间，
+防止灾难性回溯的正则阻塞事件循环。
+
+每个工作进程通过独立的管道收发任务，同一时间只执行一个搜索：
+搜索超时时只结束执行该搜索的工作进程，其他请求（包括其他群）正在进行的搜索不受影响。
+一次请求的所有规则（包括等待空闲工作进程的时间）共用一个截止时间，到期仍未完成的规则按超时处理；
+工作进程的启动和结束都在线程中进行，不阻塞事件循环。
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import re
+from multiprocessing.connection import Connection
+from typing import Awaitable, List, Optional, Pattern, Set, Tuple
+
+from astrbot.api import logger
+
+# 工作进程意外退出时，同一搜索最多重新执行的次数
+MAX_RERUNS = 2
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile(pattern: str, flags: int) -> Pattern:
+    """在工作进程中缓存编译结果"""
+    return re.compile(pattern, flags)
+
+
+def _search_worker(pattern: str, flags: int, text: str) -> bool:
+    """
+    工作进程中执行的正则搜索
+
+    Args:
+        pattern: 正则表达式
+        flags: 正则标志
+        text: 待匹配文本
+
+    Returns:
+        是否匹配
+    """
+    return _compile(pattern, flags).search(text) is not None
+
+
+def _worker_main(conn: Connection) -> None:
+    """工作进程主循环：逐个执行管道中收到的搜索，管道关闭时退出"""
+    while True:
+        try:
+            pattern, flags, text = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            result = _search_worker(pattern, flags, text)
+        except Exception:
+            result = False
+        conn.send(result)
+
+
+class _WorkerLost(Exception):
+    """工作进程在搜索过程中退出"""
+
+
+class _Worker:
+    """一个工作进程及其管道"""
+
+    def __init__(self):
+        parent, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+        self.conn = parent
+
+    def call(self, pattern: str, flags: int, text: str, timeout: float) -> Optional[bool]:
+        """
+        执行一次搜索（阻塞，在线程中调用）
+
+        Args:
+            pattern: 正则表达式
+            flags: 正则标志
+            text: 待匹配文本
+            timeout: 截止时间（秒）
+
+        Returns:
+            是否匹配，超时返回 None
+
+        Raises:
+            _WorkerLost: 工作进程已经退出
+        """
+        try:
+            self.conn.send((pattern, flags, text))
+            if not self.conn.poll(timeout):
+                return None
+            return self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise _WorkerLost(str(e) or type(e).__name__) from e
+
+    def kill(self) -> None:
+        """结束工作进程并关闭管道"""
+        try:
+            self.process.kill()
+            self.process.join()
+        except Exception:
+            pass
+        self.conn.close()
+
+
+class RegexExecutor:
+    """带截止时间的隔离正则执行器"""
+
+    def __init__(self, max_workers: int = 2, timeout: float = 0.2):
+        """
+        初始化执行器（工作进程在首次使用时创建）
+
+        Args:
+            max_workers: 工作进程数
+            timeout: 单次搜索的截止时间（秒）
+        """
+        self.max_workers = max(int(max_workers), 1)
+        self.timeout = timeout
+        self.timeout_count = 0
+        self._idle: List[_Worker] = []
+        self._workers: Set[_Worker] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def start(self) -> None:
+        """预先启动工作进程，避免首次请求的截止时间被进程启动占用"""
+        missing = self.max_workers - len(self._workers)
+        if missing > 0:
+            workers = await asyncio.gather(*(self._spawn() for _ in range(missing)))
+            self._idle.extend(workers)
+
+    async def _spawn(self) -> _Worker:
+        """
+        在线程中启动一个工作进程
+
+        Returns:
+            新的工作进程
+        """
+        spawn = asyncio.ensure_future(asyncio.to_thread(_Worker))
+        try:
+            worker = await asyncio.shield(spawn)
+        except asyncio.CancelledError:
+            # 请求已到截止时间，进程仍在启动，启动完成后留给之后的请求使用
+            spawn.add_done_callback(self._adopt)
+            raise
+        self._workers.add(worker)
+        return worker
+
+    def _adopt(self, spawn: asyncio.Future) -> None:
+        """把请求取消后才启动完成的工作进程放入空闲列表"""
+        if not spawn.cancelled() and spawn.exception() is None:
+            worker = spawn.result()
+            self._workers.add(worker)
+            self._idle.append(worker)
+
+    def _discard(self, worker: _Worker) -> Awaitable[None]:
+        """
+        移除工作进程，并在线程中结束它
+
+        Returns:
+            进程结束时完成的 Future，调用方可以不等待
+        """
+        self._workers.discard(worker)
+        return asyncio.get_running_loop().run_in_executor(None, worker.kill)
+
+    async def _run(self, pattern: Pattern, text: str, deadline: float) -> Optional[bool]:
+        """
+        取得一个空闲的工作进程执行一次搜索
+
+        Args:
+            pattern: 已编译的正则
+            text: 待匹配文本
+            deadline: 请求的截止时间（事件循环时间）
+
+        Returns:
+            是否匹配，超时或工作进程不可用时返回 None
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        async with self._semaphore:
+            for _ in range(MAX_RERUNS + 1):
+                worker = self._idle.pop() if self._idle else await self._spawn()
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self._idle.append(worker)
+                    return None
+                try:
+                    result = await asyncio.to_thread(
+                        worker.call, pattern.pattern, pattern.flags, text, remaining
+                    )
+                except _WorkerLost as e:
+                    # 工作进程意外退出不代表未匹配，换一个工作进程重新执行
+                    logger.warning(f"[GroupManager] 正则工作进程意外退出，重新执行: {str(e)}")
+                    await self._discard(worker)
+                    continue
+                except asyncio.CancelledError:
+                    # 无法取回仍在执行的搜索，结束工作进程使其不再被复用（不等待进程结束）
+                    self._discard(worker)
+                    raise
+                if result is None:
+                    # 只结束仍在回溯的工作进程
+                    await self._discard(worker)
+                    return None
+                self._idle.append(worker)
+                return result
+        # 无法取得可用的工作进程时按超时上报，不在事件循环中执行可能回溯的正则
+        logger.error(f"[GroupManager] 正则工作进程连续 {MAX_RERUNS + 1} 次意外退出，按超时处理")
+        return None
+
+    async def search(self, patterns: List[Pattern], text: str) -> Tuple[List[int], List[int]]:
+        """
+        在工作进程中并行执行一组正则搜索，所有搜索共用一个截止时间，到期仍未完成的视为未匹配
+
+        Args:
+            patterns: 已编译的正则列表
+            text: 待匹配文本
+
+        Returns:
+            (匹配的正则下标列表, 超时的正则下标列表)
+        """
+        if not patterns:
+            return [], []
+
+        deadline = asyncio.get_running_loop().time() + self.timeout
+        tasks = [asyncio.ensure_future(self._run(pattern, text, deadline)) for pattern in patterns]
+        try:
+            await asyncio.wait(tasks, timeout=self.timeout)
+        finally:
+            # 到期（或请求本身被取消）时取消仍在等待工作进程或仍在执行的搜索
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        results = [None if task.cancelled() else task.result() for task in tasks]
+        matched = [position for position, result in enumerate(results) if result]
+        timed_out = [position for position, result in enumerate(results) if result is None]
+        self.timeout_count += len(timed_out)
+        return matched, timed_out
+
+    def shutdown(self) -> None:
+        """结束所有工作进程"""
+        for worker in list(self._workers):
+            self._workers.discard(worker)
+            worker.kill()
+        self._idle.clear()
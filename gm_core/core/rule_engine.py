@@ -0,0 +1,377 @@
+"""
+规则引擎模块
+
+将群的 JSON 规则列表预编译为可复用的匹配对象，避免每次验证都重新解释规则。
+"""
+
+import re
+import time
+from typing import Callable, Dict, List, Optional, Pattern, Tuple, Union
+
+from .keyword_automaton import KeywordAutomaton
+from .linear_regex import LinearPattern, LinearRegexError
+
+# auto 模式下，关键词数量达到该值时改用自动机匹配
+AUTOMATON_KEYWORD_THRESHOLD = 32
+
+# 依赖分组编号或全局位置的写法无法安全地合并到同一个正则中
+_UNMERGEABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# 开头的全局内联标志，合并时改写为局部标志
+_GLOBAL_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+# 自适应排序：每隔多少次评估重新排序一次，以及每隔多少次评估采样一次耗时
+REORDER_INTERVAL = 256
+TIMING_SAMPLE_INTERVAL = 16
+
+# 尚未采样到耗时的规则使用的估计耗时（纳秒）
+_DEFAULT_COST_NS = {"keyword": 200, "regex": 1000}
+
+# 命中和未命中次数之和超过该值时减半，使统计能跟上流量变化
+_STATS_DECAY_THRESHOLD = 100000
+
+
+def rule_key(rule: Dict) -> str:
+    """
+    获取规则的稳定标识，用于在规则增删后继续关联统计数据
+
+    Args:
+        rule: 规则
+
+    Returns:
+        规则标识
+    """
+    return f"{rule.get('type')}:{rule.get('content', '')}"
+
+
+class RuleStats:
+    """单条规则的命中统计"""
+
+    __slots__ = ("hits", "misses", "cost_ns", "samples")
+
+    def __init__(self, hits: int = 0, misses: int = 0, cost_ns: int = 0, samples: int = 0):
+        self.hits = hits
+        self.misses = misses
+        self.cost_ns = cost_ns
+        self.samples = samples
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "RuleStats":
+        """从持久化的字典恢复统计"""
+        return cls(
+            hits=int(data.get("hits", 0)),
+            misses=int(data.get("misses", 0)),
+            cost_ns=int(data.get("cost_ns", 0)),
+            samples=int(data.get("samples", 0))
+        )
+
+    def to_dict(self) -> Dict:
+        """转换为可持久化的字典"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cost_ns": self.cost_ns,
+            "samples": self.samples
+        }
+
+    def score(self, rule_type: str) -> float:
+        """
+        计算排序得分：命中率 / 平均耗时，得分高的规则先评估
+
+        Args:
+            rule_type: 规则类型，用于在没有耗时采样时估计耗时
+
+        Returns:
+            排序得分
+        """
+        hit_rate = (self.hits + 1) / (self.hits + self.misses + 2)
+        if self.samples:
+            cost = max(self.cost_ns / self.samples, 1)
+        else:
+            cost = _DEFAULT_COST_NS.get(rule_type, 1000)
+        return hit_rate / cost
+
+    def decay(self) -> None:
+        """计数过大时减半"""
+        if self.hits + self.misses > _STATS_DECAY_THRESHOLD:
+            self.hits //= 2
+            self.misses //= 2
+            self.cost_ns //= 2
+            self.samples //= 2
+
+
+class RuleEngine:
+    """单个群的预编译规则引擎"""
+
+    def __init__(
+        self,
+        rules: List[Dict],
+        keyword_mode: str = "auto",
+        regex_mode: str = "per_rule",
+        rule_stats: Optional[Dict[str, RuleStats]] = None,
+        regex_backend: str = "re"
+    ):
+        """
+        编译规则列表
+
+        Args:
+            rules: 群规则列表（与存储中的格式一致）
+            keyword_mode: 关键词匹配模式（"auto"、"scan" 或 "automaton"）
+            regex_mode: 正则匹配模式（"per_rule" 或 "combined"）
+            rule_stats: 规则标识 -> 命中统计；提供时启用自适应排序，统计会被原地更新
+            regex_backend: 正则后端（"re" 标准库或 "linear" 线性时间引擎）
+        """
+        self.rules = rules
+        self.regex_backend = regex_backend
+        self.regex_rules: List[Tuple[int, Union[Pattern, LinearPattern]]] = []
+        # 关键词 -> 规则索引列表，重复的关键词只扫描一次
+        self.keywords: Dict[str, List[int]] = {}
+
+        for index, rule in enumerate(rules):
+            rule_type = rule.get("type")
+            content = rule.get("content", "")
+            if rule_type == "regex":
+                try:
+                    if regex_backend == "linear":
+                        self.regex_rules.append((index, LinearPattern(content)))
+                    else:
+                        self.regex_rules.append((index, re.compile(content)))
+                except (re.error, LinearRegexError):
+                    # 跳过无效或所选后端不支持的正则表达式
+                    continue
+            elif rule_type == "keyword":
+                self.keywords.setdefault(content, []).append(index)
+
+        self.automaton: Optional[KeywordAutomaton] = None
+        if keyword_mode == "automaton" or (
+            keyword_mode == "auto" and len(self.keywords) >= AUTOMATON_KEYWORD_THRESHOLD
+        ):
+            self.automaton = KeywordAutomaton(self.keywords)
+
+        # combined 模式下：合并后的正则、参与合并的规则，以及无法合并、需要逐条匹配的正则
+        self.combined: Optional[Pattern] = None
+        self.combined_rules: List[Tuple[int, Pattern]] = []
+        self.uncombined_rules: List[Tuple[int, Union[Pattern, LinearPattern]]] = self.regex_rules
+        if regex_mode == "combined" and regex_backend == "re" and self.regex_rules:
+            self._build_combined()
+
+        # 逐条评估的规则（未使用自动机的关键词和未合并的正则），顺序可自适应调整
+        self.rule_stats = rule_stats
+        self.stats_dirty = False
+        self._evaluations = 0
+        self.scan_units: List[Tuple[int, Callable[[str], object], Optional[RuleStats]]] = []
+        if self.automaton is None:
+            for keyword, indexes in self.keywords.items():
+                self._add_scan_unit(indexes[0], lambda text, keyword=keyword: keyword in text)
+        for index, pattern in self.uncombined_rules:
+            self._add_scan_unit(index, pattern.search)
+        if rule_stats is not None:
+            self._reorder()
+
+    def _add_scan_unit(self, index: int, test: Callable[[str], object]) -> None:
+        """
+        添加一个逐条评估单元
+
+        Args:
+            index: 规则索引
+            test: 匹配函数
+        """
+        stats = None
+        if self.rule_stats is not None:
+            stats = self.rule_stats.setdefault(rule_key(self.rules[index]), RuleStats())
+        self.scan_units.append((index, test, stats))
+
+    def _build_combined(self) -> None:
+        """
+        把可合并的正则规则编译为一个多选正则
+
+        使用非捕获分组，避免每个位置保存分组状态的开销；
+        命中后在命中位置逐条锚定匹配即可确定是哪条规则。
+        """
+        alternatives = []
+        combined = []
+        uncombined = []
+
+        for index, pattern in self.regex_rules:
+            source = pattern.pattern
+            if _UNMERGEABLE.search(source):
+                uncombined.append((index, pattern))
+                continue
+            flags = _GLOBAL_FLAGS.match(source)
+            if flags:
+                source = f"(?{flags.group(1)}:{source[flags.end():]})"
+            alternatives.append(f"(?:{source})")
+            combined.append((index, pattern))
+
+        if not alternatives:
+            return
+
+        try:
+            self.combined = re.compile("|".join(alternatives))
+        except re.error:
+            # 合并失败（例如命名分组重名）时退回逐条匹配
+            return
+        self.combined_rules = combined
+        self.uncombined_rules = uncombined
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def _match_keywords(self, text: str) -> List[str]:
+        """
+        返回文本中出现的关键词
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            出现的关键词列表
+        """
+        if self.automaton is not None:
+            return list(self.automaton.find_all(text))
+        return [keyword for keyword in self.keywords if keyword in text]
+
+    def match_keyword_indexes(self, text: str) -> List[int]:
+        """
+        返回匹配的关键词规则索引
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            匹配的关键词规则索引列表（未排序）
+        """
+        return [
+            index
+            for keyword in self._match_keywords(text)
+            for index in self.keywords[keyword]
+        ]
+
+    def first_match(self, text: str) -> Optional[Dict]:
+        """
+        返回任意一条匹配的规则，用于只需要判断是否通过的场景
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            匹配的规则，未匹配时返回 None
+        """
+        if self.automaton is not None:
+            found_keywords = self.automaton.find_all(text)
+            if found_keywords:
+                return self.rules[min(self.keywords[keyword][0] for keyword in found_keywords)]
+
+        if self.rule_stats is not None:
+            index = self._scan_adaptive(text)
+            if index is not None:
+                return self.rules[index]
+        else:
+            for index, test, _ in self.scan_units:
+                if test(text):
+                    return self.rules[index]
+
+        if self.combined is not None:
+            found = self.combined.search(text)
+            if found:
+                return self._rule_at(text, found.start())
+
+        return None
+
+    def _scan_adaptive(self, text: str) -> Optional[int]:
+        """
+        按自适应顺序逐条评估，同时记录命中、未命中和采样耗时
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            命中的规则索引，未命中时返回 None
+        """
+        self._evaluations += 1
+        timed = self._evaluations % TIMING_SAMPLE_INTERVAL == 0
+        matched_index = None
+
+        for index, test, stats in self.scan_units:
+            if timed:
+                started = time.perf_counter_ns()
+                hit = test(text)
+                stats.cost_ns += time.perf_counter_ns() - started
+                stats.samples += 1
+            else:
+                hit = test(text)
+            if hit:
+                stats.hits += 1
+                matched_index = index
+                break
+            stats.misses += 1
+
+        if self._evaluations % REORDER_INTERVAL == 0:
+            self._reorder()
+        return matched_index
+
+    def _reorder(self) -> None:
+        """按命中率与耗时之比重新排列逐条评估的顺序，顺序变化时标记统计待持久化"""
+        for _, _, stats in self.scan_units:
+            stats.decay()
+        ordered = sorted(
+            self.scan_units,
+            key=lambda unit: unit[2].score(self.rules[unit[0]].get("type")),
+            reverse=True
+        )
+        if [unit[0] for unit in ordered] != [unit[0] for unit in self.scan_units]:
+            self.scan_units = ordered
+            self.stats_dirty = True
+
+    def export_stats(self) -> Dict[str, Dict]:
+        """
+        导出当前规则的命中统计（已删除规则的统计不会被导出）
+
+        Returns:
+            规则标识 -> 统计字典
+        """
+        if self.rule_stats is None:
+            return {}
+        return {
+            key: self.rule_stats[key].to_dict()
+            for key in (rule_key(self.rules[index]) for index, _, _ in self.scan_units)
+        }
+
+    def _rule_at(self, text: str, position: int) -> Optional[Dict]:
+        """
+        找出合并正则在指定位置命中的规则
+
+        多选正则在同一位置按顺序尝试各分支，因此第一条能在该位置匹配的规则即为命中的规则。
+
+        Args:
+            text: 待匹配文本
+            position: 合并正则的命中位置
+
+        Returns:
+            命中的规则
+        """
+        for index, pattern in self.combined_rules:
+            if pattern.match(text, position):
+                return self.rules[index]
+        # 理论上不会发生，保守地退回逐条搜索
+        return next(
+            (self.rules[index] for index, pattern in self.combined_rules if pattern.search(text)),
+            None
+        )
+
+    def match(self, text: str) -> List[Dict]:
+        """
+        返回所有匹配的规则
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            匹配的规则列表，顺序与原规则列表一致
+        """
+        matched_indexes = self.match_keyword_indexes(text)
+        matched_indexes.extend(
+            index for index, pattern in self.regex_rules if pattern.search(text)
+        )
+        matched_indexes.sort()
+        return [self.rules[index] for index in matched_indexes]
@@ -2,23 +2,614 @@
 数据存储模块
 
 负责存储和读取插件数据，使用 AstrBot 提供的 KV 存储接口。
+读取经过进程内的 LRU 缓存，写入时同步更新缓存并写穿到 KV 存储；
+write_behind 模式下写入先进入待写队列，在合并窗口结束或待写键数达到上限时批量落盘。
+
+群数据支持两种布局：
+- keys: 规则、白名单、黑名单和群管理员分别保存在 rules_/whitelist_/blacklist_/admins_ 键中
+- snapshot: 每个群一个带版本号的快照文档（group_{群ID}），一次读取即可取得全部群数据
+
+达到 compact_threshold 的名单以紧凑集合（排序的 u64 数组）保存在内存和存储中。
 """
 
-from typing import List, Dict, Optional
+import asyncio
+import copy
+from collections import OrderedDict
+from typing import Any, List, Dict, Optional, Callable, Iterable, Set, Tuple
 from astrbot.api.star import Star
+from astrbot.api import logger
+
+from .id_set import AnyIdSet, CompactIdSet, IdSet, fit_id_set, load_id_set, normalize_id
+
+# 群锁分段数：不同群的修改大概率落在不同分段上并行执行，同一群的修改串行执行
+LOCK_STRIPES = 64
+
+# 快照中保存的群数据字段，同时也是 keys 布局下的键前缀
+GROUP_FIELDS = ("rules", "whitelist", "blacklist", "admins")
+
+
+class GroupSnapshot:
+    """群数据快照，读取方共享同一个实例，修改时整体替换"""
+
+    __slots__ = ("version", "rules_version", "rules", "whitelist", "blacklist", "admins")
+
+    def __init__(
+        self,
+        version: int = 0,
+        rules: Optional[List[Dict]] = None,
+        whitelist: Optional[AnyIdSet] = None,
+        blacklist: Optional[AnyIdSet] = None,
+        admins: Optional[AnyIdSet] = None,
+        rules_version: int = 0
+    ):
+        # version 随任意字段的修改递增；rules_version 只随规则的修改递增，用于规则引擎缓存失效
+        self.version = version
+        self.rules_version = rules_version
+        self.rules = rules if rules is not None else []
+        self.whitelist = whitelist if whitelist is not None else IdSet()
+        self.blacklist = blacklist if blacklist is not None else IdSet()
+        self.admins = admins if admins is not None else IdSet()
+
+    @classmethod
+    def from_dict(cls, data: Dict, compact_threshold: int = 0) -> "GroupSnapshot":
+        """从持久化的字典恢复快照，达到阈值的名单使用紧凑集合"""
+        return cls(
+            version=int(data.get("version", 0)),
+            rules_version=int(data.get("rules_version", data.get("version", 0))),
+            rules=list(data.get("rules", [])),
+            whitelist=load_id_set(data.get("whitelist", []), compact_threshold),
+            blacklist=load_id_set(data.get("blacklist", []), compact_threshold),
+            admins=load_id_set(data.get("admins", []), compact_threshold)
+        )
+
+    def to_dict(self) -> Dict:
+        """转换为可持久化的字典"""
+        return {
+            "version": self.version,
+            "rules_version": self.rules_version,
+            "rules": self.rules,
+            "whitelist": self.whitelist.dump(),
+            "blacklist": self.blacklist.dump(),
+            "admins": self.admins.dump()
+        }
+
+    def replace(self, changes: Dict[str, Any]) -> "GroupSnapshot":
+        """
+        返回替换了若干字段、版本号加一的新快照（替换规则时规则版本号也加一）
+
+        Args:
+            changes: 字段名 -> 新值
+
+        Returns:
+            新快照
+        """
+        values = {name: getattr(self, name) for name in GROUP_FIELDS}
+        values.update(changes)
+        rules_version = self.rules_version + 1 if "rules" in changes else self.rules_version
+        return GroupSnapshot(version=self.version + 1, rules_version=rules_version, **values)
 
 
 class Storage:
     """数据存储管理类"""
 
-    def __init__(self, plugin: Star):
+    def __init__(
+        self,
+        plugin: Star,
+        cache_size: int = 1024,
+        layout: str = "keys",
+        write_mode: str = "write_through",
+        flush_delay: float = 0.5,
+        flush_batch_size: int = 100,
+        sync_admin_writes: bool = True,
+        compact_threshold: int = 0
+    ):
         """
         初始化存储
 
         Args:
             plugin: 插件实例，用于访问 KV 存储接口
+            cache_size: 缓存的最大键数，为 0 时不使用缓存
+            layout: 群数据布局（"keys" 或 "snapshot"）
+            write_mode: 写入模式（"write_through" 立即写入或 "write_behind" 合并后批量写入）
+            flush_delay: write_behind 模式下的合并窗口（秒）
+            flush_batch_size: write_behind 模式下待写键数达到该值时立即落盘
+            sync_admin_writes: write_behind 模式下群管理员变更是否仍立即落盘
+            compact_threshold: 名单达到该ID数时使用紧凑集合保存，为 0 时不使用
         """
         self.plugin = plugin
+        self.layout = layout
+        self.write_mode = write_mode
+        self.flush_delay = flush_delay
+        self.flush_batch_size = max(int(flush_batch_size), 1)
+        self.sync_admin_writes = sync_admin_writes
+        self.compact_threshold = max(int(compact_threshold), 0)
+        # 尚未落盘的键 -> 持久化形式的值，同一键的多次修改只保留最新值
+        self._dirty: Dict[str, Any] = {}
+        # 正在落盘的批次，写入完成前读取这些键仍返回批次中的值
+        self._in_flight: Dict[str, Any] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # 串行执行落盘，避免较早的批次覆盖较新的值
+        self._flush_lock = asyncio.Lock()
+        self.flush_count = 0
+        self.coalesced_writes = 0
+        self.cache_size = max(int(cache_size), 0)
+        # 键 -> 值，按最近使用顺序排列；不存在的键会连同默认值一起缓存
+        self._cache: OrderedDict[str, Any] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        # 键 -> 写入次数；读取未命中时比较加载前后的写入次数，加载期间被写入的键不用读到的旧值填充缓存
+        self._write_generations: Dict[str, int] = {}
+        # keys 布局下群数据和群规则的内存版本号，进程重启后从 0 开始
+        self._versions: Dict[str, int] = {}
+        self._rules_versions: Dict[str, int] = {}
+        # 分段群锁，保护同一群的读取-修改-写入
+        self._locks = [asyncio.Lock() for _ in range(LOCK_STRIPES)]
+        # 群启用状态索引：已启用的群，以及已读取过启用标记的群
+        self._enabled_groups: Set[str] = set()
+        self._known_groups: Set[str] = set()
+        # 规则变更监听器，用于使预编译的规则引擎失效
+        self._rules_listeners: List[Callable[[str], None]] = []
+
+    async def _get(self, key: str, default: Any) -> Any:
+        """
+        读取键值，优先从缓存读取
+
+        返回值是缓存的浅拷贝，调用方修改返回的列表或字典不会影响缓存。
+
+        Args:
+            key: 键
+            default: 键不存在时的默认值
+
+        Returns:
+            键对应的值
+        """
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return copy.copy(self._cache[key])
+
+        self.cache_misses += 1
+        generation = self._write_generations.get(key, 0)
+        value = await self._load(key, default)
+        self._fill(key, value, generation)
+        return copy.copy(value)
+
+    async def _put(self, key: str, value: Any) -> None:
+        """
+        写入键值，写穿到 KV 存储（或进入待写队列）后更新缓存
+
+        Args:
+            key: 键
+            value: 值
+        """
+        value = copy.copy(value)
+        await self._persist(key, value)
+        self._remember(key, value)
+
+    async def _load(self, key: str, default: Any) -> Any:
+        """
+        从 KV 存储读取持久化形式的值，尚未落盘和正在落盘的值优先
+
+        Args:
+            key: 键
+            default: 键不存在时的默认值
+
+        Returns:
+            键对应的值
+        """
+        if key in self._dirty:
+            return self._dirty[key]
+        if key in self._in_flight:
+            return self._in_flight[key]
+        return await self.plugin.get_kv_data(key, default)
+
+    async def _persist(self, key: str, value: Any, sync: bool = False) -> None:
+        """
+        持久化键值；write_behind 模式下放入待写队列，由合并窗口或批量上限触发落盘
+
+        Args:
+            key: 键
+            value: 持久化形式的值（调用方之后不得修改）
+            sync: 是否忽略 write_behind 立即落盘
+        """
+        self._write_generations[key] = self._write_generations.get(key, 0) + 1
+        if self.write_mode != "write_behind":
+            await self.plugin.put_kv_data(key, value)
+            return
+
+        if sync:
+            async with self._flush_lock:
+                # 丢弃同一键尚未落盘的旧值，避免之后的批次用旧值覆盖
+                self._dirty.pop(key, None)
+                await self.plugin.put_kv_data(key, value)
+            return
+
+        if key in self._dirty:
+            self.coalesced_writes += 1
+        self._dirty[key] = value
+        if len(self._dirty) >= self.flush_batch_size:
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self) -> None:
+        """合并窗口结束后落盘"""
+        await asyncio.sleep(self.flush_delay)
+        # 定时器被取消时不中断正在进行的落盘，避免已取出的批次丢失
+        await asyncio.shield(self.flush())
+        if self._dirty:
+            # 落盘期间的新写入或落盘失败的键，在下一个窗口落盘
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def flush(self) -> None:
+        """把所有尚未落盘的值写入 KV 存储，失败的键保留在待写队列中"""
+        async with self._flush_lock:
+            if not self._dirty:
+                return
+            batch = self._dirty
+            self._dirty = {}
+            self._in_flight = batch
+            try:
+                results = await asyncio.gather(
+                    *(self.plugin.put_kv_data(key, value) for key, value in batch.items()),
+                    return_exceptions=True
+                )
+            except asyncio.CancelledError:
+                # 被取消时不确定哪些键已经写入，整个批次放回待写队列
+                for key, value in batch.items():
+                    self._dirty.setdefault(key, value)
+                raise
+            finally:
+                self._in_flight = {}
+            self.flush_count += 1
+
+            failed = 0
+            for (key, value), result in zip(batch.items(), results, strict=True):
+                if isinstance(result, Exception):
+                    failed += 1
+                    # 落盘期间产生的新值优先
+                    self._dirty.setdefault(key, value)
+            if failed:
+                logger.error(f"[GroupManager] 批量写入失败: {failed}/{len(batch)} 个键未写入")
+
+    async def close(self) -> None:
+        """停止合并窗口定时器并落盘所有待写数据"""
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+        self._flush_task = None
+        await self.flush()
+
+    def write_stats(self) -> Dict[str, Any]:
+        """
+        获取写入统计
+
+        Returns:
+            包含写入模式、待写键数、落盘批次数和被合并的写入次数的字典
+        """
+        return {
+            "mode": self.write_mode,
+            "pending": len(self._dirty),
+            "flushes": self.flush_count,
+            "coalesced": self.coalesced_writes
+        }
+
+    async def _get_id_set(self, key: str) -> AnyIdSet:
+        """
+        读取ID集合，缓存中保存解析后的集合，避免每次读取都重建
+
+        返回的集合与缓存共享，调用方只能读取；修改请使用 _update_id_set。
+
+        Args:
+            key: 键
+
+        Returns:
+            ID集合，如果不存在则返回空集合
+        """
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.cache_misses += 1
+        generation = self._write_generations.get(key, 0)
+        id_set = load_id_set(await self._load(key, []), self.compact_threshold)
+        self._fill(key, id_set, generation)
+        return id_set
+
+    async def _put_id_set(self, key: str, id_set: AnyIdSet, sync: bool = False) -> None:
+        """
+        持久化ID集合（普通集合为去重后的列表，紧凑集合为 base64 编码的数组）
+
+        Args:
+            key: 键
+            id_set: ID集合
+            sync: 是否忽略 write_behind 立即落盘
+        """
+        await self._persist(key, id_set.dump(), sync=sync)
+        self._remember(key, id_set)
+
+    def _remember(self, key: str, value: Any) -> None:
+        """
+        把键值放入缓存，超过容量时淘汰最久未使用的键
+
+        Args:
+            key: 键
+            value: 值
+        """
+        if not self.cache_size:
+            return
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+            self.cache_evictions += 1
+
+    def _fill(self, key: str, value: Any, generation: int) -> None:
+        """
+        用读取未命中时加载的值填充缓存；加载期间该键被写入过时不填充，避免覆盖写入方放入缓存的新值
+
+        Args:
+            key: 键
+            value: 加载的值
+            generation: 加载前该键的写入次数
+        """
+        if self._write_generations.get(key, 0) == generation:
+            self._remember(key, value)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含命中次数、未命中次数、命中率、淘汰次数和当前大小的字典
+        """
+        total = self.cache_hits + self.cache_misses
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / total if total else 0.0,
+            "evictions": self.cache_evictions,
+            "size": len(self._cache),
+            "capacity": self.cache_size
+        }
+
+    def _group_lock(self, group_id: str) -> asyncio.Lock:
+        """
+        获取群所在分段的锁
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            该群的锁
+        """
+        return self._locks[hash(normalize_id(group_id)) % len(self._locks)]
+
+    def add_rules_listener(self, listener: Callable[[str], None]) -> None:
+        """
+        注册规则变更监听器
+
+        Args:
+            listener: 回调函数，参数为发生变更的群ID
+        """
+        self._rules_listeners.append(listener)
+
+    async def get_group_snapshot(self, group_id: str) -> GroupSnapshot:
+        """
+        获取群数据快照（只读）
+
+        snapshot 布局下只需一次读取，首次访问时自动从旧的分散键迁移；
+        keys 布局下由各个键组装，版本号为内存中的版本号。
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            群数据快照
+        """
+        if self.layout != "snapshot":
+            version = self._versions.get(str(group_id), 0)
+            rules_version = self._rules_versions.get(str(group_id), 0)
+            fields = await self.get_group_fields(group_id, GROUP_FIELDS)
+            return GroupSnapshot(version=version, rules_version=rules_version, **fields)
+
+        key = f"group_{group_id}"
+        if key in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self.cache_misses += 1
+        generation = self._write_generations.get(key, 0)
+        data = await self._load(key, None)
+        if data is None:
+            return await self._migrate_group(group_id, generation)
+        snapshot = GroupSnapshot.from_dict(data, self.compact_threshold)
+        self._fill(key, snapshot, generation)
+        return snapshot
+
+    async def _migrate_group(self, group_id: str, generation: int) -> GroupSnapshot:
+        """
+        把 keys 布局下的群数据合并为快照文档并放入缓存，旧键保留以便回退布局
+
+        Args:
+            group_id: 群ID
+            generation: 读取快照前快照键的写入次数，迁移期间快照已被写入时不再写入、缓存迁移结果
+
+        Returns:
+            迁移后的快照
+        """
+        key = f"group_{group_id}"
+        values = await asyncio.gather(
+            *(self.plugin.get_kv_data(f"{field}_{group_id}", []) for field in GROUP_FIELDS)
+        )
+        legacy = dict(zip(GROUP_FIELDS, values, strict=True))
+        snapshot = GroupSnapshot.from_dict(legacy, self.compact_threshold)
+        snapshot.version = snapshot.rules_version = 1
+        if self._write_generations.get(key, 0) != generation:
+            return snapshot
+        await self._persist(key, snapshot.to_dict())
+        # 只有迁移本身写入过快照时才缓存迁移结果
+        self._fill(key, snapshot, generation + 1)
+        if any(legacy.values()):
+            logger.info(f"[GroupManager] 群 {group_id} 的数据已迁移为快照布局")
+        return snapshot
+
+    async def get_group_fields(self, group_id: str, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        批量读取群数据字段（只读）
+
+        snapshot 布局下只需读取一次快照；keys 布局下各字段的读取并发发出。
+
+        Args:
+            group_id: 群ID
+            fields: GROUP_FIELDS 中的字段名
+
+        Returns:
+            字段名到规则列表或ID集合的映射
+        """
+        fields = tuple(fields)
+        if self.layout == "snapshot":
+            snapshot = await self.get_group_snapshot(group_id)
+            return {field: getattr(snapshot, field) for field in fields}
+
+        values = await asyncio.gather(*(
+            self._get(f"rules_{group_id}", []) if field == "rules"
+            else self._get_id_set(f"{field}_{group_id}")
+            for field in fields
+        ))
+        return dict(zip(fields, values, strict=True))
+
+    async def get_group_lists(self, group_id: str) -> Tuple[AnyIdSet, AnyIdSet]:
+        """
+        获取群的白名单和黑名单集合（只读）
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            (白名单集合, 黑名单集合)
+        """
+        fields = await self.get_group_fields(group_id, ("whitelist", "blacklist"))
+        return fields["whitelist"], fields["blacklist"]
+
+    async def get_rules_with_version(self, group_id: str) -> Tuple[List[Dict], int]:
+        """
+        获取群的规则列表（只读）及其规则版本号，名单和管理员的修改不会改变规则版本号
+
+        keys 布局下先读取版本号再读取规则，读取期间规则被修改时版本号只会偏旧，
+        下次验证会重新编译引擎，不会把旧规则编译的引擎记在新版本号下。
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            (规则列表, 规则版本号)
+        """
+        if self.layout == "snapshot":
+            snapshot = await self.get_group_snapshot(group_id)
+            return snapshot.rules, snapshot.rules_version
+        version = self._rules_versions.get(str(group_id), 0)
+        return await self._get(f"rules_{group_id}", []), version
+
+    async def get_group_version(self, group_id: str) -> int:
+        """
+        获取群数据的版本号，群数据每次修改后递增，可作为缓存失效标记
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            版本号
+        """
+        if self.layout != "snapshot":
+            return self._versions.get(str(group_id), 0)
+        return (await self.get_group_snapshot(group_id)).version
+
+    async def _read_id_set(self, group_id: str, field: str) -> AnyIdSet:
+        """
+        读取群的ID集合字段（只读）
+
+        Args:
+            group_id: 群ID
+            field: "whitelist"、"blacklist" 或 "admins"
+
+        Returns:
+            ID集合
+        """
+        if self.layout == "snapshot":
+            return getattr(await self.get_group_snapshot(group_id), field)
+        return await self._get_id_set(f"{field}_{group_id}")
+
+    async def _write_group_field(self, group_id: str, field: str, value: Any) -> None:
+        """
+        写入一个群数据字段（调用方需持有群锁）
+
+        Args:
+            group_id: 群ID
+            field: 字段名
+            value: 规则列表或ID集合
+        """
+        await self._write_group_fields(group_id, {field: value})
+
+    async def _write_group_fields(self, group_id: str, values: Dict[str, Any]) -> None:
+        """
+        写入若干群数据字段，群数据版本号只递增一次；包含规则时同时递增规则版本号并通知监听器（调用方需持有群锁）
+
+        snapshot 布局下只写入一次快照；keys 布局下各字段的写入并发发出。
+
+        Args:
+            group_id: 群ID
+            values: 字段名 -> 规则列表或ID集合
+        """
+        # 防崩溃：管理员变更不等待合并窗口，立即落盘
+        sync_admins = self.sync_admin_writes
+        values = {
+            field: value if field == "rules" else fit_id_set(value, self.compact_threshold)
+            for field, value in values.items()
+        }
+        if self.layout == "snapshot":
+            snapshot = (await self.get_group_snapshot(group_id)).replace(values)
+            await self._persist(f"group_{group_id}", snapshot.to_dict(), sync=sync_admins and "admins" in values)
+            self._remember(f"group_{group_id}", snapshot)
+        else:
+            await asyncio.gather(*(
+                self._put(f"rules_{group_id}", value) if field == "rules"
+                else self._put_id_set(f"{field}_{group_id}", value, sync=sync_admins and field == "admins")
+                for field, value in values.items()
+            ))
+            self._versions[str(group_id)] = self._versions.get(str(group_id), 0) + 1
+            if "rules" in values:
+                self._rules_versions[str(group_id)] = self._rules_versions.get(str(group_id), 0) + 1
+
+        if "rules" in values:
+            for listener in self._rules_listeners:
+                listener(group_id)
+
+    async def put_group_fields(self, group_id: str, values: Dict[str, Any]) -> None:
+        """
+        在群锁内批量写入群数据字段，整体替换给出的字段
+
+        snapshot 布局下只写入一次快照；keys 布局下各字段的写入并发发出。
+        群数据版本号只递增一次，包含规则时规则版本号递增、预编译的规则引擎失效。
+
+        Args:
+            group_id: 群ID
+            values: GROUP_FIELDS 中的字段名 -> 规则列表或用户ID列表（也可为ID集合）
+        """
+        unknown = set(values) - set(GROUP_FIELDS)
+        if unknown:
+            raise ValueError(f"未知的群数据字段: {', '.join(sorted(unknown))}")
+        if not values:
+            return
+        values = {
+            field: list(value) if field == "rules"
+            else value if isinstance(value, (IdSet, CompactIdSet)) else IdSet(value)
+            for field, value in values.items()
+        }
+        async with self._group_lock(group_id):
+            await self._write_group_fields(group_id, values)
 
     async def get_group_rules(self, group_id: str) -> List[Dict]:
         """
@@ -30,7 +621,9 @@ class Storage:
         Returns:
             规则列表，如果不存在则返回空列表
         """
-        return await self.plugin.get_kv_data(f"rules_{group_id}", [])
+        if self.layout == "snapshot":
+            return list((await self.get_group_snapshot(group_id)).rules)
+        return await self._get(f"rules_{group_id}", [])
 
     async def save_group_rules(self, group_id: str, rules: List[Dict]) -> None:
         """
@@ -40,7 +633,202 @@ class Storage:
             group_id: 群ID
             rules: 规则列表
         """
-        await self.plugin.put_kv_data(f"rules_{group_id}", rules)
+        await self.put_group_fields(group_id, {"rules": rules})
+
+    async def add_group_rule(self, group_id: str, rule: Dict) -> int:
+        """
+        在群锁内追加一条规则
+
+        Args:
+            group_id: 群ID
+            rule: 规则
+
+        Returns:
+            添加后的规则总数
+        """
+        async with self._group_lock(group_id):
+            rules = await self.get_group_rules(group_id)
+            rules.append(rule)
+            await self._write_group_field(group_id, "rules", rules)
+            return len(rules)
+
+    async def remove_group_rule(self, group_id: str, index: int) -> Optional[Tuple[Dict, int]]:
+        """
+        在群锁内删除指定索引的规则
+
+        Args:
+            group_id: 群ID
+            index: 规则索引（从 1 开始）
+
+        Returns:
+            (被删除的规则, 剩余规则数)，索引无效时返回 None
+        """
+        async with self._group_lock(group_id):
+            rules = await self.get_group_rules(group_id)
+            if index < 1 or index > len(rules):
+                return None
+            removed = rules.pop(index - 1)
+            await self._write_group_field(group_id, "rules", rules)
+            return removed, len(rules)
+
+    async def clear_group_rules(self, group_id: str) -> int:
+        """
+        在群锁内清空群的所有规则
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            被删除的规则数
+        """
+        async with self._group_lock(group_id):
+            rules = await self.get_group_rules(group_id)
+            if rules:
+                await self._write_group_field(group_id, "rules", [])
+            return len(rules)
+
+    async def get_regex_backend(self, group_id: str) -> str:
+        """
+        获取指定群选择的正则后端
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            "re" 或 "linear"，如果不存在则返回 "re"
+        """
+        return await self._get(f"regex_backend_{group_id}", "re")
+
+    async def save_regex_backend(self, group_id: str, backend: str) -> None:
+        """
+        保存指定群选择的正则后端
+
+        Args:
+            group_id: 群ID
+            backend: "re" 或 "linear"
+        """
+        await self._put(f"regex_backend_{group_id}", backend)
+
+    async def get_rule_stats(self, group_id: str) -> Dict[str, Dict]:
+        """
+        获取指定群的规则命中统计
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            规则标识 -> 统计字典，如果不存在则返回空字典
+        """
+        return await self._get(f"rule_stats_{group_id}", {})
+
+    async def save_rule_stats(self, group_id: str, stats: Dict[str, Dict]) -> None:
+        """
+        保存指定群的规则命中统计
+
+        Args:
+            group_id: 群ID
+            stats: 规则标识 -> 统计字典
+        """
+        await self._put(f"rule_stats_{group_id}", stats)
+
+    async def get_notification_retries(self) -> List[Dict]:
+        """
+        获取等待重试的通知
+
+        Returns:
+            重试队列，如果不存在则返回空列表
+        """
+        return await self._get("notification_retries", [])
+
+    async def save_notification_retries(self, entries: List[Dict]) -> None:
+        """
+        保存等待重试的通知
+
+        Args:
+            entries: 重试队列
+        """
+        await self._put("notification_retries", entries)
+
+    async def get_dead_letters(self) -> List[Dict]:
+        """
+        获取重试次数用完的通知
+
+        Returns:
+            死信列表，如果不存在则返回空列表
+        """
+        return await self._get("notification_dead_letters", [])
+
+    async def save_dead_letters(self, entries: List[Dict]) -> None:
+        """
+        保存重试次数用完的通知
+
+        Args:
+            entries: 死信列表
+        """
+        await self._put("notification_dead_letters", entries)
+
+    async def _update_id_set(self, group_id: str, field: str, user_id: str, add: bool) -> bool:
+        """
+        在群锁内基于ID集合的副本添加或移除用户并写回，写入失败时缓存保持不变
+
+        Args:
+            group_id: 群ID
+            field: "whitelist"、"blacklist" 或 "admins"
+            user_id: 用户ID
+            add: True 为添加，False 为移除
+
+        Returns:
+            集合发生变化返回 True，否则返回 False
+        """
+        async with self._group_lock(group_id):
+            id_set = (await self._read_id_set(group_id, field)).copy()
+            changed = id_set.add(user_id) if add else id_set.discard(user_id)
+            if changed:
+                await self._write_group_field(group_id, field, id_set)
+            return changed
+
+    async def _import_id_set(self, group_id: str, field: str, user_ids: Iterable[Any]) -> int:
+        """
+        在群锁内把一批用户ID合并到ID集合的副本中，并只写回一次
+
+        Args:
+            group_id: 群ID
+            field: "whitelist"、"blacklist" 或 "admins"
+            user_ids: 用户ID（可为生成器）
+
+        Returns:
+            新添加的ID数量
+        """
+        async with self._group_lock(group_id):
+            id_set = (await self._read_id_set(group_id, field)).copy()
+            added = id_set.update(user_ids)
+            if added:
+                await self._write_group_field(group_id, field, id_set)
+            return added
+
+    async def get_whitelist_set(self, group_id: str) -> AnyIdSet:
+        """
+        获取指定群的白名单集合（只读）
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            白名单集合
+        """
+        return await self._read_id_set(group_id, "whitelist")
+
+    async def get_blacklist_set(self, group_id: str) -> AnyIdSet:
+        """
+        获取指定群的黑名单集合（只读）
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            黑名单集合
+        """
+        return await self._read_id_set(group_id, "blacklist")
 
     async def get_group_whitelist(self, group_id: str) -> List[str]:
         """
@@ -52,7 +840,7 @@ class Storage:
         Returns:
             白名单列表，如果不存在则返回空列表
         """
-        return await self.plugin.get_kv_data(f"whitelist_{group_id}", [])
+        return (await self.get_whitelist_set(group_id)).to_list()
 
     async def save_group_whitelist(self, group_id: str, whitelist: List[str]) -> None:
         """
@@ -62,7 +850,7 @@ class Storage:
             group_id: 群ID
             whitelist: 白名单列表
         """
-        await self.plugin.put_kv_data(f"whitelist_{group_id}", whitelist)
+        await self.put_group_fields(group_id, {"whitelist": whitelist})
 
     async def get_group_blacklist(self, group_id: str) -> List[str]:
         """
@@ -74,7 +862,7 @@ class Storage:
         Returns:
             黑名单列表，如果不存在则返回空列表
         """
-        return await self.plugin.get_kv_data(f"blacklist_{group_id}", [])
+        return (await self.get_blacklist_set(group_id)).to_list()
 
     async def save_group_blacklist(self, group_id: str, blacklist: List[str]) -> None:
         """
@@ -84,7 +872,7 @@ class Storage:
             group_id: 群ID
             blacklist: 黑名单列表
         """
-        await self.plugin.put_kv_data(f"blacklist_{group_id}", blacklist)
+        await self.put_group_fields(group_id, {"blacklist": blacklist})
 
     async def add_to_whitelist(self, group_id: str, user_id: str) -> bool:
         """
@@ -97,12 +885,7 @@ class Storage:
         Returns:
             如果添加成功返回 True，如果已存在返回 False
         """
-        whitelist = await self.get_group_whitelist(group_id)
-        if user_id in whitelist:
-            return False
-        whitelist.append(user_id)
-        await self.save_group_whitelist(group_id, whitelist)
-        return True
+        return await self._update_id_set(group_id, "whitelist", user_id, add=True)
 
     async def remove_from_whitelist(self, group_id: str, user_id: str) -> bool:
         """
@@ -115,12 +898,7 @@ class Storage:
         Returns:
             如果移除成功返回 True，如果不存在返回 False
         """
-        whitelist = await self.get_group_whitelist(group_id)
-        if user_id not in whitelist:
-            return False
-        whitelist.remove(user_id)
-        await self.save_group_whitelist(group_id, whitelist)
-        return True
+        return await self._update_id_set(group_id, "whitelist", user_id, add=False)
 
     async def add_to_blacklist(self, group_id: str, user_id: str) -> bool:
         """
@@ -133,12 +911,7 @@ class Storage:
         Returns:
             如果添加成功返回 True，如果已存在返回 False
         """
-        blacklist = await self.get_group_blacklist(group_id)
-        if user_id in blacklist:
-            return False
-        blacklist.append(user_id)
-        await self.save_group_blacklist(group_id, blacklist)
-        return True
+        return await self._update_id_set(group_id, "blacklist", user_id, add=True)
 
     async def remove_from_blacklist(self, group_id: str, user_id: str) -> bool:
         """
@@ -151,16 +924,56 @@ class Storage:
         Returns:
             如果移除成功返回 True，如果不存在返回 False
         """
-        blacklist = await self.get_group_blacklist(group_id)
-        if user_id not in blacklist:
-            return False
-        blacklist.remove(user_id)
-        await self.save_group_blacklist(group_id, blacklist)
-        return True
+        return await self._update_id_set(group_id, "blacklist", user_id, add=False)
+
+    async def import_to_whitelist(self, group_id: str, user_ids: Iterable[Any]) -> int:
+        """
+        批量添加用户到白名单，已存在的用户会被跳过
+
+        Args:
+            group_id: 群ID
+            user_ids: 用户ID（可为生成器）
+
+        Returns:
+            新添加的用户数量
+        """
+        return await self._import_id_set(group_id, "whitelist", user_ids)
+
+    async def import_to_blacklist(self, group_id: str, user_ids: Iterable[Any]) -> int:
+        """
+        批量添加用户到黑名单，已存在的用户会被跳过
+
+        Args:
+            group_id: 群ID
+            user_ids: 用户ID（可为生成器）
+
+        Returns:
+            新添加的用户数量
+        """
+        return await self._import_id_set(group_id, "blacklist", user_ids)
+
+    async def load_enabled_groups(self) -> None:
+        """
+        启动时建立群启用状态索引
+
+        首次运行时把旧的 enabled_groups 列表迁移为每个群独立的 enabled_{群ID} 标记；
+        旧列表保留不再写入。
+        """
+        if await self.plugin.get_kv_data("enabled_groups_migrated", False):
+            return
+
+        legacy = await self.plugin.get_kv_data("enabled_groups", [])
+        for group_id in IdSet(legacy):
+            await self.plugin.put_kv_data(f"enabled_{group_id}", True)
+            self._enabled_groups.add(group_id)
+            self._known_groups.add(group_id)
+        await self.plugin.put_kv_data("enabled_groups_migrated", True)
+        if legacy:
+            logger.info(f"[GroupManager] 已迁移 {len(self._enabled_groups)} 个群的启用状态")
 
     async def is_group_enabled(self, group_id: str) -> bool:
         """
-        检查群是否启用
+        检查群是否启用，每个群只在首次检查时读取一次存储
 
         Args:
             group_id: 群ID
@@ -168,31 +981,44 @@ class Storage:
         Returns:
             如果启用返回 True，否则返回 False
         """
-        enabled_groups = await self.plugin.get_kv_data("enabled_groups", [])
-        return str(group_id) in [str(g) for g in enabled_groups]
+        key = normalize_id(group_id)
+        if key in self._known_groups:
+            return key in self._enabled_groups
+
+        generation = self._write_generations.get(f"enabled_{key}", 0)
+        enabled = bool(await self._load(f"enabled_{key}", False))
+        # 读取期间群被启用或禁用时不记录读到的旧状态，以写入方的结果为准
+        if key in self._known_groups:
+            return key in self._enabled_groups
+        if self._write_generations.get(f"enabled_{key}", 0) == generation:
+            if enabled:
+                self._enabled_groups.add(key)
+            self._known_groups.add(key)
+        return enabled
 
     async def enable_group(self, group_id: str) -> None:
         """
-        启用群
+        启用群（write_behind 模式下也立即落盘）
 
         Args:
             group_id: 群ID
         """
-        enabled_groups = await self.plugin.get_kv_data("enabled_groups", [])
-        if str(group_id) not in [str(g) for g in enabled_groups]:
-            enabled_groups.append(str(group_id))
-            await self.plugin.put_kv_data("enabled_groups", enabled_groups)
+        key = normalize_id(group_id)
+        await self._persist(f"enabled_{key}", True, sync=True)
+        self._enabled_groups.add(key)
+        self._known_groups.add(key)
 
     async def disable_group(self, group_id: str) -> None:
         """
-        禁用群
+        禁用群（write_behind 模式下也立即落盘）
 
         Args:
             group_id: 群ID
         """
-        enabled_groups = await self.plugin.get_kv_data("enabled_groups", [])
-        enabled_groups = [g for g in enabled_groups if str(g) != str(group_id)]
-        await self.plugin.put_kv_data("enabled_groups", enabled_groups)
+        key = normalize_id(group_id)
+        await self._persist(f"enabled_{key}", False, sync=True)
+        self._enabled_groups.discard(key)
+        self._known_groups.add(key)
 
     async def get_group_admins(self, group_id: str) -> List[str]:
         """
@@ -204,7 +1030,20 @@ class Storage:
         Returns:
             管理员ID列表
         """
-        return await self.plugin.get_kv_data(f"admins_{group_id}", [])
+        return (await self._read_id_set(group_id, "admins")).to_list()
+
+    async def is_group_admin(self, group_id: str, user_id: str) -> bool:
+        """
+        检查用户是否为群管理员
+
+        Args:
+            group_id: 群ID
+            user_id: 用户ID
+
+        Returns:
+            如果是群管理员返回 True，否则返回 False
+        """
+        return user_id in await self._read_id_set(group_id, "admins")
 
     async def add_group_admin(self, group_id: str, user_id: str) -> bool:
         """
@@ -217,12 +1056,7 @@ class Storage:
         Returns:
             如果添加成功返回 True，如果已存在返回 False
         """
-        admins = await self.get_group_admins(group_id)
-        if user_id in admins:
-            return False
-        admins.append(user_id)
-        await self.plugin.put_kv_data(f"admins_{group_id}", admins)
-        return True
+        return await self._update_id_set(group_id, "admins", user_id, add=True)
 
     async def remove_group_admin(self, group_id: str, user_id: str) -> bool:
         """
@@ -235,9 +1069,4 @@ class Storage:
         Returns:
             如果移除成功返回 True，如果不存在返回 False
         """
-        admins = await self.get_group_admins(group_id)
-        if user_id not in admins:
-            return False
-        admins.remove(user_id)
-        await self.plugin.put_kv_data(f"admins_{group_id}", admins)
-        return True
+        return await self._update_id_set(group_id, "admins", user_id, add=False)
@@ -4,10 +4,18 @@
 负责验证加群申请，支持正则表达式、关键词、白名单和黑名单。
 """
 
+import asyncio
 import re
-from typing import List, Dict, Tuple, Optional
+from typing import Container, List, Dict, Tuple, Optional
 from enum import Enum
 
+from .config import Config, EvaluationMode
+from .rule_engine import RuleEngine, RuleStats
+from .regex_executor import RegexExecutor
+from .linear_regex import check_linear_compatible
+from .global_blocklist import GlobalBlocklist
+from .id_set import normalize_id
+
 
 class RuleType(Enum):
     """规则类型枚举"""
@@ -23,12 +31,311 @@ class ValidationResult(Enum):
     BLACKLISTED = "blacklisted"
 
 
+class RegexBackend(Enum):
+    """正则后端枚举"""
+    RE = "re"
+    LINEAR = "linear"
+
+
 class Validator:
     """验证器类"""
 
-    def __init__(self):
-        """初始化验证器"""
-        pass
+    def __init__(self, config: Optional[Config] = None):
+        """
+        初始化验证器
+
+        Args:
+            config: 配置对象（可选，用于选择规则引擎的匹配模式）
+        """
+        self.config = config
+        # 群ID -> 预编译规则引擎
+        self._engines: Dict[str, RuleEngine] = {}
+        # 群ID -> 编译引擎时群数据的版本号
+        self._engine_versions: Dict[str, int] = {}
+        # 群ID -> 规则标识 -> 命中统计，规则变更重新编译引擎时保留
+        self._rule_stats: Dict[str, Dict[str, RuleStats]] = {}
+
+        # isolated 模式下在工作进程中执行正则，超时的规则视为未匹配
+        self.regex_executor: Optional[RegexExecutor] = None
+        if config and config.regex_execution_mode == "isolated":
+            self.regex_executor = RegexExecutor(
+                max_workers=config.regex_workers,
+                timeout=config.regex_timeout_ms / 1000
+            )
+        # 群ID -> 群选择的正则后端
+        self._regex_backends: Dict[str, str] = {}
+
+        # 群ID -> 超时次数 / 尚未上报的超时规则
+        self.regex_timeout_counts: Dict[str, int] = {}
+        self._regex_timeouts: Dict[str, List[Dict]] = {}
+
+        # 内存映射的全局黑名单，配置的路径变化时重新创建
+        self.global_blocklist: Optional[GlobalBlocklist] = None
+
+    def get_engine(self, group_id: str, rules: List[Dict], version: Optional[int] = None) -> RuleEngine:
+        """
+        获取群的规则引擎，不存在或群数据版本号变化时根据规则列表编译并缓存
+
+        Args:
+            group_id: 群ID
+            rules: 规则列表
+            version: 群数据版本号（可选），与编译时的版本号不同时重新编译
+
+        Returns:
+            该群的规则引擎
+        """
+        key = str(group_id)
+        engine = self._engines.get(key)
+        if engine is not None and version is not None and self._engine_versions.get(key) != version:
+            engine = None
+        if engine is None:
+            if self.config:
+                rule_stats = None
+                if self.uses_rule_stats():
+                    # 统计由 prepare_group 加载，加载前不登记空统计，避免之后覆盖持久化的统计
+                    rule_stats = self._rule_stats.get(key)
+                engine = RuleEngine(
+                    rules,
+                    keyword_mode=self.config.keyword_match_mode,
+                    regex_mode=self.config.regex_match_mode,
+                    rule_stats=rule_stats,
+                    regex_backend=self.get_regex_backend(key)
+                )
+            else:
+                engine = RuleEngine(rules, regex_backend=self.get_regex_backend(key))
+            self._engines[key] = engine
+            if version is not None:
+                self._engine_versions[key] = version
+        return engine
+
+    def invalidate_engine(self, group_id: str) -> None:
+        """
+        使群的规则引擎缓存失效，下次验证时重新编译
+
+        Args:
+            group_id: 群ID
+        """
+        self._engines.pop(str(group_id), None)
+        self._engine_versions.pop(str(group_id), None)
+
+    def get_regex_backend(self, group_id: str) -> str:
+        """
+        获取群使用的正则后端，配置中强制使用线性引擎的群总是返回 "linear"
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            "re" 或 "linear"
+        """
+        if self.is_regex_backend_forced(group_id):
+            return RegexBackend.LINEAR.value
+        return self._regex_backends.get(str(group_id), RegexBackend.RE.value)
+
+    def is_regex_backend_forced(self, group_id: str) -> bool:
+        """
+        检查群是否被配置强制使用线性引擎
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            被强制返回 True，否则返回 False
+        """
+        if not self.config:
+            return False
+        return normalize_id(group_id) in self.config.snapshot.linear_regex_groups
+
+    def set_regex_backend(self, group_id: str, backend: str) -> None:
+        """
+        设置群选择的正则后端，并使规则引擎缓存失效
+
+        Args:
+            group_id: 群ID
+            backend: "re" 或 "linear"
+        """
+        key = str(group_id)
+        self._regex_backends[key] = RegexBackend(backend).value
+        self.invalidate_engine(key)
+
+    async def prepare_group(self, group_id: str, storage) -> None:
+        """
+        首次使用群时加载持久化的正则后端和规则命中统计
+
+        Args:
+            group_id: 群ID
+            storage: 存储对象
+        """
+        key = str(group_id)
+        load_backend = key not in self._regex_backends
+        load_stats = self.uses_rule_stats() and not self.has_rule_stats(key)
+        if not load_backend and not load_stats:
+            return
+
+        # 两次读取互不依赖，并发发出
+        backend, stats = await asyncio.gather(
+            storage.get_regex_backend(key) if load_backend else asyncio.sleep(0),
+            storage.get_rule_stats(key) if load_stats else asyncio.sleep(0)
+        )
+        if load_backend:
+            self.set_regex_backend(key, backend)
+        if load_stats:
+            self.load_rule_stats(key, stats)
+
+    def validate_rule_regex(self, group_id: str, pattern: str) -> Tuple[bool, Optional[str]]:
+        """
+        验证正则表达式能否用于群当前的正则后端
+
+        Args:
+            group_id: 群ID
+            pattern: 正则表达式（不包含 // 包裹）
+
+        Returns:
+            (是否有效, 错误信息)
+        """
+        if self.get_regex_backend(group_id) == RegexBackend.LINEAR.value:
+            return check_linear_compatible(pattern)
+        return self.validate_regex(pattern)
+
+    def uses_rule_stats(self) -> bool:
+        """
+        检查是否收集规则命中统计：只有首个匹配模式下的自适应排序会用到统计
+
+        Returns:
+            需要收集返回 True，否则返回 False
+        """
+        return bool(
+            self.config and self.config.adaptive_rule_order
+            and self.config.evaluation_mode == EvaluationMode.FIRST_MATCH
+        )
+
+    def has_rule_stats(self, group_id: str) -> bool:
+        """
+        检查是否已加载群的规则命中统计
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            已加载返回 True，否则返回 False
+        """
+        return str(group_id) in self._rule_stats
+
+    def load_rule_stats(self, group_id: str, data: Dict[str, Dict]) -> None:
+        """
+        加载持久化的规则命中统计，已编译的引擎会按统计重新排序
+
+        Args:
+            group_id: 群ID
+            data: 规则标识 -> 统计字典
+        """
+        key = str(group_id)
+        self._rule_stats[key] = {
+            rule: RuleStats.from_dict(stats) for rule, stats in (data or {}).items()
+        }
+        self.invalidate_engine(key)
+
+    def pop_dirty_rule_stats(self) -> Dict[str, Dict[str, Dict]]:
+        """
+        取出评估顺序发生变化、需要持久化的规则命中统计
+
+        Returns:
+            群ID -> 规则标识 -> 统计字典
+        """
+        dirty = {}
+        for group_id, engine in self._engines.items():
+            if engine.stats_dirty:
+                engine.stats_dirty = False
+                dirty[group_id] = engine.export_stats()
+        return dirty
+
+    async def evaluate_rules(
+        self,
+        group_id: str,
+        rules: List[Dict],
+        text: str,
+        evaluation_mode: str = EvaluationMode.ALL_MATCHES.value,
+        version: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        使用群的规则引擎评估文本，isolated 模式下正则在工作进程中执行
+
+        Args:
+            group_id: 群ID
+            rules: 规则列表（仅在引擎未缓存时用于编译）
+            text: 待匹配文本
+            evaluation_mode: 评估模式（"first_match" 或 "all_matches"）
+            version: 群数据版本号（可选），用于判断缓存的引擎是否过期
+
+        Returns:
+            匹配的规则列表
+        """
+        engine = self.get_engine(group_id, rules, version)
+        first_match = EvaluationMode(evaluation_mode) == EvaluationMode.FIRST_MATCH
+
+        # 线性引擎不会灾难性回溯，无需放入工作进程执行
+        if self.regex_executor is None or engine.regex_backend == RegexBackend.LINEAR.value:
+            if first_match:
+                first_rule = engine.first_match(text)
+                return [first_rule] if first_rule else []
+            return engine.match(text)
+
+        matched_indexes = engine.match_keyword_indexes(text)
+        if not (first_match and matched_indexes):
+            matched, timed_out = await self.regex_executor.search(
+                [pattern for _, pattern in engine.regex_rules], text
+            )
+            matched_indexes.extend(engine.regex_rules[position][0] for position in matched)
+            if timed_out:
+                key = str(group_id)
+                self.regex_timeout_counts[key] = self.regex_timeout_counts.get(key, 0) + len(timed_out)
+                self._regex_timeouts.setdefault(key, []).extend(
+                    engine.rules[engine.regex_rules[position][0]] for position in timed_out
+                )
+
+        matched_indexes.sort()
+        if first_match:
+            matched_indexes = matched_indexes[:1]
+        return [engine.rules[index] for index in matched_indexes]
+
+    def pop_regex_timeouts(self, group_id: str) -> List[Dict]:
+        """
+        取出群尚未上报的超时正则规则
+
+        Args:
+            group_id: 群ID
+
+        Returns:
+            超时的规则列表
+        """
+        return self._regex_timeouts.pop(str(group_id), [])
+
+    async def start(self) -> None:
+        """预先启动隔离正则执行器的工作进程"""
+        if self.regex_executor is not None:
+            await self.regex_executor.start()
+
+    def shutdown(self) -> None:
+        """关闭隔离正则执行器和全局黑名单映射"""
+        if self.regex_executor is not None:
+            self.regex_executor.shutdown()
+        if self.global_blocklist is not None:
+            self.global_blocklist.close()
+            self.global_blocklist = None
+
+    def match_rules(self, group_id: str, rules: List[Dict], text: str) -> List[Dict]:
+        """
+        使用群的规则引擎匹配文本
+
+        Args:
+            group_id: 群ID
+            rules: 规则列表（仅在引擎未缓存时用于编译）
+            text: 待匹配文本
+
+        Returns:
+            匹配的规则列表
+        """
+        return self.get_engine(group_id, rules).match(text)
 
     @staticmethod
     def is_regex_pattern(pattern: str) -> bool:
@@ -66,9 +373,11 @@ class Validator:
         user_id: str,
         request_text: str,
         rules: List[Dict],
-        whitelist: List[str],
-        blacklist: List[str],
-        default_mode: str = "allow"
+        whitelist: Container[str],
+        blacklist: Container[str],
+        default_mode: str = "allow",
+        evaluation_mode: str = EvaluationMode.ALL_MATCHES.value,
+        version: Optional[int] = None
     ) -> Tuple[ValidationResult, List[Dict]]:
         """
         验证加群申请
@@ -78,21 +387,104 @@ class Validator:
             user_id: 用户ID
             request_text: 申请文本
             rules: 规则列表
-            whitelist: 白名单列表
-            blacklist: 黑名单列表
+            whitelist: 白名单（IdSet 等支持 O(1) 成员检查的集合）
+            blacklist: 黑名单（IdSet 等支持 O(1) 成员检查的集合）
             default_mode: 默认模式（"allow" 或 "reject"）
+            evaluation_mode: 评估模式（"first_match" 找到一条匹配即返回，"all_matches" 收集所有匹配的规则）
+            version: 群数据版本号（可选），用于判断缓存的引擎是否过期
 
         Returns:
             (验证结果, 匹配的规则列表)
         """
-        # 1. 首先检查黑名单
-        if user_id in blacklist:
-            return ValidationResult.BLACKLISTED, []
+        # 1-2. 首先检查全局黑名单和群黑名单，然后检查白名单
+        result = self.check_global_blocklist(user_id)
+        if result is None:
+            result = self.check_membership(user_id, whitelist, blacklist)
+        if result is not None:
+            return result, []
 
-        # 2. 然后检查白名单
+        return await self.evaluate_request(
+            group_id, request_text, rules, default_mode, evaluation_mode, version
+        )
+
+    def get_global_blocklist(self) -> Optional[GlobalBlocklist]:
+        """
+        获取全局黑名单，配置的文件路径变化时重新映射
+
+        Returns:
+            全局黑名单，未配置时返回 None
+        """
+        path = self.config.global_blocklist_path if self.config else ""
+        current = self.global_blocklist
+        if current is not None and current.path != path:
+            current.close()
+            current = self.global_blocklist = None
+        if current is None and path:
+            current = self.global_blocklist = GlobalBlocklist(path)
+        return current
+
+    def check_global_blocklist(self, user_id: str) -> Optional[ValidationResult]:
+        """
+        检查用户是否在全局黑名单中，无需读取任何群数据
+
+        Args:
+            user_id: 用户ID
+
+        Returns:
+            在全局黑名单中返回 BLACKLISTED，否则返回 None
+        """
+        blocklist = self.get_global_blocklist()
+        if blocklist is not None and user_id in blocklist:
+            return ValidationResult.BLACKLISTED
+        return None
+
+    def check_membership(
+        self,
+        user_id: str,
+        whitelist: Container[str],
+        blacklist: Container[str]
+    ) -> Optional[ValidationResult]:
+        """
+        检查用户是否在黑名单或白名单中，黑名单优先
+
+        Args:
+            user_id: 用户ID
+            whitelist: 白名单
+            blacklist: 黑名单
+
+        Returns:
+            在黑名单中返回 BLACKLISTED，在白名单中返回 WHITELISTED，否则返回 None
+        """
+        user_id = normalize_id(user_id)
+        if user_id in blacklist:
+            return ValidationResult.BLACKLISTED
         if user_id in whitelist:
-            return ValidationResult.WHITELISTED, []
+            return ValidationResult.WHITELISTED
+        return None
+
+    async def evaluate_request(
+        self,
+        group_id: str,
+        request_text: str,
+        rules: List[Dict],
+        default_mode: str = "allow",
+        evaluation_mode: str = EvaluationMode.ALL_MATCHES.value,
+        version: Optional[int] = None
+    ) -> Tuple[ValidationResult, List[Dict]]:
+        """
+        根据规则验证申请文本（不检查黑名单和白名单）
+
+        Args:
+            group_id: 群ID
+            request_text: 申请文本
+            rules: 规则列表
+            default_mode: 默认模式（"allow" 或 "reject"）
+            evaluation_mode: 评估模式（"first_match" 或 "all_matches"）
+            version: 群数据版本号（可选），用于判断缓存的引擎是否过期
 
+        Returns:
+            (验证结果, 匹配的规则列表)
+        """
         # 3. 如果没有规则，使用默认模式
         if not rules:
             if default_mode == "allow":
@@ -100,20 +492,10 @@ class Validator:
             else:
                 return ValidationResult.REJECT, []
 
-        # 4. 检查规则匹配
-        matched_rules = []
-
-        for rule in rules:
-            if rule["type"] == RuleType.REGEX.value:
-                try:
-                    if re.search(rule["content"], request_text):
-                        matched_rules.append(rule)
-                except re.error:
-                    # 跳过无效的正则表达式
-                    continue
-            elif rule["type"] == RuleType.KEYWORD.value:
-                if rule["content"] in request_text:
-                    matched_rules.append(rule)
+        # 4. 使用预编译的规则引擎检查规则匹配
+        matched_rules = await self.evaluate_rules(
+            group_id, rules, request_text, evaluation_mode, version
+        )
 
         # 5. 如果至少匹配一条规则，则通过
         if matched_rules:
@@ -4,6 +4,8 @@
 处理加群申请事件，包括验证和通知管理员。
 """
 
+import asyncio
+from functools import partial
 from typing import Optional, List
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api import logger
@@ -11,6 +13,9 @@ from astrbot.api import logger
 from ..core import Config, Storage, Validator, ValidationResult
 from ..utils import NotificationManager
 
+# 后台持久化规则命中统计的间隔（秒）
+RULE_STATS_FLUSH_INTERVAL = 60
+
 
 class GroupJoinRequestHandler:
     """加群申请处理器类"""
@@ -38,6 +43,30 @@ class GroupJoinRequestHandler:
         self.storage = storage
         self.validator = validator
         self.notification_manager = notification_manager
+        # 定时持久化规则命中统计的后台任务
+        self._stats_task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """启动定时持久化规则命中统计的后台任务"""
+        if self._stats_task is None:
+            self._stats_task = asyncio.create_task(self._flush_rule_stats_periodically())
+
+    async def close(self) -> None:
+        """停止后台任务并持久化剩余的规则命中统计"""
+        if self._stats_task is not None:
+            self._stats_task.cancel()
+            await asyncio.gather(self._stats_task, return_exceptions=True)
+            self._stats_task = None
+        await self.flush_rule_stats()
+
+    async def _flush_rule_stats_periodically(self) -> None:
+        """每隔 RULE_STATS_FLUSH_INTERVAL 秒持久化一次规则命中统计"""
+        while True:
+            await asyncio.sleep(RULE_STATS_FLUSH_INTERVAL)
+            try:
+                await self.flush_rule_stats()
+            except Exception as e:
+                logger.error(f"[GroupManager] 持久化规则命中统计失败: {str(e)}")
 
     async def handle_join_request(
         self,
@@ -62,24 +91,57 @@ class GroupJoinRequestHandler:
         Returns:
             (是否通过, 原因)
         """
-        # 获取群的配置
-        rules = await self.storage.get_group_rules(group_id)
-        whitelist = await self.storage.get_group_whitelist(group_id)
-        blacklist = await self.storage.get_group_blacklist(group_id)
-
-        # 验证申请
-        result, matched_rules = await self.validator.validate_request(
-            group_id=group_id,
-            user_id=user_id,
-            request_text=reason,
-            rules=rules,
-            whitelist=whitelist,
-            blacklist=blacklist,
-            default_mode=self.config.default_mode
-        )
+        # 整个请求使用同一份配置快照，处理期间重新加载配置不会影响本次请求
+        config = self.config.snapshot
+
+        # 先检查全局黑名单，再批量读取黑名单和白名单，命中时无需读取或编译规则；
+        # 通知需要回退到群管理员时一并读取，避免通知前再次访问存储
+        fields = ["admins"] if config.enable_admin_notification and not config.admin_list else []
+        result = self.validator.check_global_blocklist(user_id)
+        if result is None:
+            fields += ["whitelist", "blacklist"]
+        group_data = await self.storage.get_group_fields(group_id, fields) if fields else {}
+        group_admins = group_data.get("admins")
+        if result is None:
+            result = self.validator.check_membership(
+                user_id, group_data["whitelist"], group_data["blacklist"]
+            )
+        matched_rules = []
+
+        if result is None:
+            # 规则读取与首次使用群时的正则后端、命中统计加载互不依赖，并发发出
+            (rules, version), _ = await asyncio.gather(
+                self.storage.get_rules_with_version(group_id),
+                self.validator.prepare_group(group_id, self.storage)
+            )
+            result, matched_rules = await self.validator.evaluate_request(
+                group_id=group_id,
+                request_text=reason,
+                rules=rules,
+                default_mode=config.default_mode,
+                evaluation_mode=config.evaluation_mode,
+                version=version
+            )
+
+        # 上报执行超时的正则规则
+        timed_out_rules = self.validator.pop_regex_timeouts(group_id)
+        if timed_out_rules:
+            logger.warning(
+                f"[GroupManager] 群 {group_id} 有 {len(timed_out_rules)} 条正则规则执行超时, "
+                f"已视为未匹配"
+            )
+            await self.notification_manager.dispatch(partial(
+                self.notification_manager.notify_regex_timeout,
+                group_id=group_id,
+                group_name=group_name,
+                user_id=user_id,
+                timed_out_rules=timed_out_rules,
+                config=config,
+                group_admins=group_admins
+            ))
 
         # 记录日志
-        if self.config.enable_logging:
+        if config.enable_logging:
             logger.info(
                 f"[GroupManager] 加群申请验证: "
                 f"群={group_name}({group_id}), "
@@ -88,9 +150,10 @@ class GroupJoinRequestHandler:
                 f"结果={result.value}"
             )
 
-        # 通知管理员
+        # 通知管理员（通知队列运行时只入队，不等待发送完成）
         if event:
-            await self.notification_manager.notify_admin(
+            await self.notification_manager.dispatch(partial(
+                self.notification_manager.notify_admin,
                 event=event,
                 group_id=group_id,
                 group_name=group_name,
@@ -98,8 +161,10 @@ class GroupJoinRequestHandler:
                 user_name=user_name,
                 reason=reason,
                 result=result,
-                matched_rules=matched_rules if result == ValidationResult.ALLOW else None
-            )
+                matched_rules=matched_rules if result == ValidationResult.ALLOW else None,
+                config=config,
+                group_admins=group_admins
+            ))
 
         # 返回结果
         if result in [ValidationResult.ALLOW, ValidationResult.WHITELISTED]:
@@ -114,3 +179,8 @@ class GroupJoinRequestHandler:
                 reject_reason = "验证失败"
 
             return False, reject_reason
+
+    async def flush_rule_stats(self) -> None:
+        """持久化评估顺序发生变化的群的规则命中统计"""
+        for dirty_group_id, stats in self.validator.pop_dirty_rule_stats().items():
+            await self.storage.save_rule_stats(dirty_group_id, stats)
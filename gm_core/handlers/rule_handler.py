@@ -1,14 +1,15 @@
 """
 规则处理器模块
 
-处理规则相关的指令，包括添加、删除、查看、清空和测试规则。
+处理规则相关的指令，包括添加、删除、查看、清空、测试规则以及切换正则后端。
 """
 
 from typing import Optional
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api import logger
 
-from ..core import Config, Storage, Validator, RuleType
+from ..core import Config, Storage, Validator, RuleType, RegexBackend
+from ..core.linear_regex import check_linear_compatible
 from ..utils import MessageBuilder
 from ..utils.permission import is_admin
 
@@ -59,11 +60,13 @@ class RuleHandler:
             yield event.plain_result(MessageBuilder.admin_required(event))
             return
 
+        group_id = event.message_obj.group_id
+        await self.validator.prepare_group(group_id, self.storage)
         is_regex = self.validator.is_regex_pattern(pattern)
 
         if is_regex:
             regex_pattern = pattern[1:-1]
-            is_valid, error = self.validator.validate_regex(regex_pattern)
+            is_valid, error = self.validator.validate_rule_regex(group_id, regex_pattern)
             if not is_valid:
                 yield event.plain_result(MessageBuilder.error(f"正则表达式无效: {error}"))
                 return
@@ -73,18 +76,13 @@ class RuleHandler:
             pattern_type = RuleType.KEYWORD
             content = pattern
 
-        group_id = event.message_obj.group_id
-        group_rules = await self.storage.get_group_rules(group_id)
-
         new_rule = {
             "type": pattern_type.value,
             "content": content,
             "created_by": event.get_sender_id(),
             "created_at": event.message_obj.timestamp
         }
-        group_rules.append(new_rule)
-
-        await self.storage.save_group_rules(group_id, group_rules)
+        rule_count = await self.storage.add_group_rule(group_id, new_rule)
 
         if self.config.enable_logging:
             logger.info(
@@ -93,7 +91,6 @@ class RuleHandler:
                 f"操作者={event.get_sender_id()}"
             )
 
-        rule_count = len(group_rules)
         yield event.plain_result(
             MessageBuilder.success(
                 f"成功添加{'正则表达式' if is_regex else '关键词'}规则\n"
@@ -143,15 +140,15 @@ class RuleHandler:
             yield event.plain_result(MessageBuilder.warning("当前群没有任何规则"))
             return
 
-        if index < 1 or index > len(group_rules):
+        # 在群锁内再次校验索引，避免并发修改后删除错误的规则
+        removed = await self.storage.remove_group_rule(group_id, index)
+        if removed is None:
+            rule_count = len(await self.storage.get_group_rules(group_id))
             yield event.plain_result(
-                MessageBuilder.error(f"索引无效，请输入 1-{len(group_rules)} 之间的数字")
+                MessageBuilder.error(f"索引无效，请输入 1-{rule_count} 之间的数字")
             )
             return
-
-        removed_rule = group_rules.pop(index - 1)
-
-        await self.storage.save_group_rules(group_id, group_rules)
+        removed_rule, remaining = removed
 
         if self.config.enable_logging:
             logger.info(
@@ -165,7 +162,7 @@ class RuleHandler:
                 f"成功删除规则\n"
                 f"📝 类型: {'正则表达式' if removed_rule['type'] == 'regex' else '关键词'}\n"
                 f"🎯 内容: {removed_rule['content']}\n"
-                f"📊 剩余规则数: {len(group_rules)}"
+                f"📊 剩余规则数: {remaining}"
             )
         )
 
@@ -193,7 +190,13 @@ class RuleHandler:
                                       "💡 使用 /gm add [关键词|正则表达式] 添加规则")
             )
         else:
-            yield event.plain_result(MessageBuilder.build_rules_list(group_rules))
+            await self.validator.prepare_group(group_id, self.storage)
+            yield event.plain_result(
+                MessageBuilder.build_rules_list(
+                    group_rules,
+                    regex_backend=self.validator.get_regex_backend(group_id)
+                )
+            )
 
     async def clear_rules(self, event: AstrMessageEvent):
         """
@@ -215,22 +218,20 @@ class RuleHandler:
             return
 
         group_id = event.message_obj.group_id
-        group_rules = await self.storage.get_group_rules(group_id)
+        removed_count = await self.storage.clear_group_rules(group_id)
 
-        if not group_rules:
+        if not removed_count:
             yield event.plain_result(MessageBuilder.warning("当前群没有任何规则"))
             return
 
-        await self.storage.save_group_rules(group_id, [])
-
         if self.config.enable_logging:
             logger.info(
                 f"[GroupManager] 群 {group_id} 清空所有规则, "
-                f"共删除 {len(group_rules)} 条规则, 操作者={event.get_sender_id()}"
+                f"共删除 {removed_count} 条规则, 操作者={event.get_sender_id()}"
             )
 
         yield event.plain_result(
-            MessageBuilder.success(f"已清空当前群的所有规则\n🗑️ 共删除 {len(group_rules)} 条规则")
+            MessageBuilder.success(f"已清空当前群的所有规则\n🗑️ 共删除 {removed_count} 条规则")
         )
 
     async def test_rule(self, event: AstrMessageEvent, test_text: Optional[str] = None):
@@ -265,18 +266,88 @@ class RuleHandler:
             )
             return
 
-        matched_rules = []
+        await self.validator.prepare_group(group_id, self.storage)
+        matched_rules = await self.validator.evaluate_rules(group_id, group_rules, test_text)
+        timed_out_rules = self.validator.pop_regex_timeouts(group_id)
+
+        matched = len(matched_rules) > 0
+        yield event.plain_result(
+            MessageBuilder.build_test_result(test_text, matched, matched_rules, timed_out_rules)
+        )
+
+    async def set_regex_backend(self, event: AstrMessageEvent, backend: Optional[str] = None):
+        """
+        查看或切换当前群的正则后端
+
+        Args:
+            event: 消息事件
+            backend: 正则后端（re 或 linear），为空时显示当前后端
+        """
+        if not event.message_obj.group_id:
+            yield event.plain_result(MessageBuilder.error("此指令仅限群聊使用"))
+            return
 
-        for rule in group_rules:
-            if rule["type"] == RuleType.REGEX.value:
-                try:
-                    if self.validator.test_pattern(rule["content"], test_text)[1]:
-                        matched_rules.append(rule)
-                except Exception:
+        if not self.config.is_group_enabled(event.message_obj.group_id):
+            yield event.plain_result(MessageBuilder.error("当前群未启用群管理功能"))
+            return
+
+        group_id = event.message_obj.group_id
+        await self.validator.prepare_group(group_id, self.storage)
+        current = self.validator.get_regex_backend(group_id)
+
+        if backend is None:
+            yield event.plain_result(
+                MessageBuilder.info(
+                    f"当前群正则后端: {current}\n\n"
+                    "用法: /gm engine [re|linear]\n"
+                    "re: 标准库引擎，支持全部语法\n"
+                    "linear: 线性时间引擎，不会灾难性回溯，不支持反向引用和前后查找断言"
+                )
+            )
+            return
+
+        backend = str(backend).strip().lower()
+        if backend not in [item.value for item in RegexBackend]:
+            yield event.plain_result(
+                MessageBuilder.error("正则后端无效\n\n用法: /gm engine [re|linear]")
+            )
+            return
+
+        if not await is_admin(event, self.storage, self.config):
+            yield event.plain_result(MessageBuilder.admin_required(event))
+            return
+
+        if backend == RegexBackend.RE.value and self.validator.is_regex_backend_forced(group_id):
+            yield event.plain_result(
+                MessageBuilder.error("当前群已被配置为强制使用线性正则引擎，无法切换")
+            )
+            return
+
+        if backend == RegexBackend.LINEAR.value:
+            group_rules = await self.storage.get_group_rules(group_id)
+            incompatible = []
+            for idx, rule in enumerate(group_rules, 1):
+                if rule.get("type") != RuleType.REGEX.value:
                     continue
-            elif rule["type"] == RuleType.KEYWORD.value:
-                if rule["content"] in test_text:
-                    matched_rules.append(rule)
+                is_valid, error = check_linear_compatible(rule.get("content", ""))
+                if not is_valid:
+                    incompatible.append(f"{idx}. {rule.get('content', '')} ({error})")
+            if incompatible:
+                yield event.plain_result(
+                    MessageBuilder.error(
+                        "以下正则规则不受线性引擎支持，请先删除或修改后再切换:\n"
+                        + "\n".join(incompatible)
+                    )
+                )
+                return
 
-        matched = len(matched_rules) > 0
-        yield event.plain_result(MessageBuilder.build_test_result(test_text, matched, matched_rules))
+        await self.storage.save_regex_backend(group_id, backend)
+        self.validator.set_regex_backend(group_id, backend)
+
+        if self.config.enable_logging:
+            logger.info(
+                f"[GroupManager] 群 {group_id} 切换正则后端: {current} -> {backend}, "
+                f"操作者={event.get_sender_id()}"
+            )
+
+        yield event.plain_result(MessageBuilder.success(f"当前群正则后端已切换为 {backend}"))
@@ -4,19 +4,25 @@
 处理白名单和黑名单相关的指令。
 """
 
+import asyncio
+from pathlib import Path
 from typing import Optional
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api import logger
 
 from ..core import Config, Storage
 from ..utils import MessageBuilder
+from ..utils.id_list_io import parse_ids, read_id_file, resolve_data_file, write_id_file
 from ..utils.permission import is_admin
 
+# 名单字段 -> 显示名称
+LIST_NAMES = {"whitelist": "白名单", "blacklist": "黑名单"}
+
 
 class WhitelistBlacklistHandler:
     """白名单/黑名单处理器类"""
 
-    def __init__(self, plugin, config: Config, storage: Storage):
+    def __init__(self, plugin, config: Config, storage: Storage, data_dir: Optional[Path] = None):
         """
         初始化白名单/黑名单处理器
 
@@ -24,10 +30,12 @@ class WhitelistBlacklistHandler:
             plugin: 插件实例
             config: 配置对象
             storage: 存储对象
+            data_dir: 插件数据目录（可选），导入导出文件所在的目录
         """
         self.plugin = plugin
         self.config = config
         self.storage = storage
+        self.data_dir = data_dir
 
     async def whitelist_add(self, event: AstrMessageEvent, user_id: Optional[str] = None):
         """
@@ -244,3 +252,163 @@ class WhitelistBlacklistHandler:
         blacklist = await self.storage.get_group_blacklist(group_id)
 
         yield event.plain_result(MessageBuilder.build_blacklist_list(blacklist))
+
+    async def whitelist_import(self, event: AstrMessageEvent):
+        """
+        批量导入白名单
+
+        Args:
+            event: 消息事件
+        """
+        async for result in self._import_ids(event, "whitelist"):
+            yield result
+
+    async def whitelist_export(self, event: AstrMessageEvent, file_name: Optional[str] = None):
+        """
+        导出白名单到数据目录中的文件
+
+        Args:
+            event: 消息事件
+            file_name: 文件名（可选）
+        """
+        async for result in self._export_ids(event, "whitelist", file_name):
+            yield result
+
+    async def blacklist_import(self, event: AstrMessageEvent):
+        """
+        批量导入黑名单
+
+        Args:
+            event: 消息事件
+        """
+        async for result in self._import_ids(event, "blacklist"):
+            yield result
+
+    async def blacklist_export(self, event: AstrMessageEvent, file_name: Optional[str] = None):
+        """
+        导出黑名单到数据目录中的文件
+
+        Args:
+            event: 消息事件
+            file_name: 文件名（可选）
+        """
+        async for result in self._export_ids(event, "blacklist", file_name):
+            yield result
+
+    async def _import_ids(self, event: AstrMessageEvent, field: str):
+        """
+        从粘贴的ID列表或数据目录中的文件批量导入名单，与现有名单一次合并、一次写入
+
+        Args:
+            event: 消息事件
+            field: "whitelist" 或 "blacklist"
+        """
+        name = LIST_NAMES[field]
+        if not event.message_obj.group_id:
+            yield event.plain_result(MessageBuilder.error("此指令仅限群聊使用"))
+            return
+
+        if not self.config.is_group_enabled(event.message_obj.group_id):
+            yield event.plain_result(MessageBuilder.error("当前群未启用群管理功能"))
+            return
+
+        # 指令参数只解析第一个词，ID列表取指令之后的全部文本（可以换行）
+        parts = event.message_str.strip().split(None, 3)
+        payload = parts[3] if len(parts) > 3 else ""
+        if not payload:
+            yield event.plain_result(
+                MessageBuilder.error(
+                    f"请提供用户ID列表或文件名\n\n用法: /gm {field} import [用户ID列表|文件名]"
+                )
+            )
+            return
+
+        if not await is_admin(event, self.storage, self.config):
+            yield event.plain_result(MessageBuilder.admin_required(event))
+            return
+
+        source = "消息"
+        user_ids = list(parse_ids(payload))
+        if len(user_ids) == 1 and self.data_dir is not None:
+            try:
+                path = resolve_data_file(self.data_dir, user_ids[0])
+            except ValueError:
+                path = None
+            if path is not None and path.is_file():
+                try:
+                    user_ids = await asyncio.to_thread(lambda: list(read_id_file(path)))
+                except (OSError, UnicodeDecodeError) as e:
+                    yield event.plain_result(MessageBuilder.error(f"读取文件失败: {str(e)}"))
+                    return
+                source = f"文件 {path.name}"
+
+        group_id = event.message_obj.group_id
+        if field == "whitelist":
+            added = await self.storage.import_to_whitelist(group_id, user_ids)
+        else:
+            added = await self.storage.import_to_blacklist(group_id, user_ids)
+
+        if self.config.enable_logging:
+            logger.info(
+                f"[GroupManager] 群 {group_id} 批量导入{name}: "
+                f"来源={source}, 新增={added}, 总计={len(user_ids)}, 操作者={event.get_sender_id()}"
+            )
+
+        yield event.plain_result(
+            MessageBuilder.success(
+                f"已从{source}导入{name}: 新增 {added} 个，跳过 {len(user_ids) - added} 个已存在或重复的ID"
+            )
+        )
+
+    async def _export_ids(self, event: AstrMessageEvent, field: str, file_name: Optional[str]):
+        """
+        把名单逐块写入数据目录中的文件
+
+        Args:
+            event: 消息事件
+            field: "whitelist" 或 "blacklist"
+            file_name: 文件名（可选），默认为 {field}_{群ID}.txt
+        """
+        name = LIST_NAMES[field]
+        if not event.message_obj.group_id:
+            yield event.plain_result(MessageBuilder.error("此指令仅限群聊使用"))
+            return
+
+        if not self.config.is_group_enabled(event.message_obj.group_id):
+            yield event.plain_result(MessageBuilder.error("当前群未启用群管理功能"))
+            return
+
+        if not await is_admin(event, self.storage, self.config):
+            yield event.plain_result(MessageBuilder.admin_required(event))
+            return
+
+        if self.data_dir is None:
+            yield event.plain_result(MessageBuilder.error("未配置插件数据目录，无法导出"))
+            return
+
+        group_id = event.message_obj.group_id
+        try:
+            path = resolve_data_file(self.data_dir, file_name or f"{field}_{group_id}.txt")
+        except ValueError as e:
+            yield event.plain_result(MessageBuilder.error(str(e)))
+            return
+
+        if field == "whitelist":
+            id_set = await self.storage.get_whitelist_set(group_id)
+        else:
+            id_set = await self.storage.get_blacklist_set(group_id)
+
+        # 名单修改时整体替换集合，不会原地修改，可以在线程中安全遍历
+        try:
+            count = await asyncio.to_thread(write_id_file, path, iter(id_set))
+        except OSError as e:
+            yield event.plain_result(MessageBuilder.error(f"写入文件失败: {str(e)}"))
+            return
+
+        if self.config.enable_logging:
+            logger.info(
+                f"[GroupManager] 群 {group_id} 导出{name}: "
+                f"文件={path}, 数量={count}, 操作者={event.get_sender_id()}"
+            )
+
+        yield event.plain_result(MessageBuilder.success(f"已导出 {count} 个{name}用户到 {path}"))
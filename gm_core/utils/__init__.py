@@ -7,5 +7,13 @@
 from .message_builder import MessageBuilder
 from .permission import is_admin
 from .notification_manager import NotificationManager
+from .notification_queue import NotificationQueue
+from .notification_digest import NotificationDigest
+from .rate_limiter import RateLimiter
+from .retry_queue import RetryQueue, SendSkipped
+from .circuit_breaker import CircuitBreakers
 
-__all__ = ["MessageBuilder", "is_admin", "NotificationManager"]
+__all__ = [
+    "MessageBuilder", "is_admin", "NotificationManager", "NotificationQueue", "NotificationDigest", "RateLimiter",
+    "RetryQueue", "SendSkipped", "CircuitBreakers"
+]
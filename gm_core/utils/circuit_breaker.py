@@ -0,0 +1,230 @@
+"""
+通知熔断模块
+
+按平台和接收者记录连续发送失败的次数：连续失败达到阈值时熔断器打开，
+之后的发送直接跳过，不再等待注定失败的发送；打开一段时间后进入半开状态，
+放行一次探测发送，成功则关闭，失败则重新打开。
+被跳过的发送返回 SendSkipped，重试队列保留这些通知到熔断器半开时再发送，不计入重试次数。
+"""
+
+import time
+from enum import StrEnum
+from typing import Any, Dict, Optional, Tuple
+
+from astrbot.api import logger
+
+from ..core import Config
+from .retry_queue import SendSkipped
+
+
+class CircuitState(StrEnum):
+    """熔断器状态"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """单个平台或接收者的熔断器"""
+
+    __slots__ = ("state", "failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        # 半开状态下是否已有探测发送在进行
+        self.probing = False
+
+    def current_state(self, now: float, reset_timeout: float) -> CircuitState:
+        """
+        获取当前状态，打开时间超过 reset_timeout 视为半开
+
+        Args:
+            now: 当前时间
+            reset_timeout: 打开后进入半开状态的时间（秒）
+
+        Returns:
+            熔断器状态
+        """
+        if self.state == CircuitState.OPEN and now - self.opened_at >= reset_timeout:
+            return CircuitState.HALF_OPEN
+        return self.state
+
+    def allow(self, now: float, reset_timeout: float) -> bool:
+        """
+        检查是否放行一次发送；半开状态下只放行一次探测发送
+
+        Args:
+            now: 当前时间
+            reset_timeout: 打开后进入半开状态的时间（秒）
+
+        Returns:
+            放行返回 True，跳过返回 False
+        """
+        self.state = self.current_state(now, reset_timeout)
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def retry_after(self, now: float, reset_timeout: float) -> float:
+        """
+        计算被跳过的发送多久后可以再次尝试：打开时等到进入半开状态，
+        半开状态下已有探测发送在进行时再等待一个 reset_timeout
+
+        Args:
+            now: 当前时间
+            reset_timeout: 打开后进入半开状态的时间（秒）
+
+        Returns:
+            等待秒数
+        """
+        remaining = self.opened_at + reset_timeout - now
+        return remaining if remaining > 0 else reset_timeout
+
+    def release_probe(self) -> None:
+        """放弃已取得的探测机会（另一个熔断器跳过了这次发送）"""
+        self.probing = False
+
+    def record_failure(self, now: float, threshold: int) -> bool:
+        """
+        记录一次发送失败；半开状态下的探测失败或连续失败达到阈值时打开
+
+        Args:
+            now: 当前时间
+            threshold: 连续失败阈值
+
+        Returns:
+            熔断器因这次失败而打开时返回 True
+        """
+        self.failures += 1
+        self.probing = False
+        if self.state == CircuitState.HALF_OPEN or (
+            self.state == CircuitState.CLOSED and self.failures >= threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = now
+            return True
+        return False
+
+
+class CircuitBreakers:
+    """通知发送的熔断器集合：每个平台一个，每个接收者一个"""
+
+    def __init__(self, config: Config):
+        """
+        初始化熔断器集合
+
+        Args:
+            config: 配置对象，每次发送时读取当前的熔断配置
+        """
+        self.config = config
+        self._platforms: Dict[str, CircuitBreaker] = {}
+        # 只保留有失败记录的接收者，发送成功后移除
+        self._recipients: Dict[Tuple[str, str], CircuitBreaker] = {}
+        self.skipped = 0
+
+    def before_send(self, platform: str, recipient: str) -> Optional[SendSkipped]:
+        """
+        发送前检查平台和接收者的熔断器
+
+        Args:
+            platform: 平台名称
+            recipient: 接收者ID
+
+        Returns:
+            发送被跳过时返回原因（带可以再次尝试的时间），放行时返回 None
+        """
+        config = self.config.snapshot
+        if config.circuit_failure_threshold <= 0:
+            return None
+
+        now = time.monotonic()
+        platform_breaker = self._platforms.get(platform)
+        if platform_breaker is not None and not platform_breaker.allow(now, config.circuit_reset_timeout_s):
+            self.skipped += 1
+            return SendSkipped(
+                f"平台 {platform} 已熔断，跳过发送",
+                platform_breaker.retry_after(now, config.circuit_reset_timeout_s)
+            )
+
+        recipient_breaker = self._recipients.get((platform, recipient))
+        if recipient_breaker is not None and not recipient_breaker.allow(now, config.circuit_reset_timeout_s):
+            if platform_breaker is not None:
+                platform_breaker.release_probe()
+            self.skipped += 1
+            return SendSkipped(
+                f"管理员 {recipient} 已熔断，跳过发送",
+                recipient_breaker.retry_after(now, config.circuit_reset_timeout_s)
+            )
+        return None
+
+    def release(self, platform: str, recipient: str) -> None:
+        """
+        放弃 before_send 放行的发送（未实际发送），释放已取得的探测机会
+
+        Args:
+            platform: 平台名称
+            recipient: 接收者ID
+        """
+        for breaker in (self._platforms.get(platform), self._recipients.get((platform, recipient))):
+            if breaker is not None:
+                breaker.release_probe()
+
+    def after_send(self, platform: str, recipient: str, success: bool) -> None:
+        """
+        记录一次实际发送的结果
+
+        Args:
+            platform: 平台名称
+            recipient: 接收者ID
+            success: 是否发送成功
+        """
+        config = self.config.snapshot
+        if config.circuit_failure_threshold <= 0:
+            return
+
+        key = (platform, recipient)
+        if success:
+            self._platforms.pop(platform, None)
+            self._recipients.pop(key, None)
+            return
+
+        now = time.monotonic()
+        for name, breakers, breaker_key in (
+            (f"平台 {platform}", self._platforms, platform),
+            (f"管理员 {recipient}", self._recipients, key)
+        ):
+            breaker = breakers.get(breaker_key)
+            if breaker is None:
+                breaker = breakers[breaker_key] = CircuitBreaker()
+            if breaker.record_failure(now, config.circuit_failure_threshold):
+                logger.warning(
+                    f"[GroupManager] {name} 的通知熔断器已打开（连续失败 {breaker.failures} 次），"
+                    f"{config.circuit_reset_timeout_s:g} 秒后探测"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取熔断统计
+
+        Returns:
+            包含各平台状态、打开和半开的接收者、跳过的发送数的字典
+        """
+        now = time.monotonic()
+        reset_timeout = self.config.snapshot.circuit_reset_timeout_s
+        recipients: Dict[CircuitState, list] = {state: [] for state in CircuitState}
+        for (_, recipient), breaker in self._recipients.items():
+            recipients[breaker.current_state(now, reset_timeout)].append(recipient)
+        return {
+            "platforms": {
+                platform: breaker.current_state(now, reset_timeout).value
+                for platform, breaker in self._platforms.items()
+            },
+            "open": recipients[CircuitState.OPEN],
+            "half_open": recipients[CircuitState.HALF_OPEN],
+            "skipped": self.skipped
+        }
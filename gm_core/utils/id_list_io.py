@@ -0,0 +1,96 @@
+"""
+ID 列表导入导出模块
+
+负责解析粘贴的用户ID列表，以及在插件数据目录中逐行读写ID列表文件。
+文件读写均为流式处理，不会在内存中拼接完整的文件内容。
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Union
+
+# 用户ID之间的分隔符：空白、英文/中文逗号和分号
+_ID_PATTERN = re.compile(r"[^\s,，;；]+")
+
+# 每次写入文件的行数
+WRITE_CHUNK_SIZE = 4096
+
+
+def parse_ids(text: str) -> Iterator[str]:
+    """
+    从文本中逐个解析用户ID
+
+    Args:
+        text: 以空白、逗号或分号分隔的用户ID
+
+    Returns:
+        用户ID迭代器
+    """
+    for match in _ID_PATTERN.finditer(text):
+        yield match.group()
+
+
+def resolve_data_file(data_dir: Union[str, Path], file_name: str) -> Path:
+    """
+    解析数据目录中的文件路径，只允许不含目录部分的文件名
+
+    Args:
+        data_dir: 插件数据目录
+        file_name: 文件名
+
+    Returns:
+        文件路径
+
+    Raises:
+        ValueError: 文件名包含目录部分
+    """
+    if not file_name or Path(file_name).name != file_name or file_name in (".", ".."):
+        raise ValueError(f"无效的文件名: {file_name}")
+    return Path(data_dir) / file_name
+
+
+def read_id_file(path: Path) -> Iterator[str]:
+    """
+    逐行读取ID列表文件
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        用户ID迭代器
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            yield from parse_ids(line)
+
+
+def write_id_file(path: Path, user_ids: Iterable[str]) -> int:
+    """
+    逐块写入ID列表文件（每行一个ID），先写入临时文件再原子替换
+
+    Args:
+        path: 文件路径
+        user_ids: 用户ID
+
+    Returns:
+        写入的ID数量
+    """
+    count = 0
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            chunk = []
+            for user_id in user_ids:
+                chunk.append(f"{user_id}\n")
+                if len(chunk) >= WRITE_CHUNK_SIZE:
+                    f.writelines(chunk)
+                    count += len(chunk)
+                    chunk.clear()
+            f.writelines(chunk)
+            count += len(chunk)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+    return count
@@ -4,7 +4,8 @@
 负责构建各种类型的精美消息。
 """
 
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from astrbot.api.event import AstrMessageEvent
 from astrbot.api.message_components import At, Plain
 
@@ -108,12 +109,13 @@ class MessageBuilder:
         return "".join(message_parts)
 
     @staticmethod
-    def build_rules_list(rules: List[Dict]) -> str:
+    def build_rules_list(rules: List[Dict], regex_backend: Optional[str] = None) -> str:
         """
         构建规则列表消息
 
         Args:
             rules: 规则列表
+            regex_backend: 群使用的正则后端，提供时显示在列表开头
 
         Returns:
             格式化后的规则列表
@@ -122,12 +124,66 @@ class MessageBuilder:
             return MessageBuilder.warning("当前群没有任何规则")
 
         message_parts = ["群规则："]
+        if regex_backend:
+            message_parts.append(f"\n正则后端: {regex_backend}")
 
         for rule in rules:
             message_parts.append(f"\n{rule['content']}")
 
         return "".join(message_parts)
 
+    @staticmethod
+    def build_status(sections: Dict[str, Dict[str, object]]) -> str:
+        """
+        构建运行状态消息
+
+        Args:
+            sections: 分组名称 -> {指标名称: 指标值}
+
+        Returns:
+            格式化后的运行状态
+        """
+        message_parts = ["📊 运行状态"]
+
+        for title, metrics in sections.items():
+            message_parts.append(f"\n\n【{title}】")
+            for name, value in metrics.items():
+                message_parts.append(f"\n{name}: {value}")
+
+        return "".join(message_parts)
+
+    @staticmethod
+    def build_dead_letters(entries: List[Dict]) -> str:
+        """
+        构建死信列表消息
+
+        Args:
+            entries: 死信列表（从早到晚）
+
+        Returns:
+            格式化后的死信列表
+        """
+        if not entries:
+            return MessageBuilder.info("没有重试失败的通知")
+
+        message_parts = [
+            "📮 重试失败的通知\n",
+            "=" * 40 + "\n"
+        ]
+
+        for idx, entry in enumerate(entries, 1):
+            failed_at = time.strftime("%m-%d %H:%M", time.localtime(entry.get("failed_at", 0)))
+            summary = entry["message"].split("\n", 1)[0]
+            message_parts.append(
+                f"{idx}. 管理员 {entry['admin_id']}（{failed_at}，已重试 {entry['attempts']} 次）\n"
+                f"   {summary}\n"
+                f"   错误: {entry['last_error']}\n"
+            )
+
+        message_parts.append(f"\n📊 总计: {len(entries)} 条\n💡 /gm deadletter retry 重新投递，/gm deadletter clear 清空")
+
+        return "".join(message_parts)
+
     @staticmethod
     def build_whitelist_list(whitelist: List[str]) -> str:
         """
@@ -184,7 +240,8 @@ class MessageBuilder:
     def build_test_result(
         test_text: str,
         matched: bool,
-        matched_rules: List[Dict]
+        matched_rules: List[Dict],
+        timed_out_rules: Optional[List[Dict]] = None
     ) -> str:
         """
         构建测试结果消息
@@ -193,6 +250,7 @@ class MessageBuilder:
             test_text: 测试文本
             matched: 是否匹配
             matched_rules: 匹配的规则列表
+            timed_out_rules: 执行超时、被视为未匹配的正则规则列表
 
         Returns:
             格式化后的测试结果
@@ -219,6 +277,11 @@ class MessageBuilder:
                 f"🚫 该加群申请将被拒绝！"
             ]
 
+        if timed_out_rules:
+            message_parts.append(f"\n\n⏱️ 以下 {len(timed_out_rules)} 条正则规则执行超时，已视为未匹配:\n")
+            for idx, rule in enumerate(timed_out_rules, 1):
+                message_parts.append(f"{idx}. {rule['content']}\n")
+
         return "".join(message_parts)
 
     @staticmethod
@@ -256,6 +319,10 @@ class MessageBuilder:
    测试文本是否匹配规则
    示例: /gm test 我是学生
 
+⚙️ /gm engine [re|linear]
+   查看或切换当前群的正则后端
+   linear 为线性时间引擎，不支持反向引用和前后查找断言
+
 ⚪ /gm whitelist add [用户ID]
    添加用户到白名单
    示例: /gm whitelist add 123456
@@ -278,6 +345,19 @@ class MessageBuilder:
 📋 /gm blacklist list
    查看黑名单
 
+📥 /gm whitelist|blacklist import [用户ID列表|文件名]
+   批量导入名单（ID 可用空格、逗号或换行分隔；文件位于插件数据目录）
+   示例: /gm blacklist import 111 222 333
+
+📤 /gm whitelist|blacklist export [文件名]
+   导出名单到插件数据目录中的文件
+
+📊 /gm status
+   查看插件运行状态（缓存命中率等）
+
+📮 /gm deadletter [list|retry|clear]
+   查看、重新投递或清空重试失败的管理员通知
+
 ❓ /gm help
    显示此帮助信息
 
@@ -0,0 +1,178 @@
+"""
+通知汇总模块
+
+汇总模式下，发给同一管理员的加群申请通知在窗口内缓冲，
+窗口结束时按群合并为一条汇总消息发送，避免突发申请刷屏和触发平台限流。
+"""
+
+import asyncio
+from collections import Counter
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from astrbot.api import logger
+
+# 验证结果 -> 汇总中的显示名称（按显示顺序排列）
+RESULT_LABELS = {
+    "allow": "✅ 通过（匹配规则）",
+    "whitelisted": "✅ 通过（白名单）",
+    "reject": "❌ 拒绝（未匹配规则）",
+    "blacklisted": "❌ 拒绝（黑名单）",
+}
+
+# 每个群展示的命中最多的规则数和申请理由示例数
+TOP_RULES = 3
+MAX_SAMPLES = 3
+# 申请理由示例的最大长度
+SAMPLE_LENGTH = 50
+
+
+class _GroupDigest:
+    """一个群在汇总窗口内的申请统计"""
+
+    __slots__ = ("group_name", "results", "rules", "samples")
+
+    def __init__(self, group_name: str):
+        self.group_name = group_name
+        self.results: Counter = Counter()
+        self.rules: Counter = Counter()
+        self.samples: List[Tuple[str, str, str]] = []
+
+    def add(self, user_id: str, user_name: str, reason: str, result: str, matched_rules: Optional[List[dict]]):
+        self.results[result] += 1
+        for rule in matched_rules or ():
+            self.rules[(rule["type"], rule["content"])] += 1
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append((user_name, user_id, reason))
+
+    def render(self, group_id: str) -> str:
+        lines = [f"群组: {self.group_name}({group_id})", f"申请数: {sum(self.results.values())}"]
+        for result, label in RESULT_LABELS.items():
+            if self.results[result]:
+                lines.append(f"  {label}: {self.results[result]}")
+
+        if self.rules:
+            lines.append("📋 命中最多的规则:")
+            for idx, ((rule_type, content), count) in enumerate(self.rules.most_common(TOP_RULES), 1):
+                type_text = "🔍 正则" if rule_type == "regex" else "🔑 关键词"
+                lines.append(f"  {idx}. {type_text}: {content}（{count} 次）")
+
+        if self.samples:
+            lines.append("📝 申请理由示例:")
+            for user_name, user_id, reason in self.samples:
+                if len(reason) > SAMPLE_LENGTH:
+                    reason = reason[:SAMPLE_LENGTH] + "…"
+                lines.append(f"  {user_name}({user_id}): {reason}")
+        return "\n".join(lines)
+
+
+class NotificationDigest:
+    """按管理员缓冲通知并定时发送汇总"""
+
+    def __init__(self, send: Callable[[str, str], Awaitable[None]]):
+        """
+        初始化通知汇总
+
+        Args:
+            send: 发送汇总消息的回调，参数为管理员ID和消息内容
+        """
+        self._send = send
+        # 管理员ID -> 群ID -> 群统计
+        self._buffers: Dict[str, Dict[str, _GroupDigest]] = {}
+        # 管理员ID -> (窗口长度, 窗口结束时发送汇总的任务)
+        self._timers: Dict[str, Tuple[float, asyncio.Task]] = {}
+        # 所有未结束的窗口任务，包括窗口已结束、正在发送汇总的任务
+        self._tasks: Set[asyncio.Task] = set()
+        self.sent = 0
+
+    def add(
+        self,
+        admin_ids: Iterable[str],
+        group_id: str,
+        group_name: str,
+        user_id: str,
+        user_name: str,
+        reason: str,
+        result: str,
+        matched_rules: Optional[List[dict]],
+        window: float
+    ) -> None:
+        """
+        把一次加群申请计入每个管理员的汇总，管理员的第一条通知开启汇总窗口
+
+        Args:
+            admin_ids: 需要通知的管理员ID
+            group_id: 群ID
+            group_name: 群名称
+            user_id: 用户ID
+            user_name: 用户名称
+            reason: 申请理由
+            result: 验证结果的值
+            matched_rules: 匹配的规则列表
+            window: 汇总窗口（秒）
+        """
+        for admin_id in admin_ids:
+            admin_id = str(admin_id)
+            groups = self._buffers.setdefault(admin_id, {})
+            group = groups.get(str(group_id))
+            if group is None:
+                group = groups[str(group_id)] = _GroupDigest(group_name)
+            group.add(user_id, user_name, reason, result, matched_rules)
+            if admin_id not in self._timers:
+                task = asyncio.create_task(self._flush_later(admin_id, window))
+                self._timers[admin_id] = (window, task)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    def pending(self) -> int:
+        """
+        获取尚未发送的申请数
+
+        Returns:
+            所有管理员缓冲中的申请数之和
+        """
+        return sum(
+            sum(group.results.values())
+            for groups in self._buffers.values()
+            for group in groups.values()
+        )
+
+    async def _flush_later(self, admin_id: str, window: float) -> None:
+        """窗口结束后发送汇总"""
+        await asyncio.sleep(window)
+        self._timers.pop(admin_id, None)
+        await self._send_digest(admin_id, window)
+
+    async def flush(self, admin_id: str) -> None:
+        """
+        立即发送管理员的汇总，并取消其窗口定时器
+
+        Args:
+            admin_id: 管理员ID
+        """
+        window, task = self._timers.pop(admin_id, (0, None))
+        if task is not None:
+            task.cancel()
+        await self._send_digest(admin_id, window)
+
+    async def _send_digest(self, admin_id: str, window: float) -> None:
+        """把管理员缓冲中的各群统计合并为一条消息发送"""
+        groups = self._buffers.pop(admin_id, None)
+        if not groups:
+            return
+        header = "📊 加群申请汇总" + (f"（最近 {window:g} 秒）" if window else "")
+        message = "\n\n".join([header] + [group.render(group_id) for group_id, group in groups.items()])
+        try:
+            await self._send(admin_id, message)
+            self.sent += 1
+        except Exception as e:
+            logger.error(f"[GroupManager] 发送通知汇总给管理员 {admin_id} 失败: {str(e)}")
+
+    async def close(self) -> None:
+        """立即发送所有剩余的汇总，取消仍在等待的窗口任务并等待正在发送的汇总完成"""
+        for admin_id in list(self._buffers):
+            await self.flush(admin_id)
+        for _, task in self._timers.values():
+            task.cancel()
+        self._timers.clear()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -4,12 +4,19 @@
 负责向管理员发送加群申请通知。
 """
 
-from typing import List, Optional
+import asyncio
+from typing import Dict, Iterable, List, Optional
 from astrbot.api.event import AstrMessageEvent
 from astrbot.api.star import Star
 from astrbot.api import logger
 
 from ..core import Config, Storage, ValidationResult
+from ..core.config import ConfigSnapshot
+from .circuit_breaker import CircuitBreakers
+from .notification_digest import NotificationDigest
+from .notification_queue import NotificationJob, NotificationQueue
+from .rate_limiter import RateLimiter
+from .retry_queue import RetryQueue, SendSkipped
 
 
 class NotificationManager:
@@ -27,6 +34,51 @@ class NotificationManager:
         self.plugin = plugin
         self.config = config
         self.storage = storage
+        # 后台通知队列，start() 后创建；未启动时通知在调用方直接发送
+        self.queue: Optional[NotificationQueue] = None
+        # 汇总模式下按管理员缓冲的通知
+        self.digest = NotificationDigest(self._send_digest)
+        # 所有私聊发送共用的限速器
+        self.rate_limiter = RateLimiter(config)
+        # 按平台和接收者熔断持续失败的发送
+        self.breakers = CircuitBreakers(config)
+        # 发送失败的通知在后台重试
+        self.retry_queue = RetryQueue(config, storage, self._retry_send)
+
+    async def start(self) -> None:
+        """
+        启动后台重试协程，并按配置创建通知队列、启动工作协程（notification_workers 为 0 时不启动队列）
+        """
+        await self.retry_queue.start()
+        config = self.config.snapshot
+        if config.notification_workers <= 0 or self.queue is not None:
+            return
+        self.queue = NotificationQueue(
+            max_size=config.notification_queue_size,
+            workers=config.notification_workers,
+            drop_policy=config.notification_drop_policy
+        )
+        self.queue.start()
+
+    async def close(self) -> None:
+        """发送队列中剩余的通知和尚未发送的汇总，并停止工作协程和重试协程"""
+        if self.queue is not None:
+            await self.queue.close()
+        await self.digest.close()
+        await self.retry_queue.close()
+
+    async def dispatch(self, job: NotificationJob) -> None:
+        """
+        提交通知任务：队列运行时放入队列立即返回，否则直接执行；
+        直接执行时以 max_wait=0 调用任务，发送不等待限速，超出速率的通知交给重试队列
+
+        Args:
+            job: 通知任务（notify_admin 或 notify_regex_timeout 的 partial）
+        """
+        if self.queue is not None and self.queue.running:
+            await self.queue.submit(job)
+        else:
+            await job(max_wait=0.0)
 
     async def notify_admin(
         self,
@@ -37,7 +89,10 @@ class NotificationManager:
         user_name: str,
         reason: str,
         result: ValidationResult,
-        matched_rules: Optional[List[dict]] = None
+        matched_rules: Optional[List[dict]] = None,
+        config: Optional[ConfigSnapshot] = None,
+        group_admins: Optional[Iterable[str]] = None,
+        max_wait: Optional[float] = None
     ) -> bool:
         """
         通知管理员加群申请
@@ -51,23 +106,30 @@ class NotificationManager:
             reason: 申请理由
             result: 验证结果
             matched_rules: 匹配的规则列表
+            config: 配置快照（可选），默认使用当前配置
+            group_admins: 调用方已读取的群管理员（可选），未提供时按需读取
+            max_wait: 每次发送最长的限速等待时间（秒，可选），默认等待到有令牌为止
 
         Returns:
             是否发送成功
         """
-        if not self.config.enable_admin_notification:
+        config = config or self.config.snapshot
+        if not config.enable_admin_notification:
             return False
 
-        admin_list = self.config.admin_list
-
+        admin_list = await self._get_admin_list(group_id, config, group_admins)
         if not admin_list:
-            group_admins = await self.storage.get_group_admins(group_id)
-            if not group_admins:
-                logger.info("[GroupManager] 未配置管理员列表，跳过通知")
-                return False
-            admin_list = group_admins
+            return False
+
+        if config.notification_digest_window_s > 0 and result.value not in config.notification_digest_immediate:
+            self.digest.add(
+                admin_list, group_id, group_name, user_id, user_name, reason,
+                result.value, matched_rules, window=config.notification_digest_window_s
+            )
+            return True
 
         message = self._build_notification_message(
+            config=config,
             group_name=group_name,
             user_name=user_name,
             user_id=user_id,
@@ -76,24 +138,182 @@ class NotificationManager:
             matched_rules=matched_rules
         )
 
-        success_count = 0
-        for admin_id in admin_list:
-            try:
-                await self._send_private_message(str(admin_id), message)
-                success_count += 1
+        results = await self.send_to_admins(admin_list, message, config, max_wait)
+        for admin_id, error in results.items():
+            if error is not None:
+                logger.error(f"[GroupManager] 发送通知给管理员 {admin_id} 失败: {error}")
+                await self.retry_queue.add(admin_id, message, error)
+            elif config.enable_logging:
+                logger.info(
+                    f"[GroupManager] 已发送通知给管理员 {admin_id}: "
+                    f"群={group_name}, 用户={user_name}({user_id}), 结果={result.value}"
+                )
+
+        return any(error is None for error in results.values())
+
+    async def notify_regex_timeout(
+        self,
+        group_id: str,
+        group_name: str,
+        user_id: str,
+        timed_out_rules: List[dict],
+        config: Optional[ConfigSnapshot] = None,
+        group_admins: Optional[Iterable[str]] = None,
+        max_wait: Optional[float] = None
+    ) -> bool:
+        """
+        通知管理员正则规则执行超时
+
+        Args:
+            group_id: 群ID
+            group_name: 群名称
+            user_id: 触发超时的申请人ID
+            timed_out_rules: 执行超时的规则列表
+            config: 配置快照（可选），默认使用当前配置
+            group_admins: 调用方已读取的群管理员（可选），未提供时按需读取
+            max_wait: 每次发送最长的限速等待时间（秒，可选），默认等待到有令牌为止
+
+        Returns:
+            是否发送成功
+        """
+        config = config or self.config.snapshot
+        if not config.enable_admin_notification:
+            return False
+
+        admin_list = await self._get_admin_list(group_id, config, group_admins)
+        if not admin_list:
+            return False
+
+        message = (
+            f"⏱️ 正则规则执行超时\n\n"
+            f"群组: {group_name}({group_id})\n"
+            f"申请人: {user_id}\n"
+            f"以下规则超过截止时间，已视为未匹配，请检查是否存在灾难性回溯:\n"
+        )
+        for idx, rule in enumerate(timed_out_rules, 1):
+            message += f"{idx}. {rule['content']}\n"
+
+        message = message.strip()
+        results = await self.send_to_admins(admin_list, message, config, max_wait)
+        for admin_id, error in results.items():
+            if error is not None:
+                logger.error(f"[GroupManager] 发送超时通知给管理员 {admin_id} 失败: {error}")
+                await self.retry_queue.add(admin_id, message, error)
+
+        return any(error is None for error in results.values())
+
+    async def send_to_admins(
+        self,
+        admin_list: Iterable[str],
+        message: str,
+        config: ConfigSnapshot,
+        max_wait: Optional[float] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        并发向多个管理员发送同一条消息，同时进行的发送数受 notification_concurrency 限制，
+        每次发送受 notification_send_timeout_ms 限制，一个管理员发送缓慢不会拖住其他管理员；
+        平台或管理员的熔断器打开时直接跳过发送，否则按平台和接收者限速后发送，限速等待不计入发送超时；
+        限速等待超过 max_wait 的发送不等待，直接返回 SendSkipped，由重试队列稍后发送
 
-                if self.config.enable_logging:
-                    logger.info(
-                        f"[GroupManager] 已发送通知给管理员 {admin_id}: "
-                        f"群={group_name}, 用户={user_name}({user_id}), 结果={result.value}"
-                    )
-            except Exception as e:
-                logger.error(f"[GroupManager] 发送通知给管理员 {admin_id} 失败: {str(e)}")
+        Args:
+            admin_list: 管理员ID列表
+            message: 消息内容
+            config: 配置快照
+            max_wait: 每次发送最长的限速等待时间（秒，可选），默认等待到有令牌为止
 
-        return success_count > 0
+        Returns:
+            管理员ID -> 错误描述（发送成功时为 None，熔断或限速未实际发送时为 SendSkipped）
+        """
+        semaphore = asyncio.Semaphore(max(config.notification_concurrency, 1))
+        timeout = config.notification_send_timeout_ms / 1000 or None
+        platform = config.admin_notification_platform
+
+        async def send(admin_id: str) -> Optional[str]:
+            async with semaphore:
+                skipped = self.breakers.before_send(platform, admin_id)
+                if skipped is not None:
+                    return skipped
+                try:
+                    if await self.rate_limiter.acquire(platform, admin_id, max_wait) is None:
+                        self.breakers.release(platform, admin_id)
+                        return SendSkipped(
+                            "发送超出速率限制，稍后重试", self.rate_limiter.wait_time(platform, admin_id)
+                        )
+                    await asyncio.wait_for(self._send_private_message(admin_id, message, config), timeout)
+                except asyncio.CancelledError:
+                    # 被取消不代表发送失败，不计入熔断器，只释放已取得的探测机会
+                    self.breakers.release(platform, admin_id)
+                    raise
+                except TimeoutError:
+                    error = f"发送超时（{config.notification_send_timeout_ms}ms）"
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                else:
+                    self.breakers.after_send(platform, admin_id, True)
+                    return None
+                self.breakers.after_send(platform, admin_id, False)
+                return error
+
+        admin_ids = list(dict.fromkeys(str(admin_id) for admin_id in admin_list))
+        errors = await asyncio.gather(*(send(admin_id) for admin_id in admin_ids))
+        return dict(zip(admin_ids, errors, strict=True))
+
+    async def _send_digest(self, admin_id: str, message: str) -> None:
+        """
+        发送通知汇总
+
+        Args:
+            admin_id: 管理员ID
+            message: 汇总消息
+        """
+        error = await self._retry_send(admin_id, message)
+        if error is not None:
+            await self.retry_queue.add(admin_id, message, error)
+            raise RuntimeError(error)
+
+    async def _retry_send(self, admin_id: str, message: str) -> Optional[str]:
+        """
+        按当前配置向单个管理员发送消息
+
+        Args:
+            admin_id: 管理员ID
+            message: 消息内容
+
+        Returns:
+            错误描述，发送成功时为 None
+        """
+        return (await self.send_to_admins([admin_id], message, self.config.snapshot))[admin_id]
+
+    async def _get_admin_list(
+        self,
+        group_id: str,
+        config: ConfigSnapshot,
+        group_admins: Optional[Iterable[str]] = None
+    ) -> List[str]:
+        """
+        获取通知对象：优先使用全局管理员列表，未配置时使用群管理员
+
+        Args:
+            group_id: 群ID
+            config: 配置快照
+            group_admins: 调用方已读取的群管理员（可选）
+
+        Returns:
+            管理员ID列表，没有可通知的管理员时返回空列表
+        """
+        if config.admin_list:
+            return list(config.admin_list)
+
+        if group_admins is None:
+            group_admins = await self.storage.get_group_admins(group_id)
+        group_admins = list(group_admins)
+        if not group_admins:
+            logger.info("[GroupManager] 未配置管理员列表，跳过通知")
+        return group_admins
 
     def _build_notification_message(
         self,
+        config: ConfigSnapshot,
         group_name: str,
         user_name: str,
         user_id: str,
@@ -105,6 +325,7 @@ class NotificationManager:
         构建通知消息
 
         Args:
+            config: 配置快照
             group_name: 群名称
             user_name: 用户名称
             user_id: 用户ID
@@ -115,22 +336,22 @@ class NotificationManager:
         Returns:
             格式化的通知消息
         """
-        templates = self.config.admin_notification_messages
+        templates = config.notification_templates
 
         if result == ValidationResult.WHITELISTED:
-            template = templates.get("request_approved", "")
+            template = templates["request_approved"]
             result_text = "✅ 通过（白名单）"
         elif result == ValidationResult.BLACKLISTED:
-            template = templates.get("request_rejected", "")
+            template = templates["request_rejected"]
             result_text = "❌ 拒绝（黑名单）"
         elif result == ValidationResult.ALLOW:
-            template = templates.get("request_received", "")
+            template = templates["request_received"]
             result_text = "✅ 通过（匹配规则）"
         else:
-            template = templates.get("request_rejected", "")
+            template = templates["request_rejected"]
             result_text = "❌ 拒绝（未匹配规则）"
 
-        message = template.format(
+        message = template.render(
             group_name=group_name,
             user_name=user_name,
             user_id=user_id,
@@ -146,15 +367,16 @@ class NotificationManager:
 
         return message.strip()
 
-    async def _send_private_message(self, user_id: str, message: str) -> None:
+    async def _send_private_message(self, user_id: str, message: str, config: ConfigSnapshot) -> None:
         """
         发送私聊消息
 
         Args:
             user_id: 用户ID
             message: 消息内容
+            config: 配置快照
         """
-        platform = self.config.admin_notification_platform
+        platform = config.admin_notification_platform
 
         unified_msg_origin = f"{platform}:{user_id}"
 
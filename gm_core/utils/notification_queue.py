@@ -0,0 +1,123 @@
+"""
+通知队列模块
+
+进程内的有界异步队列，由后台工作协程执行通知任务，
+使加群申请的处理结果不必等待管理员私聊发送完成。
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from astrbot.api import logger
+
+# 通知任务：调用后返回一个发送通知的协程；队列中的任务不带参数调用，直接执行时传入 max_wait
+NotificationJob = Callable[..., Awaitable[Any]]
+
+
+class NotificationQueue:
+    """有界通知队列"""
+
+    def __init__(self, max_size: int = 1000, workers: int = 2, drop_policy: str = "drop_newest"):
+        """
+        初始化通知队列
+
+        Args:
+            max_size: 队列容量
+            workers: 工作协程数
+            drop_policy: 队列已满时的处理方式（"drop_newest" 丢弃新任务，
+                "drop_oldest" 丢弃最早的任务，"block" 等待队列有空位）
+        """
+        self.max_size = max(int(max_size), 1)
+        self.workers = max(int(workers), 1)
+        self.drop_policy = drop_policy
+        self._queue: asyncio.Queue[NotificationJob] = asyncio.Queue(self.max_size)
+        self._tasks: List[asyncio.Task] = []
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        """工作协程是否在运行"""
+        return bool(self._tasks)
+
+    def start(self) -> None:
+        """启动工作协程"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, job: NotificationJob) -> bool:
+        """
+        提交通知任务
+
+        Args:
+            job: 通知任务
+
+        Returns:
+            任务进入队列返回 True，被丢弃返回 False
+        """
+        if self.drop_policy == "block":
+            await self._queue.put(job)
+            return True
+
+        if self._queue.full():
+            if self.drop_policy != "drop_oldest":
+                self.dropped += 1
+                logger.warning("[GroupManager] 通知队列已满，丢弃新通知")
+                return False
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self.dropped += 1
+            logger.warning("[GroupManager] 通知队列已满，丢弃最早的通知")
+        self._queue.put_nowait(job)
+        return True
+
+    async def _worker(self) -> None:
+        """从队列中取出并执行通知任务"""
+        while True:
+            job = await self._queue.get()
+            try:
+                await job()
+                self.processed += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"[GroupManager] 通知任务执行失败: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        等待队列中的任务执行完毕后停止工作协程
+
+        Args:
+            timeout: 最长等待时间（秒），超时后剩余任务被丢弃
+        """
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except TimeoutError:
+            logger.warning(f"[GroupManager] 通知队列未能在 {timeout} 秒内清空，丢弃 {self._queue.qsize()} 条通知")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取队列统计
+
+        Returns:
+            包含排队数、容量、工作协程数、已处理、失败和丢弃数量的字典
+        """
+        return {
+            "size": self._queue.qsize(),
+            "capacity": self.max_size,
+            "workers": len(self._tasks),
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
@@ -20,15 +20,12 @@ async def is_admin(event: AstrMessageEvent, storage: Storage = None, config: Con
     Returns:
         如果是管理员返回 True，否则返回 False
     """
-    user_id = event.get_sender_id()
-    group_id = event.message_obj.group_id
+    # 未配置全局管理员时所有人都有权限，全局管理员也无需读取群管理员列表
+    if not config or config.is_admin(event.get_sender_id()):
+        return True
 
+    group_id = event.message_obj.group_id
     if storage and group_id:
-        group_admins = await storage.get_group_admins(group_id)
-        if str(user_id) in [str(a) for a in group_admins]:
-            return True
-
-    if config:
-        return config.is_admin(user_id)
+        return await storage.is_group_admin(group_id, event.get_sender_id())
 
-    return True
+    return False
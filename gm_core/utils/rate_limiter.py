@@ -0,0 +1,198 @@
+"""
+发送限速模块
+
+使用令牌桶限制向平台发送消息的速率：每个平台一个桶，每个接收者一个桶。
+令牌不足时发送方等待到有令牌为止（背压），而不是直接失败；
+调用方不能等待时（max_wait）不消耗令牌并立即返回，由调用方稍后重试。
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core import Config
+
+# 接收者桶数量超过该值时清理已经回满的桶
+MAX_IDLE_BUCKETS = 1024
+
+
+class TokenBucket:
+    """令牌桶，允许预约未来的令牌"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        """
+        初始化令牌桶（初始为满）
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发数）
+            now: 当前时间
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float) -> None:
+        """按经过的时间补充令牌"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """
+        计算取得一个令牌需要等待的时间（不消耗令牌）
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            需要等待的秒数
+        """
+        self.refill(now)
+        return max(1 - self.tokens, 0) / self.rate
+
+    def reserve(self, now: float) -> float:
+        """
+        预约一个令牌，令牌不足时余额变为负数
+
+        Args:
+            now: 当前时间
+
+        Returns:
+            需要等待的秒数
+        """
+        self.refill(now)
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    def is_idle(self, now: float) -> bool:
+        """桶是否已经回满"""
+        self.refill(now)
+        return self.tokens >= self.capacity
+
+
+class RateLimiter:
+    """按平台和接收者限速的令牌桶限速器"""
+
+    def __init__(self, config: Config):
+        """
+        初始化限速器
+
+        Args:
+            config: 配置对象，每次发送时读取当前的速率配置
+        """
+        self.config = config
+        self._platform_buckets: Dict[str, TokenBucket] = {}
+        self._recipient_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self.sends = 0
+        self.delayed = 0
+        self.rejected = 0
+        self.waiting = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    @staticmethod
+    def _bucket(buckets: Dict, key: Any, rate: float, burst: int, now: float) -> TokenBucket:
+        """获取桶，不存在或速率配置变化时重新创建"""
+        capacity = max(float(burst), 1.0)
+        bucket = buckets.get(key)
+        if bucket is None or bucket.rate != rate or bucket.capacity != capacity:
+            bucket = buckets[key] = TokenBucket(rate, capacity, now)
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        """清理已经回满的接收者桶"""
+        for key in [key for key, bucket in self._recipient_buckets.items() if bucket.is_idle(now)]:
+            del self._recipient_buckets[key]
+
+    def _buckets(self, platform: str, recipient: str, now: float) -> List[TokenBucket]:
+        """获取发送需要经过的平台桶和接收者桶（未启用的限速不返回）"""
+        config = self.config.snapshot
+        buckets = []
+        if config.rate_limit_platform_per_s > 0:
+            buckets.append(self._bucket(
+                self._platform_buckets, platform,
+                config.rate_limit_platform_per_s, config.rate_limit_platform_burst, now
+            ))
+        if config.rate_limit_recipient_per_s > 0:
+            if len(self._recipient_buckets) > MAX_IDLE_BUCKETS:
+                self._prune(now)
+            buckets.append(self._bucket(
+                self._recipient_buckets, (platform, recipient),
+                config.rate_limit_recipient_per_s, config.rate_limit_recipient_burst, now
+            ))
+        return buckets
+
+    def wait_time(self, platform: str, recipient: str) -> float:
+        """
+        计算向接收者发送一条消息需要等待的时间（不消耗令牌）
+
+        Args:
+            platform: 平台名称
+            recipient: 接收者ID
+
+        Returns:
+            需要等待的秒数
+        """
+        now = time.monotonic()
+        return max((bucket.wait_time(now) for bucket in self._buckets(platform, recipient, now)), default=0.0)
+
+    def reserve(self, platform: str, recipient: str) -> float:
+        """
+        同时向平台桶和接收者桶预约令牌
+
+        Args:
+            platform: 平台名称
+            recipient: 接收者ID
+
+        Returns:
+            需要等待的秒数
+        """
+        now = time.monotonic()
+        return max((bucket.reserve(now) for bucket in self._buckets(platform, recipient, now)), default=0.0)
+
+    async def acquire(self, platform: str, recipient: str, max_wait: Optional[float] = None) -> Optional[float]:
+        """
+        等待到可以向接收者发送一条消息
+
+        Args:
+            platform: 平台名称
+            recipient: 接收者ID
+            max_wait: 最长等待时间（秒，可选），需要等待更久时不消耗令牌、立即返回
+
+        Returns:
+            实际等待的秒数，超过 max_wait 时返回 None
+        """
+        if max_wait is not None and self.wait_time(platform, recipient) > max_wait:
+            self.rejected += 1
+            return None
+        delay = self.reserve(platform, recipient)
+        self.sends += 1
+        if delay > 0:
+            self.delayed += 1
+            self.total_delay += delay
+            self.max_delay = max(self.max_delay, delay)
+            self.waiting += 1
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                self.waiting -= 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取限速统计
+
+        Returns:
+            包含发送数、被延迟和被拒绝的发送数、正在等待的发送数、平均和最大延迟（毫秒）的字典
+        """
+        return {
+            "sends": self.sends,
+            "delayed": self.delayed,
+            "rejected": self.rejected,
+            "waiting": self.waiting,
+            "avg_delay_ms": self.total_delay / self.delayed * 1000 if self.delayed else 0.0,
+            "max_delay_ms": self.max_delay * 1000
+        }
@@ -0,0 +1,313 @@
+"""
+通知重试模块
+
+发送失败的通知进入持久化的重试队列，由后台协程按指数退避（带随机抖动）重新发送；
+重试次数用完的通知移入死信列表，管理员可以通过 /gm deadletter 查看、重新投递或清空。
+重试只在后台进行，加群申请的处理流程只负责把失败的通知放入队列。
+
+未实际发送的通知（熔断或限速，见 SendSkipped）保留到可以发送时再发送，不计入重试次数；
+队列的变化延迟 SAVE_DELAY 秒后合并持久化，只写入有变化的列表。
+"""
+
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from astrbot.api import logger
+
+from ..core import Config, Storage
+
+# 重试队列的最大长度，超出时最早的通知直接移入死信列表
+MAX_PENDING = 1000
+
+# 队列变化后等待该时间再持久化，合并这段时间内的所有变化（秒）
+SAVE_DELAY = 1.0
+
+
+class SendSkipped(str):
+    """未实际发送的原因（熔断器打开或超出速率），retry_after 秒后可以再次发送"""
+
+    def __new__(cls, reason: str, retry_after: float):
+        skipped = super().__new__(cls, reason)
+        skipped.retry_after = max(retry_after, 0.0)
+        return skipped
+
+
+# 重新发送的回调：参数为管理员ID和消息内容，返回错误描述（成功时为 None，未实际发送时为 SendSkipped）
+RetrySend = Callable[[str, str], Awaitable[Optional[str]]]
+
+
+class RetryQueue:
+    """持久化的通知重试队列"""
+
+    def __init__(self, config: Config, storage: Storage, send: RetrySend):
+        """
+        初始化重试队列
+
+        Args:
+            config: 配置对象，每次重试时读取当前的重试配置
+            storage: 存储对象，用于持久化重试队列和死信列表
+            send: 重新发送的回调
+        """
+        self.config = config
+        self.storage = storage
+        self._send = send
+        self._pending: List[Dict[str, Any]] = []
+        self._dead: List[Dict[str, Any]] = []
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        # 尚未持久化的变化
+        self._pending_dirty = False
+        self._dead_dirty = False
+        self._save_task: Optional[asyncio.Task] = None
+        self.retried = 0
+        self.delivered = 0
+
+    @property
+    def running(self) -> bool:
+        """后台重试协程是否在运行"""
+        return self._task is not None
+
+    def backoff(self, attempts: int) -> float:
+        """
+        计算第 attempts 次重试失败后的等待时间：指数增长并加入随机抖动，避免重试同时发生
+
+        Args:
+            attempts: 已经重试的次数（0 表示首次发送失败）
+
+        Returns:
+            等待秒数
+        """
+        config = self.config.snapshot
+        delay = min(
+            config.notification_retry_base_delay_s * 2 ** attempts,
+            config.notification_retry_max_delay_s
+        )
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def load(self) -> None:
+        """从存储中读取上次未完成的重试和死信"""
+        if self._loaded:
+            return
+        self._pending = [dict(entry) for entry in await self.storage.get_notification_retries()]
+        self._dead = [dict(entry) for entry in await self.storage.get_dead_letters()]
+        self._loaded = True
+        if self._pending:
+            logger.info(f"[GroupManager] 已恢复 {len(self._pending)} 条待重试的通知")
+
+    async def start(self) -> None:
+        """读取持久化的队列并启动后台重试协程"""
+        await self.load()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """停止后台重试协程并持久化尚未保存的变化，未完成的重试保留在存储中，下次启动时继续"""
+        for task in (self._task, self._save_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._task = None
+        self._save_task = None
+        await self._save()
+
+    async def add(self, admin_id: str, message: str, error: str) -> None:
+        """
+        把发送失败的通知放入重试队列；未开启重试时直接移入死信列表。
+        未实际发送的通知（SendSkipped）在 retry_after 秒后发送，不等待退避
+
+        Args:
+            admin_id: 管理员ID
+            message: 消息内容
+            error: 首次发送的错误描述
+        """
+        await self.load()
+        now = time.time()
+        entry = {
+            "admin_id": str(admin_id),
+            "message": message,
+            "attempts": 0,
+            "created_at": now,
+            "next_at": now + (error.retry_after if isinstance(error, SendSkipped) else self.backoff(0)),
+            "last_error": str(error)
+        }
+        if self.config.snapshot.notification_retry_max_attempts <= 0:
+            self._bury([entry])
+        else:
+            self._pending.append(entry)
+            self._pending_dirty = True
+            if len(self._pending) > MAX_PENDING:
+                overflow = self._pending[:-MAX_PENDING]
+                del self._pending[:-MAX_PENDING]
+                logger.warning(f"[GroupManager] 重试队列已满，{len(overflow)} 条通知移入死信列表")
+                self._bury(overflow)
+            self._wake.set()
+        self._schedule_save()
+
+    def _bury(self, entries: List[Dict[str, Any]]) -> None:
+        """把通知移入死信列表，超出容量时丢弃最早的死信"""
+        now = time.time()
+        for entry in entries:
+            entry.pop("next_at", None)
+            entry["failed_at"] = now
+            self._dead.append(entry)
+        limit = max(self.config.snapshot.notification_dead_letter_size, 0)
+        if len(self._dead) > limit:
+            del self._dead[:len(self._dead) - limit]
+        self._dead_dirty = True
+
+    def _schedule_save(self) -> None:
+        """SAVE_DELAY 秒后持久化，期间的其他变化合并为一次写入"""
+        if self._save_task is None:
+            self._save_task = asyncio.create_task(self._save_later())
+
+    async def _save_later(self) -> None:
+        """等待 SAVE_DELAY 秒后持久化，写入期间又有变化时继续等待下一轮"""
+        try:
+            while self._pending_dirty or self._dead_dirty:
+                await asyncio.sleep(SAVE_DELAY)
+                await self._save()
+        except Exception as e:
+            logger.error(f"[GroupManager] 保存通知重试队列失败: {str(e)}")
+        finally:
+            self._save_task = None
+
+    async def _save(self) -> None:
+        """持久化有变化的重试队列和死信列表，写入失败时保留变化标记"""
+        if self._pending_dirty:
+            self._pending_dirty = False
+            try:
+                await self.storage.save_notification_retries([dict(entry) for entry in self._pending])
+            except BaseException:
+                self._pending_dirty = True
+                raise
+        if self._dead_dirty:
+            self._dead_dirty = False
+            try:
+                await self.storage.save_dead_letters([dict(entry) for entry in self._dead])
+            except BaseException:
+                self._dead_dirty = True
+                raise
+
+    async def _run(self) -> None:
+        """重试到期的通知，然后等待下一条通知到期或有新通知加入"""
+        while True:
+            try:
+                await self.retry_due()
+            except Exception as e:
+                logger.error(f"[GroupManager] 通知重试失败: {str(e)}")
+            self._wake.clear()
+            next_at = min((entry["next_at"] for entry in self._pending), default=None)
+            timeout = None if next_at is None else max(next_at - time.time(), 0)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def retry_due(self) -> int:
+        """
+        重新发送所有到期的通知；未实际发送的通知不计入重试次数，在可以发送时再次发送
+
+        Returns:
+            本次到期的通知数
+        """
+        now = time.time()
+        due = [entry for entry in self._pending if entry["next_at"] <= now]
+        if not due:
+            return 0
+
+        results = await asyncio.gather(
+            *(self._send(entry["admin_id"], entry["message"]) for entry in due),
+            return_exceptions=True
+        )
+        max_attempts = self.config.snapshot.notification_retry_max_attempts
+        finished = set()
+        exhausted = []
+        for entry, error in zip(due, results, strict=True):
+            if isinstance(error, SendSkipped):
+                entry["last_error"] = str(error)
+                entry["next_at"] = time.time() + error.retry_after
+                continue
+            self.retried += 1
+            entry["attempts"] += 1
+            if error is None:
+                self.delivered += 1
+                finished.add(id(entry))
+                continue
+            entry["last_error"] = str(error) or type(error).__name__
+            if entry["attempts"] >= max_attempts:
+                finished.add(id(entry))
+                exhausted.append(entry)
+            else:
+                entry["next_at"] = time.time() + self.backoff(entry["attempts"])
+        # 重试期间可能有新通知加入，按对象身份移除已完成的通知
+        self._pending = [entry for entry in self._pending if id(entry) not in finished]
+
+        if exhausted:
+            logger.error(
+                f"[GroupManager] {len(exhausted)} 条通知重试 {max_attempts} 次后仍然失败，已移入死信列表"
+            )
+            self._bury(exhausted)
+        self._pending_dirty = True
+        self._schedule_save()
+        return len(due)
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """
+        获取死信列表
+
+        Returns:
+            死信列表（从早到晚）
+        """
+        return [dict(entry) for entry in self._dead]
+
+    async def requeue_dead_letters(self) -> int:
+        """
+        把所有死信重新放入重试队列，立即重试
+
+        Returns:
+            重新投递的通知数
+        """
+        await self.load()
+        now = time.time()
+        for entry in self._dead:
+            entry.pop("failed_at", None)
+            entry["attempts"] = 0
+            entry["next_at"] = now
+        count = len(self._dead)
+        self._pending.extend(self._dead)
+        self._dead = []
+        self._pending_dirty = self._dead_dirty = True
+        self._wake.set()
+        await self._save()
+        return count
+
+    async def clear_dead_letters(self) -> int:
+        """
+        清空死信列表
+
+        Returns:
+            清除的死信数
+        """
+        await self.load()
+        count = len(self._dead)
+        self._dead = []
+        self._dead_dirty = True
+        await self._save()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        获取重试统计
+
+        Returns:
+            包含待重试数、死信数、重试次数和重试成功数的字典
+        """
+        return {
+            "pending": len(self._pending),
+            "dead": len(self._dead),
+            "retried": self.retried,
+            "delivered": self.delivered
+        }
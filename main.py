@@ -9,8 +9,10 @@ Version: v1.1.0
 License: AGPL-v3
 """
 
+import asyncio
+
 from astrbot.api.event import filter, AstrMessageEvent
-from astrbot.api.star import Context, Star, register
+from astrbot.api.star import Context, Star, StarTools, register
 from astrbot.api import logger
 
 
@@ -38,15 +40,28 @@ class GroupManager(Star):
         from gm_core.utils import MessageBuilder, NotificationManager
 
         self.MessageBuilder = MessageBuilder
-
-        self.config = Config(self.context)
-        self.storage = Storage(self)
-        self.validator = Validator()
+        self._config_watch_task = None
+
+        self.config = Config(self.context, config)
+        self.storage = Storage(
+            self,
+            cache_size=self.config.storage_cache_size,
+            layout=self.config.storage_layout,
+            write_mode=self.config.storage_write_mode,
+            flush_delay=self.config.write_behind_delay_ms / 1000,
+            flush_batch_size=self.config.write_behind_batch_size,
+            sync_admin_writes=self.config.sync_admin_writes,
+            compact_threshold=self.config.compact_id_threshold
+        )
+        self.validator = Validator(self.config)
+        self.storage.add_rules_listener(self.validator.invalidate_engine)
 
         self.notification_manager = NotificationManager(self, self.config, self.storage)
 
         self.rule_handler = RuleHandler(self, self.config, self.storage, self.validator)
-        self.wb_handler = WhitelistBlacklistHandler(self, self.config, self.storage)
+        self.wb_handler = WhitelistBlacklistHandler(
+            self, self.config, self.storage, StarTools.get_data_dir("astrbot_plugin_group_manager")
+        )
         self.join_request_handler = GroupJoinRequestHandler(
             self, self.config, self.storage, self.validator, self.notification_manager
         )
@@ -55,10 +70,21 @@ class GroupManager(Star):
 
     async def initialize(self):
         """插件初始化"""
+        await self.storage.load_enabled_groups()
+        await self.notification_manager.start()
+        await self.validator.start()
+        self.join_request_handler.start()
+        self._config_watch_task = asyncio.create_task(self.config.watch())
         logger.info("[GroupManager] 插件初始化完成")
 
     async def terminate(self):
         """插件销毁"""
+        if self._config_watch_task:
+            self._config_watch_task.cancel()
+        await self.notification_manager.close()
+        await self.join_request_handler.close()
+        await self.storage.close()
+        self.validator.shutdown()
         logger.info("[GroupManager] 插件已卸载")
 
     @filter.command_group("gm")
@@ -111,6 +137,15 @@ class GroupManager(Star):
         async for result in self.rule_handler.test_rule(event, test_text):
             yield result
 
+    @gm.command("engine")
+    async def gm_engine(self, event: AstrMessageEvent, backend: str = None):
+        """
+        查看或切换当前群的正则后端
+        用法: /gm engine [re|linear]
+        """
+        async for result in self.rule_handler.set_regex_backend(event, backend):
+            yield result
+
     @gm.group("admin")
     async def gm_admin(self):
         """管理员管理指令组"""
@@ -290,6 +325,24 @@ class GroupManager(Star):
         async for result in self.wb_handler.whitelist_list(event):
             yield result
 
+    @gm_whitelist.command("import")
+    async def gm_whitelist_import(self, event: AstrMessageEvent):
+        """
+        批量导入白名单（粘贴的ID列表，或数据目录中的文件）
+        用法: /gm whitelist import [用户ID列表|文件名]
+        """
+        async for result in self.wb_handler.whitelist_import(event):
+            yield result
+
+    @gm_whitelist.command("export")
+    async def gm_whitelist_export(self, event: AstrMessageEvent, file_name: str = None):
+        """
+        导出白名单到数据目录中的文件
+        用法: /gm whitelist export [文件名]
+        """
+        async for result in self.wb_handler.whitelist_export(event, file_name):
+            yield result
+
     @gm.group("blacklist")
     async def gm_blacklist(self):
         """黑名单管理指令组"""
@@ -322,6 +375,124 @@ class GroupManager(Star):
         async for result in self.wb_handler.blacklist_list(event):
             yield result
 
+    @gm_blacklist.command("import")
+    async def gm_blacklist_import(self, event: AstrMessageEvent):
+        """
+        批量导入黑名单（粘贴的ID列表，或数据目录中的文件）
+        用法: /gm blacklist import [用户ID列表|文件名]
+        """
+        async for result in self.wb_handler.blacklist_import(event):
+            yield result
+
+    @gm_blacklist.command("export")
+    async def gm_blacklist_export(self, event: AstrMessageEvent, file_name: str = None):
+        """
+        导出黑名单到数据目录中的文件
+        用法: /gm blacklist export [文件名]
+        """
+        async for result in self.wb_handler.blacklist_export(event, file_name):
+            yield result
+
+    @gm.command("status")
+    async def gm_status(self, event: AstrMessageEvent):
+        """
+        查看插件运行状态
+        用法: /gm status
+        """
+        from gm_core.utils import is_admin
+        if not await is_admin(event, self.storage, self.config):
+            yield event.plain_result(self.MessageBuilder.admin_required(event))
+            return
+
+        cache = self.storage.cache_stats()
+        sections = {
+            "存储缓存": {
+                "命中": cache["hits"],
+                "未命中": cache["misses"],
+                "命中率": f"{cache['hit_rate']:.1%}",
+                "淘汰": cache["evictions"],
+                "容量": f"{cache['size']}/{cache['capacity']}"
+            }
+        }
+        writes = self.storage.write_stats()
+        sections["存储写入"] = {
+            "模式": writes["mode"],
+            "待写": writes["pending"],
+            "落盘批次": writes["flushes"],
+            "合并写入": writes["coalesced"]
+        }
+        queue = self.notification_manager.queue
+        if queue is not None:
+            notifications = queue.stats()
+            sections["通知队列"] = {
+                "排队": f"{notifications['size']}/{notifications['capacity']}",
+                "工作协程": notifications["workers"],
+                "已处理": notifications["processed"],
+                "失败": notifications["failed"],
+                "丢弃": notifications["dropped"]
+            }
+        limiter = self.notification_manager.rate_limiter.stats()
+        sections["发送限速"] = {
+            "发送": limiter["sends"],
+            "被延迟": limiter["delayed"],
+            "等待中": limiter["waiting"],
+            "平均延迟": f"{limiter['avg_delay_ms']:.0f}ms",
+            "最大延迟": f"{limiter['max_delay_ms']:.0f}ms"
+        }
+        retries = self.notification_manager.retry_queue.stats()
+        sections["通知重试"] = {
+            "待重试": retries["pending"],
+            "已重试": retries["retried"],
+            "重试成功": retries["delivered"],
+            "死信": retries["dead"]
+        }
+        breakers = self.notification_manager.breakers.stats()
+        sections["通知熔断"] = {
+            "平台": ", ".join(f"{name}({state})" for name, state in breakers["platforms"].items()) or "全部正常",
+            "已熔断的管理员": ", ".join(breakers["open"]) or "无",
+            "等待探测的管理员": ", ".join(breakers["half_open"]) or "无",
+            "跳过发送": breakers["skipped"]
+        }
+        if self.config.notification_digest_window_s > 0:
+            sections["通知汇总"] = {
+                "窗口": f"{self.config.notification_digest_window_s:g} 秒",
+                "待汇总申请": self.notification_manager.digest.pending(),
+                "已发送汇总": self.notification_manager.digest.sent
+            }
+        blocklist = self.validator.get_global_blocklist()
+        if blocklist is not None:
+            sections["全局黑名单"] = {
+                "文件": blocklist.path,
+                "ID数": len(blocklist),
+                "加载次数": blocklist.reload_count
+            }
+        yield event.plain_result(self.MessageBuilder.build_status(sections))
+
+    @gm.command("deadletter")
+    async def gm_deadletter(self, event: AstrMessageEvent, action: str = None):
+        """
+        查看、重新投递或清空重试失败的通知
+        用法: /gm deadletter [list|retry|clear]
+        """
+        from gm_core.utils import is_admin
+        if not await is_admin(event, self.storage, self.config):
+            yield event.plain_result(self.MessageBuilder.admin_required(event))
+            return
+
+        retry_queue = self.notification_manager.retry_queue
+        action = (action or "list").strip().lower()
+        if action == "list":
+            await retry_queue.load()
+            yield event.plain_result(self.MessageBuilder.build_dead_letters(retry_queue.dead_letters()))
+        elif action == "retry":
+            count = await retry_queue.requeue_dead_letters()
+            yield event.plain_result(self.MessageBuilder.success(f"已重新投递 {count} 条通知"))
+        elif action == "clear":
+            count = await retry_queue.clear_dead_letters()
+            yield event.plain_result(self.MessageBuilder.success(f"已清空 {count} 条死信"))
+        else:
+            yield event.plain_result(self.MessageBuilder.error("用法: /gm deadletter [list|retry|clear]"))
+
     @gm.command("help", alias={"帮助"})
     async def gm_help(self, event: AstrMessageEvent):
         """
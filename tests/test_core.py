@@ -4,8 +4,22 @@ GroupManager 插件测试
 测试插件的核心功能。
 """
 
+import asyncio
+import functools
+import os
+import time
+
 import pytest
-from groupmanager.core import Config, Validator, RuleType, ValidationResult
+from groupmanager.core import Config, Storage, IdSet, CompactIdSet, Validator, RuleType, ValidationResult, EvaluationMode
+from groupmanager.handlers import GroupJoinRequestHandler, WhitelistBlacklistHandler
+from groupmanager.utils import NotificationManager, NotificationQueue, RateLimiter
+from groupmanager.utils.notification_digest import NotificationDigest
+from groupmanager.utils.id_list_io import parse_ids, read_id_file, resolve_data_file, write_id_file
+from groupmanager.core.global_blocklist import GlobalBlocklist, write_blocklist
+from groupmanager.core.keyword_automaton import KeywordAutomaton
+from groupmanager.core.linear_regex import LinearPattern, LinearRegexError, check_linear_compatible
+from groupmanager.core.regex_executor import RegexExecutor
+from groupmanager.core.rule_engine import RuleEngine, RuleStats, REORDER_INTERVAL
 
 
 class TestValidator:
@@ -65,10 +79,1220 @@ class TestValidator:
         assert is_matched is False
         assert error is None
 
+    def test_match_rules_uses_cached_engine(self):
+        """测试规则引擎缓存与失效"""
+        validator = Validator()
+        rules = [
+            {"type": RuleType.KEYWORD.value, "content": "学生"},
+            {"type": RuleType.REGEX.value, "content": "\\d{11}"},
+            {"type": RuleType.REGEX.value, "content": "[invalid"},
+        ]
+
+        matched = validator.match_rules("1001", rules, "我是学生 13812345678")
+        assert matched == rules[:2]
+
+        # 缓存命中时不会重新解释规则列表
+        assert validator.match_rules("1001", [], "我是学生") == rules[:1]
+
+        # 失效后使用新的规则列表重新编译
+        validator.invalidate_engine("1001")
+        assert validator.match_rules("1001", [], "我是学生") == []
+
+    def test_evaluation_mode(self):
+        """测试首个匹配与全部匹配两种评估模式"""
+        validator = Validator()
+        rules = [
+            {"type": RuleType.KEYWORD.value, "content": "学生"},
+            {"type": RuleType.KEYWORD.value, "content": "同学"},
+        ]
+
+        def validate(mode):
+            return asyncio.run(validator.validate_request(
+                "1001", "42", "我是同学也是学生", rules, [], [], evaluation_mode=mode
+            ))
+
+        result, matched = validate(EvaluationMode.ALL_MATCHES.value)
+        assert result == ValidationResult.ALLOW
+        assert matched == rules
+
+        result, matched = validate(EvaluationMode.FIRST_MATCH.value)
+        assert result == ValidationResult.ALLOW
+        assert len(matched) == 1
+
+
+class TestKeywordAutomaton:
+    """关键词自动机测试类"""
+
+    def test_find_all(self):
+        """测试一次扫描找出所有关键词"""
+        automaton = KeywordAutomaton(["he", "she", "his", "hers", "学生"])
+        assert automaton.find_all("ushers") == {"he", "she", "hers"}
+        assert automaton.find_all("我是学生") == {"学生"}
+        assert automaton.find_all("nothing") == set()
+
+    def test_matches_scan_mode(self):
+        """测试自动机模式与逐条扫描结果一致"""
+        rules = [
+            {"type": RuleType.KEYWORD.value, "content": "大学"},
+            {"type": RuleType.REGEX.value, "content": "\\d{6}"},
+            {"type": RuleType.KEYWORD.value, "content": "北京大学"},
+            {"type": RuleType.KEYWORD.value, "content": "大学"},
+            {"type": RuleType.KEYWORD.value, "content": "清华"},
+        ]
+        text = "北京大学 100871"
+        scan = RuleEngine(rules, keyword_mode="scan").match(text)
+        automaton = RuleEngine(rules, keyword_mode="automaton").match(text)
+        assert automaton == scan == rules[:4]
+
+
+class TestRuleEngine:
+    """规则引擎测试类"""
+
+    def test_combined_first_match(self):
+        """测试合并正则模式的单次扫描结果"""
+        rules = [
+            {"type": RuleType.REGEX.value, "content": "工号\\d{4}"},
+            {"type": RuleType.REGEX.value, "content": "(?i)student"},
+            {"type": RuleType.REGEX.value, "content": "(\\w)\\1"},
+        ]
+        engine = RuleEngine(rules, regex_mode="combined")
+        assert engine.combined is not None
+        # 含反向引用的规则无法合并，单独逐条匹配
+        assert [index for index, _ in engine.uncombined_rules] == [2]
+
+        assert engine.first_match("I am a STUDENT") == rules[1]
+        assert engine.first_match("工号1234") == rules[0]
+        assert engine.first_match("aa") == rules[2]
+        assert engine.first_match("abc") is None
+
+        # 需要完整列表时仍逐条匹配
+        assert engine.match("student 工号1234") == rules[:2]
+
+    def test_adaptive_rule_order(self):
+        """测试根据命中统计调整评估顺序，且统计可恢复"""
+        rules = [
+            {"type": RuleType.KEYWORD.value, "content": "老师"},
+            {"type": RuleType.KEYWORD.value, "content": "学生"},
+        ]
+        engine = RuleEngine(rules, keyword_mode="scan", rule_stats={})
+        assert [unit[0] for unit in engine.scan_units] == [0, 1]
+
+        for _ in range(REORDER_INTERVAL):
+            assert engine.first_match("我是学生") == rules[1]
+
+        # 评估顺序改变，原规则编号不变
+        assert [unit[0] for unit in engine.scan_units] == [1, 0]
+        assert engine.rules == rules
+        assert engine.stats_dirty is True
+
+        restored = {key: RuleStats.from_dict(value) for key, value in engine.export_stats().items()}
+        engine = RuleEngine(rules, keyword_mode="scan", rule_stats=restored)
+        assert [unit[0] for unit in engine.scan_units] == [1, 0]
+
+
+class TestRegexExecutor:
+    """隔离正则执行器测试类"""
+
+    def test_timeout_treated_as_no_match(self):
+        """测试灾难性回溯的正则超时后视为未匹配，且执行器可继续使用"""
+        import re
+
+        executor = RegexExecutor(max_workers=2, timeout=0.3)
+        patterns = [re.compile("(a+)+$"), re.compile("\\d{3}")]
+
+        async def run():
+            try:
+                first = await executor.search(patterns, "a" * 40 + "b 123")
+                second = await executor.search(patterns, "abc 123")
+                return first, second
+            finally:
+                executor.shutdown()
+
+        (matched, timed_out), (matched_again, timed_out_again) = asyncio.run(run())
+        assert matched == [1]
+        assert timed_out == [0]
+        assert executor.timeout_count == 1
+        assert matched_again == [1]
+        assert timed_out_again == []
+
+    def test_timeout_does_not_affect_concurrent_searches(self):
+        """测试一个搜索超时只结束它自己的工作进程，意外退出的工作进程上的搜索会重新执行"""
+        import re
+
+        executor = RegexExecutor(max_workers=2, timeout=0.5)
+        slow = [re.compile("(a+)+$")]
+        fast = [re.compile("\\d{3}")]
+
+        async def run():
+            await executor.start()
+            try:
+                first, second = await asyncio.gather(
+                    executor.search(slow, "a" * 40 + "b"),
+                    executor.search(fast, "abc 123")
+                )
+                worker = executor._idle[0]
+                worker.process.kill()
+                worker.process.join()
+                third = await executor.search(fast, "abc 123")
+                return first, second, third
+            finally:
+                executor.shutdown()
+
+        first, second, third = asyncio.run(run())
+        assert first == ([], [0])
+        assert second == ([0], [])
+        assert third == ([0], [])
+        assert executor.timeout_count == 1
+
+    def test_deadline_covers_whole_request(self):
+        """测试一次请求的所有规则共用截止时间，排队等待工作进程的规则到期后按超时处理"""
+        import re
+        import time
+
+        executor = RegexExecutor(max_workers=1, timeout=0.3)
+        patterns = [re.compile("(a+)+$") for _ in range(4)] + [re.compile("b")]
+
+        async def run():
+            await executor.start()
+            try:
+                started = time.monotonic()
+                result = await executor.search(patterns, "a" * 40 + "b")
+                return result, time.monotonic() - started
+            finally:
+                executor.shutdown()
+
+        (matched, timed_out), elapsed = asyncio.run(run())
+        assert matched == []
+        assert timed_out == [0, 1, 2, 3, 4]
+        assert elapsed < 1.0
+
+
+class TestLinearPattern:
+    """线性正则引擎测试类"""
+
+    def test_matches_like_re(self):
+        """测试匹配结果与标准库一致"""
+        cases = [
+            (r"\d{11}", "电话 13812345678", True),
+            (r"^学生$", "我是学生", False),
+            (r"(?i)\bqq\b", "my QQ number", True),
+            (r"[^a-z]+$", "abc", False),
+            (r"a|", "", True),
+        ]
+        for pattern, text, expected in cases:
+            assert LinearPattern(pattern).search(text) is expected
+
+    def test_rejects_backtracking_features(self):
+        """测试拒绝反向引用和前后查找断言"""
+        for pattern in [r"(a)\1", r"a(?=b)", r"(?<!x)y"]:
+            with pytest.raises(LinearRegexError):
+                LinearPattern(pattern)
+            assert check_linear_compatible(pattern)[0] is False
+        assert check_linear_compatible(r"\d+")[0] is True
+
+    def test_catastrophic_pattern(self):
+        """测试灾难性回溯的正则在线性时间内完成"""
+        pattern = LinearPattern(r"(a+)+$")
+        assert pattern.search("a" * 5000 + "!") is False
+        engine = RuleEngine([{"type": "regex", "content": r"(a|aa)+$"}], regex_backend="linear")
+        assert engine.match("a" * 5000 + "!") == []
+
+
+class FakeKVPlugin:
+    """内存 KV 存储，记录读写次数"""
+
+    def __init__(self):
+        self.data = {}
+        self.reads = 0
+        self.writes = 0
+
+    async def get_kv_data(self, key, default):
+        self.reads += 1
+        return self.data.get(key, default)
+
+    async def put_kv_data(self, key, value):
+        self.writes += 1
+        self.data[key] = value
+
+
+class YieldingKVPlugin(FakeKVPlugin):
+    """每次读写都让出事件循环的内存 KV 存储，用于制造并发交错"""
+
+    async def get_kv_data(self, key, default):
+        await asyncio.sleep(0)
+        value = await super().get_kv_data(key, default)
+        # 读取之后再让出几次，读取方带着旧值跨过其他协程的写入
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return value
+
+    async def put_kv_data(self, key, value):
+        await asyncio.sleep(0)
+        await super().put_kv_data(key, value)
+
+
+class SlowReadKVPlugin(FakeKVPlugin):
+    """slow 为 True 时读取需要等待一段时间的内存 KV 存储，用于让读取跨过并发的写入"""
+
+    def __init__(self):
+        super().__init__()
+        self.slow = False
+
+    async def get_kv_data(self, key, default):
+        value = await super().get_kv_data(key, default)
+        if self.slow:
+            await asyncio.sleep(0.05)
+        return value
+
+
+class FakeEvent:
+    """群聊消息事件，plain_result 直接返回消息文本"""
+
+    def __init__(self, message_str, group_id="1", sender_id="10"):
+        self.message_str = message_str
+        self.message_obj = type("MessageObject", (), {"group_id": group_id})()
+        self.sender_id = sender_id
+
+    def get_sender_id(self):
+        return self.sender_id
+
+    def plain_result(self, text):
+        return text
+
+
+async def collect(results):
+    """收集指令处理器产生的全部回复"""
+    return [result async for result in results]
+
+
+class TestIdSet:
+    """用户ID集合测试类"""
+
+    def test_normalized_membership(self):
+        """测试整数和字符串ID等价，且保持插入顺序并去重"""
+        ids = IdSet([123, "456", " 123 "])
+        assert 123 in ids
+        assert "123" in ids
+        assert ids.to_list() == ["123", "456"]
+        assert ids.add(456) is False
+        assert ids.discard("123") is True
+        assert ids.discard(123) is False
+        assert ids.to_list() == ["456"]
+
+    def test_compact_id_set(self):
+        """测试紧凑集合的成员检查、非数字ID回退以及持久化往返"""
+        ids = CompactIdSet([300, "100", " 200 ", "abc", "0123", str(2 ** 64)])
+        assert 100 in ids and "300" in ids and "abc" in ids
+        assert "0123" in ids and "123" not in ids
+        assert ids.add("150") is True and ids.add(150) is False
+        assert ids.discard("abc") is True and ids.discard("abc") is False
+        assert ids.to_list() == ["100", "150", "200", "300", "0123", str(2 ** 64)]
+        assert CompactIdSet.from_dump(ids.dump()) == ids
+
+
+class TestGlobalBlocklist:
+    """全局黑名单测试类"""
+
+    def test_lookup_and_atomic_reload(self, tmp_path):
+        """测试映射文件上的二分查找，以及文件被替换后重新映射"""
+        path = str(tmp_path / "blocklist.bin")
+        assert write_blocklist(path, [300, "100", "100", "abc", 2 ** 64 - 1]) == 3
+        blocklist = GlobalBlocklist(path, check_interval=0)
+        assert len(blocklist) == 3
+        assert "100" in blocklist and 300 in blocklist and str(2 ** 64 - 1) in blocklist
+        assert "200" not in blocklist and "abc" not in blocklist
+
+        write_blocklist(path, range(1000, 2000))
+        assert "100" not in blocklist and "1500" in blocklist
+        assert blocklist.reload_count == 2
+
+        # 替换后的文件无效时保留当前映射
+        with open(path + ".new", "wb") as f:
+            f.write(b"\x00" * 5)
+        os.replace(path + ".new", path)
+        assert "1500" in blocklist
+        blocklist.close()
+
+    def test_checked_before_group_lists(self, tmp_path):
+        """测试全局黑名单命中时不读取群名单"""
+        path = str(tmp_path / "blocklist.bin")
+        write_blocklist(path, ["100"])
+        plugin = FakeKVPlugin()
+        plugin.data["whitelist_1"] = ["100"]
+        config = Config({"enable_admin_notification": False, "global_blocklist_path": path})
+        storage = Storage(plugin)
+        validator = Validator(config)
+        handler = GroupJoinRequestHandler(
+            plugin, config, storage, validator, NotificationManager(plugin, config, storage)
+        )
+
+        try:
+            result = asyncio.run(handler.handle_join_request("1", "群", "100", "用户", "你好"))
+        finally:
+            validator.shutdown()
+        assert result == (False, "用户在黑名单中")
+        assert plugin.reads == 0
+
+
+class TestStorage:
+    """存储测试类"""
+
+    def test_read_through_cache(self):
+        """测试读取走缓存、写入写穿，默认值也会被缓存"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin, cache_size=2)
+
+        async def run():
+            assert await storage.get_group_whitelist("1") == []
+            assert await storage.add_to_whitelist("1", "100") is True
+            assert await storage.get_group_whitelist("1") == ["100"]
+            # 修改返回值不会污染缓存
+            (await storage.get_group_whitelist("1")).append("200")
+            assert await storage.get_group_whitelist("1") == ["100"]
+
+        asyncio.run(run())
+        assert plugin.reads == 1
+        assert plugin.writes == 1
+        assert plugin.data["whitelist_1"] == ["100"]
+        assert storage.cache_hits == 4
+        assert storage.cache_misses == 1
+
+    def test_membership_sets(self):
+        """测试名单以规范化集合保存，并以去重后的列表持久化"""
+        plugin = FakeKVPlugin()
+        plugin.data["blacklist_1"] = [100, "100", "200"]
+        storage = Storage(plugin)
+
+        async def run():
+            blacklist = await storage.get_blacklist_set("1")
+            assert "100" in blacklist and 200 in blacklist
+            assert await storage.add_to_blacklist("1", 100) is False
+            assert await storage.remove_from_blacklist("1", 200) is True
+            assert await storage.add_group_admin("1", 300) is True
+            assert await storage.is_group_admin("1", "300") is True
+            # 写入副本，之前取得的集合不受影响
+            assert 200 in blacklist
+
+        asyncio.run(run())
+        assert plugin.data["blacklist_1"] == ["100"]
+        assert plugin.data["admins_1"] == ["300"]
+
+    def test_snapshot_layout_migration(self):
+        """测试 snapshot 布局首次访问时从旧键迁移，之后只读取一次"""
+        plugin = FakeKVPlugin()
+        plugin.data["rules_1"] = [{"type": "keyword", "content": "学生"}]
+        plugin.data["blacklist_1"] = [100]
+        storage = Storage(plugin, layout="snapshot")
+
+        async def run():
+            snapshot = await storage.get_group_snapshot("1")
+            assert snapshot.version == 1
+            assert snapshot.rules == [{"type": "keyword", "content": "学生"}]
+            assert "100" in snapshot.blacklist
+            reads = plugin.reads
+            await storage.get_group_snapshot("1")
+            assert plugin.reads == reads
+            await storage.add_to_whitelist("1", "200")
+            return await storage.get_group_snapshot("1")
+
+        updated = asyncio.run(run())
+        assert updated.version == 2
+        assert plugin.data["group_1"]["whitelist"] == ["200"]
+        assert plugin.data["group_1"]["rules"] == [{"type": "keyword", "content": "学生"}]
+
+    @pytest.mark.parametrize("layout", ["keys", "snapshot"])
+    def test_rules_version_invalidates_engine(self, layout):
+        """测试规则修改时重新编译规则引擎，名单修改不会使引擎失效"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin, layout=layout)
+        validator = Validator()
+
+        async def run():
+            await storage.save_group_rules("1", [{"type": "keyword", "content": "学生"}])
+            first = validator.get_engine("1", *await storage.get_rules_with_version("1"))
+            await storage.add_to_blacklist("1", "100")
+            await storage.add_to_whitelist("1", "200")
+            unchanged = validator.get_engine("1", *await storage.get_rules_with_version("1"))
+            await storage.save_group_rules("1", [{"type": "keyword", "content": "老师"}])
+            second = validator.get_engine("1", *await storage.get_rules_with_version("1"))
+            return first, unchanged, second
+
+        first, unchanged, second = asyncio.run(run())
+        assert unchanged is first
+        assert second is not first
+        assert second.match("我是老师") == [{"type": "keyword", "content": "老师"}]
+
+    def test_enabled_groups_migration(self):
+        """测试旧的启用列表迁移为每个群独立的标记"""
+        plugin = FakeKVPlugin()
+        plugin.data["enabled_groups"] = [1, "2"]
+        storage = Storage(plugin)
+
+        async def run():
+            await storage.load_enabled_groups()
+            assert await storage.is_group_enabled("1") is True
+            assert await storage.is_group_enabled(2) is True
+            assert await storage.is_group_enabled("3") is False
+            await storage.disable_group("1")
+            await storage.enable_group("3")
+            # 再次启动时不会重复迁移
+            restarted = Storage(plugin)
+            await restarted.load_enabled_groups()
+            return [await restarted.is_group_enabled(g) for g in ("1", "2", "3")]
+
+        assert asyncio.run(run()) == [False, True, True]
+        assert plugin.data["enabled_groups"] == [1, "2"]
+        assert plugin.data["enabled_1"] is False
+
+    @pytest.mark.parametrize("cache_size", [0, 4])
+    @pytest.mark.parametrize("layout", ["keys", "snapshot"])
+    def test_concurrent_mutations(self, layout, cache_size):
+        """测试同一群的大量并发修改不会丢失写入，不加锁的并发读取也不会把旧值放回缓存"""
+        plugin = YieldingKVPlugin()
+        # 容量很小的缓存不断淘汰，读取反复未命中并与写入交错
+        storage = Storage(plugin, cache_size=cache_size, layout=layout)
+
+        async def run():
+            async def read(group_id):
+                for _ in range(300):
+                    await storage.get_group_lists(group_id)
+                    await storage.get_group_rules(group_id)
+
+            readers = [asyncio.create_task(read(group_id)) for _ in range(5) for group_id in ("1", "2")]
+            await asyncio.gather(
+                *(storage.add_to_whitelist(group_id, str(user_id))
+                  for user_id in range(1000) for group_id in ("1", "2")),
+                *(storage.add_to_blacklist("1", str(user_id)) for user_id in range(500)),
+                *(storage.add_group_rule("1", {"type": "keyword", "content": str(n)})
+                  for n in range(200))
+            )
+            await asyncio.gather(
+                *(storage.remove_from_whitelist("1", str(user_id)) for user_id in range(0, 1000, 2))
+            )
+            await asyncio.gather(*readers)
+            return (
+                await storage.get_group_whitelist("1"),
+                await storage.get_group_whitelist("2"),
+                await storage.get_group_blacklist("1"),
+                await storage.get_group_rules("1")
+            )
+
+        whitelist_1, whitelist_2, blacklist_1, rules_1 = asyncio.run(run())
+        assert sorted(whitelist_1) == sorted(str(n) for n in range(1, 1000, 2))
+        assert len(whitelist_2) == 1000
+        assert len(blacklist_1) == 500
+        assert len(rules_1) == 200
+
+    @pytest.mark.parametrize("layout", ["keys", "snapshot"])
+    def test_slow_reader_does_not_overwrite_cached_write(self, layout):
+        """测试读取未命中期间发生的写入不会被读取方加载的旧值覆盖"""
+        plugin = SlowReadKVPlugin()
+        storage = Storage(plugin, layout=layout)
+
+        async def run():
+            plugin.slow = True
+            reader = asyncio.create_task(storage.get_group_lists("1"))
+            enabled = asyncio.create_task(storage.is_group_enabled("1"))
+            await asyncio.sleep(0.01)
+            plugin.slow = False
+            await storage.add_to_blacklist("1", "111")
+            await storage.enable_group("1")
+            await asyncio.gather(reader, enabled)
+            await storage.add_to_blacklist("1", "222")
+            return await storage.get_group_blacklist("1"), await storage.is_group_enabled("1")
+
+        blacklist, enabled = asyncio.run(run())
+        assert sorted(blacklist) == ["111", "222"]
+        assert enabled
+        persisted = plugin.data["blacklist_1"] if layout == "keys" else plugin.data["group_1"]["blacklist"]
+        assert sorted(persisted) == ["111", "222"]
+
+    def test_write_behind_coalescing(self):
+        """测试 write_behind 模式合并写入，管理员变更和群启用状态立即落盘，close 时写入剩余数据"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin, write_mode="write_behind", flush_delay=60, flush_batch_size=1000)
+
+        async def run():
+            for user_id in range(500):
+                await storage.add_to_blacklist("1", str(user_id))
+            assert plugin.writes == 0
+            assert len(await storage.get_group_blacklist("1")) == 500
+
+            await storage.add_group_admin("1", "900")
+            assert plugin.data["admins_1"] == ["900"]
+            await storage.enable_group("1")
+            assert plugin.data["enabled_1"] is True
+
+            await storage.close()
+
+        asyncio.run(run())
+        assert plugin.writes == 3
+        assert len(plugin.data["blacklist_1"]) == 500
+        assert storage.write_stats()["coalesced"] == 499
+
+    def test_write_behind_batch_size(self):
+        """测试待写键数达到上限时立即落盘，且未落盘的值在缓存淘汰后仍可读到"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin, cache_size=0, write_mode="write_behind", flush_delay=60, flush_batch_size=3)
+
+        async def run():
+            await storage.add_to_whitelist("1", "100")
+            await storage.add_to_whitelist("2", "100")
+            assert plugin.writes == 0
+            assert await storage.get_group_whitelist("1") == ["100"]
+            await storage.add_to_whitelist("3", "100")
+            assert plugin.writes == 3
+            await storage.close()
+
+        asyncio.run(run())
+
+    def test_lru_eviction(self):
+        """测试超过容量时淘汰最久未使用的键"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin, cache_size=2)
+
+        async def run():
+            await storage.get_group_rules("1")
+            await storage.get_group_rules("2")
+            await storage.get_group_rules("1")
+            await storage.get_group_rules("3")
+            await storage.get_group_rules("1")
+            await storage.get_group_rules("2")
+
+        asyncio.run(run())
+        assert plugin.reads == 4
+        assert storage.cache_stats()["evictions"] == 2
+        assert storage.cache_stats()["size"] == 2
+
+    def test_group_fields_read(self):
+        """测试群字段批量读取返回解析后的集合，已缓存的字段不再读取，之后的修改正常写回"""
+        plugin = FakeKVPlugin()
+        plugin.data["whitelist_1"] = ["100"]
+        plugin.data["admins_1"] = [300]
+        storage = Storage(plugin)
+
+        async def run():
+            fields = await storage.get_group_fields("1", ["whitelist", "blacklist", "admins"])
+            assert "100" in fields["whitelist"]
+            assert not fields["blacklist"]
+            assert 300 in fields["admins"]
+            await storage.get_group_fields("1", ["whitelist", "blacklist"])
+            assert await storage.add_to_whitelist("1", "200")
+
+        asyncio.run(run())
+        assert plugin.reads == 3
+        assert sorted(plugin.data["whitelist_1"]) == ["100", "200"]
+
+    @pytest.mark.parametrize("layout", ["keys", "snapshot"])
+    def test_group_fields_write(self, layout):
+        """测试群字段批量写入：版本号只递增一次，包含规则时通知监听器，snapshot 布局下只写入一次"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin, layout=layout)
+        changed = []
+        storage.add_rules_listener(changed.append)
+
+        async def run():
+            await storage.get_group_snapshot("1")
+            version = await storage.get_group_version("1")
+            _, rules_version = await storage.get_rules_with_version("1")
+            writes = plugin.writes
+            await storage.put_group_fields("1", {
+                "rules": [{"type": "keyword", "content": "学生"}],
+                "whitelist": ["100", 200],
+                "blacklist": ["300"]
+            })
+            assert plugin.writes - writes == (1 if layout == "snapshot" else 3)
+            assert await storage.get_group_version("1") == version + 1
+            assert (await storage.get_rules_with_version("1"))[1] == rules_version + 1
+            await storage.put_group_fields("1", {"blacklist": []})
+            assert (await storage.get_rules_with_version("1"))[1] == rules_version + 1
+            with pytest.raises(ValueError):
+                await storage.put_group_fields("1", {"members": []})
+            return await storage.get_group_fields("1", ("rules", "whitelist", "blacklist", "admins"))
+
+        fields = asyncio.run(run())
+        assert changed == ["1"]
+        assert fields["rules"] == [{"type": "keyword", "content": "学生"}]
+        assert "200" in fields["whitelist"] and "100" in fields["whitelist"]
+        assert not fields["blacklist"]
+
+    def test_bulk_import(self):
+        """测试批量导入与现有名单去重，并只写入一次"""
+        plugin = FakeKVPlugin()
+        plugin.data["blacklist_1"] = ["100"]
+        storage = Storage(plugin)
+
+        async def run():
+            added = await storage.import_to_blacklist("1", (str(uid) for uid in range(100, 20100)))
+            assert added == 19999
+            assert await storage.import_to_blacklist("1", ["100", 101]) == 0
+
+        asyncio.run(run())
+        assert plugin.writes == 1
+        assert len(plugin.data["blacklist_1"]) == 20000
+        assert plugin.data["blacklist_1"][0] == "100"
+
+    def test_write_behind_reads_see_in_flight_batch(self):
+        """测试批次落盘期间读取同一键得到待写的值，之后的修改不会覆盖该批次"""
+        plugin = YieldingKVPlugin()
+        storage = Storage(plugin, cache_size=0, write_mode="write_behind", flush_delay=60)
+
+        async def run():
+            await storage.add_to_whitelist("1", "1")
+            flushing = asyncio.create_task(storage.flush())
+            await asyncio.sleep(0)
+            await storage.add_to_whitelist("1", "2")
+            await flushing
+            await storage.close()
+
+        asyncio.run(run())
+        assert sorted(plugin.data["whitelist_1"]) == ["1", "2"]
+
+    def test_compact_threshold(self):
+        """测试名单达到阈值后以紧凑格式持久化，降到阈值以下时恢复为列表"""
+        plugin = FakeKVPlugin()
+        plugin.data["blacklist_1"] = ["100", "200"]
+        storage = Storage(plugin, cache_size=0, compact_threshold=3)
+
+        async def run():
+            assert await storage.add_to_blacklist("1", "300") is True
+            assert plugin.data["blacklist_1"]["format"] == "u64"
+            blacklist = await storage.get_blacklist_set("1")
+            assert isinstance(blacklist, CompactIdSet) and 200 in blacklist
+            assert await storage.remove_from_blacklist("1", "300") is True
+
+        asyncio.run(run())
+        assert plugin.data["blacklist_1"] == ["100", "200"]
+
+
+class TestIdListIO:
+    """ID 列表导入导出测试类"""
+
+    def test_parse_ids(self):
+        """测试空白、中英文逗号和分号均可分隔ID"""
+        assert list(parse_ids("1 2,3，4;5\n6；7")) == ["1", "2", "3", "4", "5", "6", "7"]
+
+    def test_file_round_trip(self, tmp_path):
+        """测试导出文件可以原样导入，且拒绝包含目录的文件名"""
+        path = resolve_data_file(tmp_path, "blacklist.txt")
+        assert write_id_file(path, (str(uid) for uid in range(10000))) == 10000
+        assert list(read_id_file(path)) == [str(uid) for uid in range(10000)]
+        assert not path.with_name("blacklist.txt.tmp").exists()
+        with pytest.raises(ValueError):
+            resolve_data_file(tmp_path, "../secret.txt")
+
+
+class TestWhitelistBlacklistHandler:
+    """白名单/黑名单处理器测试类"""
+
+    def test_import_export_round_trip(self, tmp_path):
+        """测试多行粘贴导入、导出到文件、再从文件导入到另一个群，以及拒绝包含目录的文件名"""
+        plugin = FakeKVPlugin()
+        storage = Storage(plugin)
+        handler = WhitelistBlacklistHandler(plugin, Config({}), storage, tmp_path)
+
+        async def run():
+            imported = await collect(handler.blacklist_import(FakeEvent("/gm blacklist import 111 222,\n333 111")))
+            exported = await collect(handler.blacklist_export(FakeEvent("/gm blacklist export ids.txt"), "ids.txt"))
+            restored = await collect(handler.whitelist_import(FakeEvent("/gm whitelist import ids.txt", group_id="2")))
+            rejected = await collect(
+                handler.blacklist_export(FakeEvent("/gm blacklist export ../ids.txt"), "../ids.txt")
+            )
+            return imported, exported, restored, rejected
+
+        imported, exported, restored, rejected = asyncio.run(run())
+        assert "新增 3 个" in imported[0] and "跳过 1 个" in imported[0]
+        assert (tmp_path / "ids.txt").read_text().split() == ["111", "222", "333"]
+        assert "文件 ids.txt" in restored[0] and "新增 3 个" in restored[0]
+        assert sorted(asyncio.run(storage.get_group_whitelist("2"))) == ["111", "222", "333"]
+        assert "❌" in rejected[0] and not (tmp_path.parent / "ids.txt").exists()
+
+
+class TestGroupJoinRequestHandler:
+    """加群申请处理器测试类"""
+
+    def test_membership_short_circuits_rules(self):
+        """测试黑名单用户在读取规则之前即被拒绝"""
+        plugin = FakeKVPlugin()
+        plugin.data["blacklist_1"] = ["100"]
+        plugin.data["rules_1"] = [{"type": "keyword", "content": "学生"}]
+        config = Config({"enable_admin_notification": False})
+        storage = Storage(plugin)
+        validator = Validator(config)
+        handler = GroupJoinRequestHandler(
+            plugin, config, storage, validator, NotificationManager(plugin, config, storage)
+        )
+
+        async def run():
+            blocked = await handler.handle_join_request("1", "群", "100", "用户", "我是学生")
+            assert "rules_1" not in storage._cache
+            allowed = await handler.handle_join_request("1", "群", "200", "用户", "我是学生")
+            return blocked, allowed
+
+        blocked, allowed = asyncio.run(run())
+        assert blocked == (False, "用户在黑名单中")
+        assert allowed == (True, "验证通过")
+
+    def test_rule_stats_flushed_off_the_join_path(self):
+        """测试规则命中统计不在加群申请中写入，关闭时持久化；全部匹配模式下不读取统计"""
+        rules = [{"type": "keyword", "content": "老师"}, {"type": "keyword", "content": "学生"}]
+
+        def build(mode):
+            plugin = FakeKVPlugin()
+            plugin.data["rules_1"] = rules
+            config = Config({
+                "enable_admin_notification": False,
+                "evaluation_mode": mode,
+                "keyword_match_mode": "scan"
+            })
+            storage = Storage(plugin)
+            validator = Validator(config)
+            handler = GroupJoinRequestHandler(
+                plugin, config, storage, validator, NotificationManager(plugin, config, storage)
+            )
+            return plugin, handler
+
+        plugin, handler = build("first_match")
+
+        async def run(handler, count):
+            for index in range(count):
+                await handler.handle_join_request("1", "群", str(index), "用户", "我是学生")
+
+        asyncio.run(run(handler, REORDER_INTERVAL))
+        assert "rule_stats_1" not in plugin.data
+        asyncio.run(handler.close())
+        assert list(plugin.data["rule_stats_1"]) == ["keyword:学生", "keyword:老师"]
+
+        plugin, handler = build("all_matches")
+        asyncio.run(run(handler, 1))
+        asyncio.run(handler.close())
+        assert "rule_stats_1" not in plugin.data and "rule_stats_1" not in handler.storage._cache
+
+    def test_engine_built_before_prepare_keeps_persisted_stats(self):
+        """测试在加载统计前编译的引擎不会把群的统计标记为已加载而覆盖持久化的统计"""
+        rules = [{"type": "keyword", "content": "老师"}, {"type": "keyword", "content": "学生"}]
+        plugin = FakeKVPlugin()
+        plugin.data["rules_1"] = rules
+        plugin.data["rule_stats_1"] = {"keyword:老师": {"hits": 50, "misses": 0, "cost_ns": 0, "samples": 0}}
+        config = Config({
+            "enable_admin_notification": False,
+            "evaluation_mode": "first_match",
+            "keyword_match_mode": "scan"
+        })
+        storage = Storage(plugin)
+        validator = Validator(config)
+        handler = GroupJoinRequestHandler(
+            plugin, config, storage, validator, NotificationManager(plugin, config, storage)
+        )
+
+        validator.get_engine("1", rules)
+        assert not validator.has_rule_stats("1")
+
+        async def run():
+            await handler.handle_join_request("1", "群", "100", "用户", "我是学生")
+            await handler.close()
+
+        asyncio.run(run())
+        assert plugin.data["rule_stats_1"]["keyword:老师"]["hits"] == 50
+
+
+class TestNotificationManager:
+    """通知管理器测试类"""
+
+    def test_concurrent_fan_out(self):
+        """测试并发发送受并发数限制，慢的管理员超时不影响其他管理员"""
+        config = Config({
+            "admin_list": ["1", "2", "3", "4"],
+            "notification_concurrency": 2,
+            "notification_send_timeout_ms": 100
+        })
+        manager = NotificationManager(None, config, None)
+        active = []
+        peak = []
+
+        async def send(user_id, message, snapshot):
+            active.append(user_id)
+            peak.append(len(active))
+            try:
+                if user_id == "2":
+                    await asyncio.sleep(10)
+                if user_id == "3":
+                    raise RuntimeError("blocked")
+                await asyncio.sleep(0.01)
+            finally:
+                active.remove(user_id)
+
+        manager._send_private_message = send
+        results = asyncio.run(manager.send_to_admins(["1", "2", "3", "4"], "hi", config.snapshot))
+        assert results["1"] is None and results["4"] is None
+        assert "超时" in results["2"]
+        assert results["3"] == "blocked"
+        assert max(peak) == 2
+
+    def test_digest_mode(self):
+        """测试汇总模式合并同一管理员的通知，指定的结果仍立即发送"""
+        config = Config({
+            "admin_list": ["1"],
+            "notification_digest_window_s": 0.05,
+            "notification_digest_immediate": ["whitelisted"]
+        })
+        manager = NotificationManager(None, config, None)
+        sent = []
+
+        async def send(user_id, message, snapshot):
+            sent.append(message)
+
+        manager._send_private_message = send
+        rule = {"type": "keyword", "content": "学生"}
+
+        async def run():
+            for index in range(5):
+                await manager.notify_admin(
+                    None, "10", "群", str(index), "用户", "我是学生", ValidationResult.ALLOW, [rule]
+                )
+            await manager.notify_admin(None, "10", "群", "99", "用户", "你好", ValidationResult.BLACKLISTED)
+            await manager.notify_admin(None, "10", "群", "42", "用户", "你好", ValidationResult.WHITELISTED)
+            assert len(sent) == 1
+            await asyncio.sleep(0.1)
+
+        asyncio.run(run())
+        assert len(sent) == 2
+        digest = sent[1]
+        assert "申请数: 6" in digest
+        assert "✅ 通过（匹配规则）: 5" in digest and "❌ 拒绝（黑名单）: 1" in digest
+        assert "学生（5 次）" in digest
+
+    def test_digest_close_waits_for_running_timers(self):
+        """测试关闭汇总时等待窗口已结束、正在发送的汇总完成，并取消仍在等待的窗口任务"""
+        sent = []
+        release = None
+
+        async def send(admin_id, message):
+            if admin_id == "1":
+                await release.wait()
+            sent.append(admin_id)
+
+        async def run():
+            nonlocal release
+            release = asyncio.Event()
+            digest = NotificationDigest(send)
+            digest.add(["1"], "10", "群", "100", "用户", "你好", "allow", None, 0.01)
+            await asyncio.sleep(0.05)
+            digest.add(["2"], "10", "群", "200", "用户", "你好", "allow", None, 60)
+            closing = asyncio.create_task(digest.close())
+            await asyncio.sleep(0.02)
+            assert not closing.done()
+            release.set()
+            await closing
+            assert not digest._tasks
+
+        asyncio.run(run())
+        assert sorted(sent) == ["1", "2"]
+
+    def test_failed_sends_retry_then_dead_letter(self):
+        """测试发送失败的通知持久化后在后台重试，重试次数用完后进入死信列表"""
+        plugin = FakeKVPlugin()
+        config = Config({
+            "admin_list": ["1", "2"],
+            "notification_retry_max_attempts": 2,
+            "notification_retry_base_delay_s": 0.02,
+            "rate_limit_recipient_per_s": 0
+        })
+        manager = NotificationManager(plugin, config, Storage(plugin))
+        attempts = []
+
+        async def send(user_id, message, snapshot):
+            attempts.append(user_id)
+            if user_id == "2" or len(attempts) <= 2:
+                raise RuntimeError("offline")
+
+        manager._send_private_message = send
+
+        async def run():
+            await manager.start()
+            delivered = await manager.notify_admin(None, "10", "群", "5", "用户", "你好", ValidationResult.ALLOW)
+            assert not delivered
+            assert manager.retry_queue.stats()["pending"] == 2
+            await asyncio.sleep(0.3)
+            await manager.close()
+
+        asyncio.run(run())
+        assert attempts.count("1") == 2 and attempts.count("2") == 3
+        assert plugin.data["notification_retries"] == []
+        dead = plugin.data["notification_dead_letters"]
+        assert [(entry["admin_id"], entry["attempts"], entry["last_error"]) for entry in dead] == [("2", 2, "offline")]
+        assert manager.retry_queue.stats()["delivered"] == 1
+
+    def test_circuit_breaker_skips_and_probes(self):
+        """测试连续失败后熔断器打开并跳过发送，恢复时间后放行一次探测发送"""
+        config = Config({
+            "circuit_failure_threshold": 2,
+            "circuit_reset_timeout_s": 0.05,
+            "rate_limit_recipient_per_s": 0
+        })
+        manager = NotificationManager(None, config, None)
+        calls = []
+        healthy = {"1"}
+
+        async def send(user_id, message, snapshot):
+            calls.append(user_id)
+            if user_id not in healthy:
+                raise RuntimeError("blocked")
+
+        manager._send_private_message = send
+
+        async def run():
+            results = []
+            for _ in range(3):
+                results.append(await manager.send_to_admins(["1", "2"], "hi", config.snapshot))
+            stats = manager.breakers.stats()
+            await asyncio.sleep(0.06)
+            healthy.add("2")
+            results.append(await manager.send_to_admins(["2"], "hi", config.snapshot))
+            return results, stats
+
+        results, stats = asyncio.run(run())
+        assert calls == ["1", "2", "1", "2", "1", "2"]
+        assert "已熔断" in results[2]["2"] and results[2]["1"] is None
+        assert stats["open"] == ["2"] and stats["platforms"] == {} and stats["skipped"] == 1
+        assert results[3]["2"] is None
+        assert manager.breakers.stats()["open"] == []
+
+    def test_cancelled_send_is_not_a_failure(self):
+        """测试发送被取消时不计入熔断器，半开状态下的探测机会被释放"""
+        config = Config({
+            "circuit_failure_threshold": 1,
+            "circuit_reset_timeout_s": 0.05,
+            "rate_limit_recipient_per_s": 0
+        })
+        manager = NotificationManager(None, config, None)
+        healthy = set()
+
+        async def send(user_id, message, snapshot):
+            if user_id == "slow":
+                await asyncio.sleep(10)
+            if user_id not in healthy:
+                raise RuntimeError("blocked")
+
+        manager._send_private_message = send
+
+        async def cancel_send(user_id):
+            task = asyncio.create_task(manager.send_to_admins([user_id], "hi", config.snapshot))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        async def run():
+            await cancel_send("slow")
+            assert manager.breakers.stats()["platforms"] == {}
+            await manager.send_to_admins(["1"], "hi", config.snapshot)
+            assert manager.breakers.stats()["open"] == ["1"]
+            await asyncio.sleep(0.06)
+            healthy.add("1")
+            # 取消半开状态下的探测发送后，下一次发送仍然可以探测
+            manager._send_private_message = lambda *args: asyncio.sleep(10)
+            await cancel_send("1")
+            manager._send_private_message = send
+            return await manager.send_to_admins(["1"], "hi", config.snapshot)
+
+        assert asyncio.run(run()) == {"1": None}
+        assert manager.breakers.stats()["open"] == []
+
+    def test_breaker_skips_held_until_half_open(self):
+        """测试熔断跳过的通知不计入重试次数，保留到熔断器半开时发送，且队列变化合并持久化"""
+        plugin = FakeKVPlugin()
+        config = Config({
+            "admin_list": ["1"],
+            "circuit_failure_threshold": 1,
+            "circuit_reset_timeout_s": 0.2,
+            "notification_retry_max_attempts": 1,
+            "notification_retry_base_delay_s": 0.02,
+            "rate_limit_recipient_per_s": 0
+        })
+        manager = NotificationManager(plugin, config, Storage(plugin))
+        calls = []
+
+        async def send(user_id, message, snapshot):
+            calls.append(message)
+            if len(calls) == 1:
+                raise RuntimeError("offline")
+
+        manager._send_private_message = send
+
+        async def run():
+            await manager.start()
+            for user_id in ("5", "6", "7"):
+                await manager.notify_admin(None, "10", "群", user_id, "用户", "你好", ValidationResult.ALLOW)
+            assert len(calls) == 1
+            pending = manager.retry_queue._pending
+            assert [entry["attempts"] for entry in pending] == [0, 0, 0]
+            assert all(entry["next_at"] - time.time() > 0.1 for entry in pending[1:])
+            await asyncio.sleep(0.1)
+            assert len(calls) == 1 and all(entry["attempts"] == 0 for entry in pending)
+            writes = plugin.writes
+            await asyncio.sleep(0.6)
+            await manager.close()
+            return writes
+
+        writes = asyncio.run(run())
+        assert len(calls) == 4
+        assert writes == 0
+        assert plugin.data["notification_retries"] == []
+        assert plugin.data.get("notification_dead_letters", []) == []
+        stats = manager.retry_queue.stats()
+        assert stats["delivered"] == 3 and stats["retried"] == 3
+
+    def test_inline_send_does_not_wait_for_rate_limit(self):
+        """测试未启动通知队列时超出速率的通知不等待限速，直接交给重试队列"""
+        plugin = FakeKVPlugin()
+        config = Config({
+            "admin_list": ["1"],
+            "notification_workers": 0,
+            "notification_retry_base_delay_s": 60,
+            "rate_limit_recipient_per_s": 0.1,
+            "rate_limit_recipient_burst": 1
+        })
+        manager = NotificationManager(plugin, config, Storage(plugin))
+        sent = []
+
+        async def send(user_id, message, snapshot):
+            sent.append(user_id)
+
+        manager._send_private_message = send
+
+        async def run():
+            await manager.start()
+            for user_id in ("5", "6"):
+                job = functools.partial(
+                    manager.notify_admin, None, "10", "群", user_id, "用户", "你好", ValidationResult.ALLOW
+                )
+                await asyncio.wait_for(manager.dispatch(job), 1)
+            await manager.close()
+
+        asyncio.run(run())
+        assert sent == ["1"]
+        assert manager.rate_limiter.stats()["rejected"] == 1
+        assert len(plugin.data["notification_retries"]) == 1
+
+    def test_digest_started_inline_waits_for_rate_limit(self):
+        """测试直接发送的通知开启的汇总窗口结束后，汇总仍等待限速发送，而不是交给重试队列"""
+        config = Config({
+            "admin_list": ["1"],
+            "notification_workers": 0,
+            "notification_digest_window_s": 0.02,
+            "notification_digest_immediate": ["whitelisted"],
+            "rate_limit_recipient_per_s": 10,
+            "rate_limit_recipient_burst": 1
+        })
+        manager = NotificationManager(None, config, None)
+        sent = []
+
+        async def send(user_id, message, snapshot):
+            sent.append(message)
+
+        manager._send_private_message = send
+
+        async def run():
+            for result in (ValidationResult.WHITELISTED, ValidationResult.ALLOW):
+                await manager.dispatch(functools.partial(
+                    manager.notify_admin, None, "10", "群", "5", "用户", "你好", result
+                ))
+            await asyncio.sleep(0.2)
+
+        asyncio.run(run())
+        assert len(sent) == 2 and "申请数: 1" in sent[1]
+        assert manager.rate_limiter.stats()["rejected"] == 0
+        assert manager.retry_queue.stats()["pending"] == 0
+
+
+class TestNotificationQueue:
+    """通知队列测试类"""
+
+    def test_drop_policies_and_drain(self):
+        """测试队列已满时的丢弃策略，以及关闭时执行完剩余任务"""
+        sent = []
+
+        def job(value):
+            async def run():
+                await asyncio.sleep(0.01)
+                sent.append(value)
+            return run
+
+        async def run(policy):
+            sent.clear()
+            queue = NotificationQueue(max_size=2, workers=1, drop_policy=policy)
+            queue.start()
+            results = [await queue.submit(job(value)) for value in range(4)]
+            await queue.close()
+            return results, list(sent), queue.stats()
+
+        results, delivered, stats = asyncio.run(run("drop_newest"))
+        assert results == [True, True, False, False]
+        assert delivered == [0, 1]
+        assert stats["dropped"] == 2 and stats["workers"] == 0
+
+        results, delivered, stats = asyncio.run(run("drop_oldest"))
+        assert results == [True, True, True, True]
+        assert delivered == [2, 3]
+        assert stats["processed"] == 2
+
+
+class TestRateLimiter:
+    """发送限速测试类"""
+
+    def test_buckets_apply_backpressure(self):
+        """测试突发用完后发送方按速率等待，且不同接收者的桶相互独立"""
+        limiter = RateLimiter(Config({
+            "rate_limit_platform_per_s": 0,
+            "rate_limit_recipient_per_s": 10,
+            "rate_limit_recipient_burst": 2
+        }))
+        assert limiter.reserve("aiocqhttp", "1") == 0
+        assert limiter.reserve("aiocqhttp", "1") == 0
+        assert limiter.reserve("aiocqhttp", "1") == pytest.approx(0.1, abs=0.02)
+        assert limiter.reserve("aiocqhttp", "2") == 0
+
+        limiter = RateLimiter(Config({
+            "rate_limit_platform_per_s": 20,
+            "rate_limit_platform_burst": 1,
+            "rate_limit_recipient_per_s": 0
+        }))
+
+        async def run():
+            return await asyncio.gather(*(limiter.acquire("aiocqhttp", str(i)) for i in range(3)))
+
+        delays = asyncio.run(run())
+        assert delays[0] == 0 and delays[2] == pytest.approx(0.1, abs=0.02)
+        stats = limiter.stats()
+        assert stats["sends"] == 3 and stats["delayed"] == 2 and stats["waiting"] == 0
+        assert stats["max_delay_ms"] == pytest.approx(100, abs=20)
+
+    def test_max_wait_does_not_consume_tokens(self):
+        """测试需要等待超过 max_wait 时立即返回且不消耗令牌"""
+        limiter = RateLimiter(Config({
+            "rate_limit_platform_per_s": 0,
+            "rate_limit_recipient_per_s": 10,
+            "rate_limit_recipient_burst": 1
+        }))
+
+        async def run():
+            return [await limiter.acquire("aiocqhttp", "1", max_wait=0) for _ in range(3)]
+
+        assert asyncio.run(run()) == [0, None, None]
+        assert limiter.wait_time("aiocqhttp", "1") == pytest.approx(0.1, abs=0.02)
+        assert limiter.stats()["rejected"] == 2
+
 
 class TestConfig:
     """配置测试类"""
 
+    def test_malformed_numbers_fall_back_to_defaults(self):
+        """测试无效的数值配置使用默认值，不会导致加载失败"""
+        config = Config({"regex_timeout_ms": "fast", "notification_digest_window_s": None, "regex_workers": "4"})
+        assert config.snapshot.regex_timeout_ms == 200
+        assert config.notification_digest_window_s == 0.0
+        assert config.snapshot.regex_workers == 4
+
     def test_admin_list(self):
         """测试管理员列表"""
         config = Config({"admin_list": ["123456", "789012"]})
@@ -111,6 +1335,29 @@ class TestConfig:
         assert config.is_admin("123456") is True
         assert config.is_admin("789012") is True
 
+    def test_snapshot_reload(self):
+        """测试配置变化时替换快照，已取得的旧快照保持不变"""
+        raw = {"admin_list": [123456], "default_mode": "reject"}
+        config = Config(None, raw)
+        snapshot = config.snapshot
+        assert snapshot.is_admin("123456") is True
+        assert snapshot.default_mode == "reject"
+        with pytest.raises(AttributeError):
+            snapshot.default_mode = "allow"
+
+        assert config.reload() is False
+        raw["default_mode"] = "allow"
+        assert config.reload() is True
+        assert config.default_mode == "allow"
+        assert snapshot.default_mode == "reject"
+
+    def test_notification_templates(self):
+        """测试通知模板预解析，并与默认模板合并"""
+        config = Config({"admin_notification_messages": {"request_approved": "{user_id} 通过 {unknown}"}})
+        templates = config.snapshot.notification_templates
+        assert templates["request_approved"].render(user_id="1") == "1 通过 {unknown}"
+        assert "request_rejected" in templates
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])